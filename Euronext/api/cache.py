@@ -1,24 +1,288 @@
 # src/api/cache.py
 import streamlit as st
+import functools
 import hashlib
-import json
-from datetime import datetime, timedelta
-from typing import Any, Optional, Dict
+import logging
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Any, Optional, Dict, Hashable
+import numpy as np
 import pandas as pd
 
+from api.coalescing import SingleFlight
+from api.disk_cache import DiskCacheBackend, TieredCacheBackend
+from config.settings import CacheConfig
+
+logger = logging.getLogger(__name__)
+
+
+class FrozenDict(dict):
+    """Dictionnaire en lecture seule, partagé entre sessions sans copie"""
+    
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Entrée de cache partagée en lecture seule")
+    
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+    
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+def _freeze(value: Any) -> Any:
+    """Rend une valeur immuable avant de la partager entre sessions
+    
+    Les DataFrame et Series sont copiés superficiellement : avec le
+    copy-on-write de pandas, modifier l'original ou une copie lue ne
+    touche pas l'entrée. Les tableaux NumPy passent en lecture seule.
+    """
+    if isinstance(value, dict) and not isinstance(value, FrozenDict):
+        return FrozenDict({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=False)
+    if isinstance(value, np.ndarray) and value.flags.writeable:
+        view = value.view()
+        view.flags.writeable = False
+        return view
+    return value
+
+
+def _namespace(key: str) -> str:
+    """Espace de noms d'une clé « espace:clé » ("" sans préfixe)"""
+    namespace, separator, _ = key.partition(":")
+    return namespace if separator else ""
+
+
+def estimate_size(value: Any) -> int:
+    """Taille approximative d'une valeur en octets, calculée une fois à l'insertion"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return sys.getsizeof(value) if value.base is None else int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class MemoryCacheBackend:
+    """Stockage clé/valeur thread-safe avec TTL par clé et budget en octets
+    
+    Les entrées sont gardées dans l'ordre d'utilisation : au-delà de
+    `max_bytes`, les moins récemment lues sont évincées. La taille de
+    chaque entrée est mesurée une fois, à l'insertion ; les entrées
+    expirées sont purgées périodiquement par un thread commun.
+    
+    Avec `freeze` (stockage partagé entre sessions), les valeurs sont
+    gelées à l'écriture et les DataFrame relus sont des copies
+    superficielles. Les compteurs sont tenus par espace de noms
+    (préfixe « espace: » des clés).
+    """
+    
+    _COUNTERS = ("hits", "misses", "evictions", "expirations")
+    
+    def __init__(self, max_bytes: int = CacheConfig.MAX_BYTES, freeze: bool = False):
+        self.max_bytes = max_bytes
+        self.freeze = freeze
+        self._lock = threading.Lock()
+        # clé -> (valeur, expiration, taille), de la moins à la plus récemment utilisée
+        self._store: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._counts: Dict[str, Dict[str, int]] = {}
+        _register_for_sweep(self)
+    
+    def _count(self, key: str, name: str, n: int = 1):
+        counts = self._counts.get(_namespace(key))
+        if counts is None:
+            counts = self._counts[_namespace(key)] = dict.fromkeys(self._COUNTERS, 0)
+        counts[name] += n
+    
+    def _remove(self, key: str):
+        _, _, size = self._store.pop(key)
+        self._bytes -= size
+    
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is None:
+                self._count(key, "misses")
+                return None
+            if time.time() < entry[1]:
+                self._store.move_to_end(key)
+                self._count(key, "hits")
+                value = entry[0]
+            else:
+                # Expiré, on nettoie
+                self._remove(key)
+                self._count(key, "expirations")
+                self._count(key, "misses")
+                return None
+        if self.freeze and isinstance(value, (pd.DataFrame, pd.Series)):
+            return value.copy(deep=False)
+        return value
+    
+    def set(self, key: str, value: Any, ttl: int):
+        if self.freeze:
+            value = _freeze(value)
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._store:
+                self._remove(key)
+            if size > self.max_bytes:
+                # Plus grande que tout le budget : jamais gardée
+                self._count(key, "evictions")
+                return
+            self._store[key] = (value, time.time() + ttl, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._store))
+                self._remove(oldest)
+                self._count(oldest, "evictions")
+    
+    def delete(self, key: str):
+        with self._lock:
+            if key in self._store:
+                self._remove(key)
+    
+    def clear(self, namespace: Optional[str] = None):
+        """Vide le cache, ou seulement les clés de `namespace`"""
+        with self._lock:
+            if namespace is None:
+                self._store.clear()
+                self._bytes = 0
+                return
+            for key in [key for key in self._store if _namespace(key) == namespace]:
+                self._remove(key)
+    
+    def sweep(self) -> int:
+        """Supprime les entrées expirées ; retourne leur nombre"""
+        now = time.time()
+        with self._lock:
+            expired = [key for key, (_, expires, _) in self._store.items() if expires <= now]
+            for key in expired:
+                self._remove(key)
+                self._count(key, "expirations")
+        return len(expired)
+    
+    def get_stats(self, namespace: Optional[str] = None) -> Dict:
+        """Statistiques du cache entier, ou des seules clés de `namespace`"""
+        with self._lock:
+            if namespace is None:
+                entries, size = len(self._store), self._bytes
+                counts = {
+                    name: sum(c[name] for c in self._counts.values()) for name in self._COUNTERS
+                }
+            else:
+                sizes = [entry[2] for key, entry in self._store.items() if _namespace(key) == namespace]
+                entries, size = len(sizes), sum(sizes)
+                counts = dict(self._counts.get(namespace) or dict.fromkeys(self._COUNTERS, 0))
+        lookups = counts["hits"] + counts["misses"]
+        return {
+            "total_entries": entries,
+            "memory_bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": counts["hits"],
+            "misses": counts["misses"],
+            "hit_rate": counts["hits"] / lookups if lookups else 0.0,
+            "evictions": counts["evictions"],
+            "expirations": counts["expirations"]
+        }
+
+
+_sweep_targets: weakref.WeakSet = weakref.WeakSet()
+_sweep_lock = threading.Lock()
+_sweeper: Optional[threading.Thread] = None
+
+
+def _sweep_loop():
+    while True:
+        time.sleep(CacheConfig.SWEEP_INTERVAL)
+        with _sweep_lock:
+            backends = list(_sweep_targets)
+        for backend in backends:
+            try:
+                backend.sweep()
+            except Exception as e:
+                # Un stockage en échec ne doit pas arrêter la purge des autres
+                logger.warning("Purge du cache impossible (%s): %s", type(backend).__name__, e)
+
+
+def _register_for_sweep(backend):
+    """Inscrit un stockage (méthode `sweep`) auprès du thread de purge, démarré au premier appel"""
+    global _sweeper
+    with _sweep_lock:
+        _sweep_targets.add(backend)
+        if _sweeper is None:
+            _sweeper = threading.Thread(target=_sweep_loop, name="cache-sweeper", daemon=True)
+            _sweeper.start()
+
+
+_shared_backend = MemoryCacheBackend(freeze=True)
+_tiered_backend: Optional[TieredCacheBackend] = None
+_tiered_lock = threading.Lock()
+
+
+def get_shared_backend(persistent: bool = False):
+    """Retourne le cache commun à toutes les sessions du processus
+    
+    Avec `persistent`, la mémoire est doublée du cache disque
+    (StorageConfig.CACHE_PATH), commun à tous les processus et conservé
+    d'un redémarrage à l'autre.
+    """
+    global _tiered_backend
+    if not persistent:
+        return _shared_backend
+    with _tiered_lock:
+        if _tiered_backend is None:
+            disk = DiskCacheBackend()
+            _register_for_sweep(disk)
+            _tiered_backend = TieredCacheBackend(_shared_backend, disk)
+        return _tiered_backend
+
+
 class CacheManager:
-    """Gestionnaire de cache avancé avec différentes stratégies"""
+    """Gestionnaire de cache avancé avec différentes stratégies
     
-    def __init__(self, default_ttl: int = 3600):
+    Par défaut le cache est partagé par toutes les sessions du processus :
+    le trafic amont dépend du nombre de symboles distincts, pas du nombre
+    d'onglets ouverts. Les valeurs stockées sont gelées et ne doivent pas
+    être modifiées en place. `shared=False` rétablit un cache par session.
+    Un cache partagé `persistent` est aussi écrit sur disque : un
+    redémarrage ne redemande pas au fournisseur ce qui n'a pas expiré.
+    
+    Les clés de chaque gestionnaire sont préfixées par `namespace` :
+    `clear` et `get_stats` ne portent que sur les siennes.
+    """
+    
+    def __init__(self, default_ttl: int = 3600, shared: bool = True, persistent: Optional[bool] = None,
+                 namespace: str = "default"):
         self.default_ttl = default_ttl
+        self.shared = shared
+        self.persistent = CacheConfig.PERSISTENT if persistent is None else persistent
+        self.namespace = namespace
         self._init_cache()
     
     def _init_cache(self):
-        """Initialise le cache dans session_state"""
-        if 'cache_store' not in st.session_state:
-            st.session_state.cache_store = {}
-        if 'cache_timestamps' not in st.session_state:
-            st.session_state.cache_timestamps = {}
+        """Initialise le stockage (partagé ou dans session_state)"""
+        if self.shared:
+            self._shared = get_shared_backend(self.persistent)
+        elif 'cache_backend' not in st.session_state:
+            st.session_state.cache_backend = MemoryCacheBackend()
+    
+    @property
+    def backend(self):
+        if self.shared:
+            return self._shared
+        return st.session_state.cache_backend
     
     def _generate_key(self, prefix: str, *args, **kwargs) -> str:
         """Génère une clé de cache unique"""
@@ -28,47 +292,28 @@ class CacheManager:
         key_string = "|".join(key_parts)
         return hashlib.md5(key_string.encode()).hexdigest()
     
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+    
     def get(self, key: str) -> Optional[Any]:
         """Récupère une valeur du cache"""
-        if key in st.session_state.cache_store:
-            timestamp = st.session_state.cache_timestamps.get(key)
-            if timestamp and datetime.now() < timestamp:
-                return st.session_state.cache_store[key]
-            else:
-                # Expiré, on nettoie
-                self.delete(key)
-        return None
+        return self.backend.get(self._key(key))
     
     def set(self, key: str, value: Any, ttl: Optional[int] = None):
         """Stocke une valeur dans le cache"""
-        ttl = ttl or self.default_ttl
-        st.session_state.cache_store[key] = value
-        st.session_state.cache_timestamps[key] = datetime.now() + timedelta(seconds=ttl)
+        self.backend.set(self._key(key), value, ttl or self.default_ttl)
     
     def delete(self, key: str):
         """Supprime une entrée du cache"""
-        if key in st.session_state.cache_store:
-            del st.session_state.cache_store[key]
-        if key in st.session_state.cache_timestamps:
-            del st.session_state.cache_timestamps[key]
+        self.backend.delete(self._key(key))
     
     def clear(self):
-        """Vide tout le cache"""
-        st.session_state.cache_store = {}
-        st.session_state.cache_timestamps = {}
+        """Vide les entrées de ce gestionnaire"""
+        self.backend.clear(self.namespace)
     
     def get_stats(self) -> Dict:
-        """Retourne des statistiques sur le cache"""
-        return {
-            "total_entries": len(st.session_state.cache_store),
-            "active_entries": sum(
-                1 for ts in st.session_state.cache_timestamps.values() 
-                if ts > datetime.now()
-            ),
-            "memory_estimate": sum(
-                len(json.dumps(v, default=str)) for v in st.session_state.cache_store.values()
-            )
-        }
+        """Retourne des statistiques sur les entrées de ce gestionnaire"""
+        return self.backend.get_stats(self.namespace)
     
     @st.cache_data(ttl=300)
     def cache_dataframe(_self, df: pd.DataFrame, cache_key: str) -> pd.DataFrame:
@@ -76,43 +321,181 @@ class CacheManager:
         return df.copy()
 
 
+_SCALARS = (type(None), bool, int, str, bytes, datetime, date, timedelta)
+
+
+def make_key(value: Any) -> Hashable:
+    """Clé hashable tenant compte du type : 1, 1.0, "1" et True ne se confondent pas
+
+    Les DataFrame, Series et tableaux NumPy sont identifiés par une
+    empreinte de leur contenu, de leur forme et de leurs types. Lève
+    TypeError pour une valeur qu'on ne sait pas identifier.
+    """
+    kind = type(value).__qualname__
+    if isinstance(value, float):
+        # hex() distingue 0.0 / -0.0 et rend NaN égal à lui-même
+        return (kind, value.hex())
+    if isinstance(value, _SCALARS):
+        return (kind, value)
+    if isinstance(value, (tuple, list)):
+        return (kind, tuple(make_key(v) for v in value))
+    if isinstance(value, dict):
+        return (kind, tuple(sorted(((make_key(k), make_key(v)) for k, v in value.items()), key=repr)))
+    if isinstance(value, (set, frozenset)):
+        return (kind, tuple(sorted((make_key(v) for v in value), key=repr)))
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        digest = hashlib.blake2b(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        dtypes = tuple(map(str, value.dtypes)) if isinstance(value, pd.DataFrame) else str(value.dtype)
+        columns = tuple(map(str, value.columns)) if isinstance(value, pd.DataFrame) else value.name
+        return (kind, value.shape, columns, dtypes, digest.hexdigest())
+    if isinstance(value, np.ndarray) and value.dtype != object:
+        digest = hashlib.blake2b(np.ascontiguousarray(value).tobytes())
+        return (kind, value.shape, value.dtype.str, digest.hexdigest())
+    if isinstance(value, np.generic):
+        return make_key(value.item())
+    try:
+        hash(value)
+    except TypeError:
+        raise TypeError(f"Argument non hachable pour le cache : {kind}") from None
+    return (type(value).__module__, kind, value)
+
+
+class _FunctionStats:
+    """Compteurs d'une fonction décorée"""
+    
+    __slots__ = ("hits", "misses", "stale_hits", "bypassed", "errors", "computations", "compute_s", "max_compute_s")
+    
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, 0)
+    
+    def as_dict(self) -> Dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "errors": self.errors,
+            "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            "avg_compute_ms": self.compute_s / self.computations * 1000 if self.computations else 0.0,
+            "max_compute_ms": self.max_compute_s * 1000
+        }
+
+
 class FunctionCache:
-    """Décorateur pour mettre en cache les résultats de fonctions"""
+    """Décorateur pour mettre en cache les résultats de fonctions
     
-    def __init__(self, ttl: int = 3600, max_size: int = 100):
+    LRU en O(1) (OrderedDict) et TTL par entrée, thread-safe. Les clés
+    sont construites par `make_key` ; un appel dont les arguments ne sont
+    pas identifiables est exécuté sans cache. Un seul appelant recalcule
+    une clé absente ou expirée, les autres attendent son résultat
+    (SingleFlight). Avec `stale_ttl`, une valeur expirée depuis moins de
+    `stale_ttl` secondes est servie tout de suite pendant qu'un thread la
+    recalcule. Les résultats sont partagés : ne pas les modifier en place.
+    
+    La fonction décorée expose `cache_stats()` et `cache_clear()`.
+    """
+    
+    def __init__(self, ttl: int = 3600, max_size: int = 100, stale_ttl: int = 0):
         self.ttl = ttl
         self.max_size = max_size
-        self.cache = {}
-        self.timestamps = {}
+        self.stale_ttl = stale_ttl
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[Hashable, tuple]" = OrderedDict()  # clé -> (résultat, expiration)
+        self._flight = SingleFlight()
+        self._refreshing = set()
+        self._stats: Dict[str, _FunctionStats] = {}
+    
+    def _lookup(self, key: Hashable, stats: _FunctionStats):
+        """(trouvé, résultat, périmé) ; la clé devient la plus récemment utilisée"""
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return False, None, False
+            result, expires = entry
+            now = time.monotonic()
+            if now < expires:
+                self._cache.move_to_end(key)
+                stats.hits += 1
+                return True, result, False
+            if now < expires + self.stale_ttl:
+                self._cache.move_to_end(key)
+                stats.stale_hits += 1
+                return True, result, True
+            del self._cache[key]
+            return False, None, False
+    
+    def _compute(self, func, key: Hashable, stats: _FunctionStats, args, kwargs):
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                stats.errors += 1
+            raise
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            stats.computations += 1
+            stats.compute_s += elapsed
+            stats.max_compute_s = max(stats.max_compute_s, elapsed)
+            self._cache[key] = (result, time.monotonic() + self.ttl)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        return result
+    
+    def _refresh(self, func, key: Hashable, stats: _FunctionStats, args, kwargs):
+        """Recalcule une valeur périmée en arrière-plan, une fois par clé"""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        
+        def run():
+            try:
+                self._flight.do(key, self._compute, func, key, stats, args, kwargs)
+            except Exception:
+                pass  # La valeur périmée reste servie jusqu'à `stale_ttl`
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+        
+        threading.Thread(target=run, name=f"cache-refresh-{func.__name__}", daemon=True).start()
     
     def __call__(self, func):
+        name = f"{func.__module__}.{func.__qualname__}"
+        stats = self._stats.setdefault(name, _FunctionStats())
+        
+        @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            # Générer une clé
-            key_parts = [func.__name__]
-            key_parts.extend([str(arg) for arg in args])
-            key_parts.extend([f"{k}={v}" for k, v in sorted(kwargs.items())])
-            key = "|".join(key_parts)
-            
-            # Vérifier le cache
-            if key in self.cache:
-                timestamp = self.timestamps.get(key)
-                if timestamp and datetime.now() < timestamp:
-                    return self.cache[key]
+            try:
+                key = (name, make_key(args), make_key(kwargs))
+            except TypeError:
+                with self._lock:
+                    stats.bypassed += 1
+                return func(*args, **kwargs)
             
-            # Calculer le résultat
-            result = func(*args, **kwargs)
-            
-            # Gérer la taille du cache
-            if len(self.cache) >= self.max_size:
-                # Supprimer l'entrée la plus ancienne
-                oldest_key = min(self.timestamps.keys(), key=lambda k: self.timestamps[k])
-                del self.cache[oldest_key]
-                del self.timestamps[oldest_key]
-            
-            # Mettre en cache
-            self.cache[key] = result
-            self.timestamps[key] = datetime.now() + timedelta(seconds=self.ttl)
+            found, result, stale = self._lookup(key, stats)
+            if found:
+                if stale:
+                    self._refresh(func, key, stats, args, kwargs)
+                return result
             
-            return result
+            with self._lock:
+                stats.misses += 1
+            return self._flight.do(key, self._compute, func, key, stats, args, kwargs)
+        
+        def cache_stats() -> Dict:
+            with self._lock:
+                entries = sum(1 for key in self._cache if key[0] == name)
+                return {**stats.as_dict(), "entries": entries}
+        
+        def cache_clear():
+            with self._lock:
+                for key in [key for key in self._cache if key[0] == name]:
+                    del self._cache[key]
         
-        return wrapper
\ No newline at end of file
+        wrapper.cache_stats = cache_stats
+        wrapper.cache_clear = cache_clear
+        return wrapper
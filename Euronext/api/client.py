@@ -1,12 +1,29 @@
 # api/client.py - Version avec Yahoo Finance
-import requests
 import streamlit as st
 from config.settings import APIConfig
+from api.transport import get_transport
 
 class FinancialAPIClient:
     def __init__(self):
-        self.session = requests.Session()
-        self.base_url = "https://query1.finance.yahoo.com"
+        self.transport = get_transport("yahoo")
+        self.base_url = APIConfig.YAHOO_BASE_URL
+    
+    @staticmethod
+    def _build_quote(symbol, price, previous_close, volume, currency):
+        """Construit le dictionnaire de cotation commun aux appels unitaires et par lot"""
+        if previous_close > 0:
+            change = ((price - previous_close) / previous_close) * 100
+        else:
+            change = 0
+        
+        return {
+            'price': price,
+            'change': change,
+            'volume': volume,
+            'currency': currency,
+            'symbol': symbol,
+            'source': 'Yahoo Finance'
+        }
     
     @st.cache_data(ttl=300)  # Cache 5 minutes
     def get_stock_data(_self, symbol):
@@ -15,11 +32,7 @@ class FinancialAPIClient:
             # URL pour les données en temps réel
             url = f"{_self.base_url}/v8/finance/chart/{symbol}"
             
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            
-            response = _self.session.get(url, headers=headers, timeout=10)
+            response = _self.transport.get(url)
             
             if response.status_code == 200:
                 data = response.json()
@@ -31,21 +44,13 @@ class FinancialAPIClient:
                     
                     # Extraire les données
                     price = meta.get('regularMarketPrice', 0)
-                    previous_close = meta.get('previousClose', price)
-                    
-                    if previous_close > 0:
-                        change = ((price - previous_close) / previous_close) * 100
-                    else:
-                        change = 0
-                    
-                    return {
-                        'price': price,
-                        'change': change,
-                        'volume': meta.get('regularMarketVolume', 0),
-                        'currency': meta.get('currency', 'EUR'),
-                        'symbol': symbol,
-                        'source': 'Yahoo Finance'
-                    }
+                    return _self._build_quote(
+                        symbol,
+                        price,
+                        meta.get('previousClose', price),
+                        meta.get('regularMarketVolume', 0),
+                        meta.get('currency', 'EUR')
+                    )
             
             # Si erreur, retourner None (utilisera les données simulées)
             return None
@@ -54,6 +59,49 @@ class FinancialAPIClient:
             st.warning(f"Erreur Yahoo Finance: {e}")
             return None
     
+    @st.cache_data(ttl=300)  # Cache 5 minutes
+    def get_stocks_data(_self, symbols, batch_size=APIConfig.QUOTE_BATCH_SIZE):
+        """Récupère les données de plusieurs actions, une requête par lot
+        
+        Si l'endpoint multi-symboles refuse un lot, ce lot est récupéré
+        symbole par symbole.
+        """
+        results = {}
+        symbols = list(symbols)
+        
+        for i in range(0, len(symbols), batch_size):
+            chunk = symbols[i:i + batch_size]
+            try:
+                url = f"{_self.base_url}/v7/finance/quote"
+                
+                response = _self.transport.get(url, params={'symbols': ','.join(chunk)})
+                
+                if response.status_code != 200:
+                    for symbol in chunk:
+                        results[symbol] = _self.get_stock_data(symbol)
+                    continue
+                
+                data = response.json()
+                for quote in data.get('quoteResponse', {}).get('result') or []:
+                    symbol = quote.get('symbol')
+                    if symbol not in chunk or 'regularMarketPrice' not in quote:
+                        continue
+                    
+                    price = quote.get('regularMarketPrice', 0)
+                    results[symbol] = _self._build_quote(
+                        symbol,
+                        price,
+                        quote.get('regularMarketPreviousClose', price),
+                        quote.get('regularMarketVolume', 0),
+                        quote.get('currency', 'EUR')
+                    )
+            
+            except Exception as e:
+                st.warning(f"Erreur Yahoo Finance (lot): {e}")
+        
+        # Les symboles absents valent None, comme get_stock_data
+        return {symbol: results.get(symbol) for symbol in symbols}
+    
     def get_historical_data(_self, symbol, period="3mo"):
         """Récupère les données historiques"""
         try:
@@ -63,7 +111,7 @@ class FinancialAPIClient:
                 'interval': '1d'
             }
             
-            response = _self.session.get(url, params=params, timeout=10)
+            response = _self.transport.get(url, params=params)
             
             if response.status_code == 200:
                 data = response.json()
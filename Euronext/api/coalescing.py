@@ -0,0 +1,135 @@
+# api/coalescing.py - Fusion des requêtes identiques simultanées
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+
+class _Call:
+    """Appel en cours partagé par tous les demandeurs d'une même clé"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Exécute une seule fois une fonction par clé tant qu'elle est en cours
+
+    Les appelants qui arrivent pendant l'exécution attendent le premier
+    appel et reçoivent le même résultat (ou la même exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._executions = 0
+        self._merged = 0
+
+    def do(self, key: Hashable, func: Callable, *args, **kwargs) -> Any:
+        """Appelle func(*args, **kwargs) ou attend l'appel déjà en cours"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self._executions += 1
+            else:
+                self._merged += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def get_stats(self) -> Dict:
+        """Retourne les compteurs d'appels exécutés et fusionnés"""
+        with self._lock:
+            executions = self._executions
+            merged = self._merged
+            in_flight = len(self._calls)
+        total = executions + merged
+        return {
+            "calls": total,
+            "executions": executions,
+            "merged": merged,
+            "in_flight": in_flight,
+            "merge_rate": merged / total if total else 0.0
+        }
+
+
+class CoalescingAPIManager:
+    """Enveloppe un gestionnaire d'API et fusionne les requêtes identiques
+
+    La clé de fusion est (fournisseur, symbole, période, intervalle,
+    empreinte de la clé API) : deux sessions qui demandent la même série au
+    même moment avec la même clé partagent un seul appel HTTP.
+    """
+
+    def __init__(self, manager, flight: SingleFlight = None):
+        self._manager = manager
+        self._flight = flight or SingleFlight()
+
+    @staticmethod
+    def _key_id(api_key) -> str:
+        """Empreinte de la clé API : deux clés différentes ne partagent pas un appel"""
+        return hashlib.sha256((api_key or "").encode()).hexdigest()[:16]
+
+    @staticmethod
+    def _provider(api_source: str) -> str:
+        return "alpha" if api_source in ("alpha", "Alpha Vantage") else "yahoo"
+
+    # L'échéance `timeout` ne fait pas partie de la clé : les appelants
+    # fusionnés suivent celle du premier
+
+    def get_yahoo_finance_data(self, symbol, timeout=None):
+        """Cotation Yahoo Finance, fusionnée par symbole"""
+        return self._flight.do(
+            ("yahoo", symbol, None, None),
+            self._manager.get_yahoo_finance_data, symbol, timeout
+        )
+
+    def get_yahoo_finance_batch(self, symbols, batch_size=None, timeout=None):
+        """Cotations Yahoo Finance par lot, fusionnées par liste de symboles"""
+        return self._flight.do(
+            ("yahoo", tuple(symbols), None, None),
+            self._manager.get_yahoo_finance_batch, symbols, batch_size, timeout
+        )
+
+    def get_alpha_vantage_data(self, symbol, api_key, timeout=None):
+        """Cotation Alpha Vantage, fusionnée par symbole"""
+        return self._flight.do(
+            ("alpha", symbol, None, None, self._key_id(api_key)),
+            self._manager.get_alpha_vantage_data, symbol, api_key, timeout
+        )
+
+    def get_historical_data(self, symbol, api_source="yahoo", api_key=None, **kwargs):
+        """Historique, fusionné par (fournisseur, symbole, période, intervalle, clé API)"""
+        key = (
+            self._provider(api_source),
+            symbol,
+            kwargs.get("start") or kwargs.get("period"),
+            kwargs.get("interval"),
+            self._key_id(api_key)
+        )
+        return self._flight.do(
+            key,
+            self._manager.get_historical_data, symbol, api_source, api_key, **kwargs
+        )
+
+    def get_stats(self) -> Dict:
+        """Retourne les compteurs de fusion"""
+        return self._flight.get_stats()
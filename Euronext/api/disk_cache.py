@@ -0,0 +1,191 @@
+# api/disk_cache.py - Cache persistant (L2) sur disque, partagé entre processus
+import logging
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from config.settings import CacheConfig, StorageConfig
+
+logger = logging.getLogger(__name__)
+
+
+class DiskCacheBackend:
+    """Stockage clé/valeur dans SQLite (WAL), avec TTL par clé
+
+    Les valeurs sont sérialisées par pickle. Plusieurs processus peuvent
+    lire et écrire le même fichier : SQLite sérialise les écritures, les
+    lectures ne sont pas bloquées en mode WAL. Une connexion est ouverte
+    par thread. Une erreur disque est journalisée et traitée comme un
+    défaut de cache, jamais propagée à l'appelant.
+    """
+
+    def __init__(self, path=None, max_bytes: int = CacheConfig.DISK_MAX_BYTES):
+        self.path = Path(path or StorageConfig.CACHE_PATH)
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+        self._errors = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._open()) as conn, conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    expires REAL NOT NULL,
+                    size INTEGER NOT NULL
+                )
+            ''')
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache_entries (expires)")
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._open()
+        return conn
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def get_entry(self, key: str) -> Optional[tuple]:
+        """(valeur, expiration en epoch s) d'une entrée valide, ou None"""
+        try:
+            row = self._conn().execute(
+                "SELECT value, expires FROM cache_entries WHERE key = ? AND expires > ?",
+                (key, time.time())
+            ).fetchone()
+            entry = None if row is None else (pickle.loads(row[0]), row[1])
+        except Exception:
+            logger.exception("Lecture du cache disque impossible (%s)", key)
+            self._count("_errors")
+            return None
+        self._count("_misses" if entry is None else "_hits")
+        return entry
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self.get_entry(key)
+        return None if entry is None else entry[0]
+
+    def set(self, key: str, value: Any, ttl: int):
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            with self._conn() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache_entries (key, value, expires, size) VALUES (?, ?, ?, ?)",
+                    (key, blob, time.time() + ttl, len(blob))
+                )
+        except Exception:
+            logger.exception("Écriture du cache disque impossible (%s)", key)
+            self._count("_errors")
+            return
+        self._count("_writes")
+
+    def delete(self, key: str):
+        try:
+            with self._conn() as conn:
+                conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+        except Exception:
+            logger.exception("Suppression dans le cache disque impossible (%s)", key)
+            self._count("_errors")
+
+    def clear(self, namespace: Optional[str] = None):
+        """Vide le cache, ou seulement les clés « namespace:… »"""
+        try:
+            with self._conn() as conn:
+                if namespace is None:
+                    conn.execute("DELETE FROM cache_entries")
+                else:
+                    prefix = f"{namespace}:"
+                    conn.execute("DELETE FROM cache_entries WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+        except Exception:
+            logger.exception("Vidage du cache disque impossible")
+            self._count("_errors")
+
+    def sweep(self) -> int:
+        """Supprime les entrées expirées, puis les plus proches de l'expiration au-delà de `max_bytes`"""
+        try:
+            with self._conn() as conn:
+                removed = conn.execute("DELETE FROM cache_entries WHERE expires <= ?", (time.time(),)).rowcount
+                total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+                if total > self.max_bytes:
+                    removed += conn.execute('''
+                        DELETE FROM cache_entries WHERE key IN (
+                            SELECT key FROM (
+                                SELECT key, SUM(size) OVER (ORDER BY expires DESC) AS kept
+                                FROM cache_entries
+                            ) WHERE kept > ?
+                        )
+                    ''', (self.max_bytes,)).rowcount
+        except Exception:
+            logger.exception("Purge du cache disque impossible")
+            self._count("_errors")
+            return 0
+        return removed
+
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "writes": self._writes,
+                "errors": self._errors
+            }
+
+
+class TieredCacheBackend:
+    """Cache à deux niveaux : mémoire (L1) devant le disque (L2)
+
+    Une lecture absente de L1 est cherchée dans L2 avant tout appel
+    réseau ; une entrée trouvée remonte en L1 pour la durée qu'il lui
+    reste. Les écritures vont dans les deux niveaux : après un
+    redémarrage, L2 resert tout ce qui n'a pas expiré.
+    """
+
+    def __init__(self, memory, disk: DiskCacheBackend):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        entry = self.disk.get_entry(key)
+        if entry is None:
+            return None
+        value, expires = entry
+        self.memory.set(key, value, expires - time.time())
+        promoted = self.memory.get(key)
+        return value if promoted is None else promoted
+
+    def set(self, key: str, value: Any, ttl: int):
+        self.memory.set(key, value, ttl)
+        self.disk.set(key, value, ttl)
+
+    def delete(self, key: str):
+        self.memory.delete(key)
+        self.disk.delete(key)
+
+    def clear(self, namespace: Optional[str] = None):
+        self.memory.clear(namespace)
+        self.disk.clear(namespace)
+
+    def sweep(self) -> int:
+        return self.memory.sweep() + self.disk.sweep()
+
+    def get_stats(self, namespace: Optional[str] = None) -> Dict:
+        stats = self.memory.get_stats(namespace)
+        stats["disk"] = self.disk.get_stats()
+        return stats
@@ -0,0 +1,261 @@
+# api/poller.py - Interrogation périodique des cotations, partagée entre sessions
+import logging
+import threading
+import time
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from api.scheduler import PollScheduler
+from config.settings import PollerConfig
+
+logger = logging.getLogger(__name__)
+
+# fetch(symboles, source, clé) -> (résultats par symbole, symboles en échec)
+FetchFunc = Callable[[List[str], str, str], Tuple[Dict[str, Dict], List[str]]]
+
+
+class _Subscription:
+    __slots__ = ("symbols", "group", "interval", "expires")
+
+    def __init__(self, symbols, group, interval, expires):
+        self.symbols = symbols
+        self.group = group
+        self.interval = interval
+        self.expires = expires
+
+
+class QuotePoller:
+    """Un seul thread interroge le fournisseur pour toutes les sessions
+
+    Chaque session déclare (et renouvelle à chaque affichage) les symboles
+    qu'elle suit ; le thread récupère ces symboles par source et publie les
+    cotations dans un instantané que les sessions lisent sans appel réseau.
+    L'intervalle de chaque symbole est fixé par le `PollScheduler` (phase
+    de séance, volatilité, nombre de sessions) : marché fermé, seuls les
+    symboles encore jamais reçus sont interrogés. Un abonnement non
+    renouvelé pendant `subscription_ttl` secondes (onglet fermé) expire.
+    `on_update(résultats)` est appelé une fois par cycle et pour chaque
+    `publish`, hors verrou.
+    """
+
+    def __init__(
+        self,
+        fetch: FetchFunc,
+        on_update: Optional[Callable[[Dict[str, Dict]], None]] = None,
+        subscription_ttl: float = PollerConfig.SUBSCRIPTION_TTL,
+        min_interval: float = PollerConfig.MIN_INTERVAL,
+        scheduler: Optional[PollScheduler] = None
+    ):
+        self.fetch = fetch
+        self.on_update = on_update
+        self.subscription_ttl = subscription_ttl
+        self.min_interval = min_interval
+        self.scheduler = scheduler or PollScheduler(min_interval=min_interval)
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._subscriptions: Dict[Hashable, _Subscription] = {}
+        self._last_polled: Dict[Tuple[str, str], float] = {}
+        self._quotes: Dict[Tuple[str, str], Dict] = {}
+        self._version = 0
+        self._polls = 0
+        self._errors = 0
+        self._last_poll_ms = 0.0
+
+    def subscribe(self, subscriber: Hashable, symbols: Iterable[str], api_source: str = "Yahoo Finance",
+                  api_key: str = "", interval: float = 10):
+        """Déclare ou renouvelle les symboles suivis par une session"""
+        symbols = tuple(symbols)
+        group = (api_source, api_key or "")
+        with self._lock:
+            self._subscriptions[subscriber] = _Subscription(
+                symbols, group, max(interval, self.min_interval),
+                time.monotonic() + max(self.subscription_ttl, 3 * interval)
+            )
+            missing = any((api_source, s) not in self._quotes for s in symbols)
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped.clear()
+                self._thread = threading.Thread(target=self._run, name="quote-poller", daemon=True)
+                self._thread.start()
+        if missing:
+            self._wake.set()
+
+    def unsubscribe(self, subscriber: Hashable):
+        with self._lock:
+            self._subscriptions.pop(subscriber, None)
+
+    def latest(self, symbols: Iterable[str], api_source: str = "Yahoo Finance") -> Dict[str, Dict]:
+        """Dernières cotations publiées (les symboles encore jamais reçus sont absents)"""
+        with self._lock:
+            return {s: self._quotes[(api_source, s)] for s in symbols if (api_source, s) in self._quotes}
+
+    def claim_first_fetch(self, symbols: Iterable[str], api_source: str = "Yahoo Finance") -> List[str]:
+        """Symboles encore jamais interrogés, réservés à l'appelant qui les récupère lui-même
+
+        Un symbole n'est réservé qu'une fois par processus : après un échec,
+        les reprises suivent l'intervalle du poller.
+        """
+        now = time.monotonic()
+        with self._lock:
+            claimed = [s for s in symbols if (api_source, s) not in self._last_polled]
+            for symbol in claimed:
+                self._last_polled[(api_source, symbol)] = now
+        return claimed
+
+    def publish(self, results: Dict[str, Dict], api_source: str = "Yahoo Finance"):
+        """Ajoute des cotations obtenues hors du thread (premier affichage)
+
+        Elles suivent le même chemin que celles d'un cycle : volatilité
+        du planificateur et `on_update` (enregistrement, barres).
+        """
+        now = time.monotonic()
+        with self._lock:
+            fresh = self._store(results, api_source, now)
+        self._deliver(fresh, now)
+
+    def _deliver(self, results: Dict[str, Dict], received: float):
+        """Transmet des cotations reçues au planificateur puis à `on_update`, hors verrou"""
+        for symbol, data in results.items():
+            self.scheduler.observe(symbol, data.get('price'), received)
+        if self.on_update and results:
+            try:
+                self.on_update(results)
+            except Exception:
+                logger.exception("Échec du traitement des cotations")
+
+    def _store(self, results: Dict[str, Dict], api_source: str, now: float) -> Dict[str, Dict]:
+        """Enregistre des cotations reçues et retourne celles qui sont nouvelles
+
+        Une cotation au même `timestamp` que la précédente (resservie par
+        le cache) n'est ni republiée, ni transmise au planificateur, ni
+        enregistrée une seconde fois.
+        """
+        fresh = {}
+        for symbol, data in results.items():
+            key = (api_source, symbol)
+            self._last_polled[key] = now
+            previous = self._quotes.get(key)
+            if previous is not None and previous.get('timestamp') == data.get('timestamp'):
+                continue
+            self._quotes[key] = data
+            fresh[symbol] = data
+        if fresh:
+            self._version += 1
+        return fresh
+
+    @property
+    def version(self) -> int:
+        """Incrémenté à chaque publication"""
+        with self._lock:
+            return self._version
+
+    def _groups(self, now: float) -> Dict[Tuple[str, str], Dict[str, Tuple[float, int]]]:
+        """(intervalle demandé, sessions) par symbole et par (source, clé), après purge des expirés"""
+        for subscriber in [k for k, s in self._subscriptions.items() if s.expires < now]:
+            del self._subscriptions[subscriber]
+        groups: Dict[Tuple[str, str], Dict[str, Tuple[float, int]]] = {}
+        for sub in self._subscriptions.values():
+            symbols = groups.setdefault(sub.group, {})
+            for symbol in sub.symbols:
+                interval, watchers = symbols.get(symbol, (float("inf"), 0))
+                symbols[symbol] = (min(interval, sub.interval), watchers + 1)
+        return groups
+
+    def _plan(self, now: float) -> Tuple[List[Tuple[Tuple[str, str], List[str]]], float]:
+        """Symboles à interroger maintenant par groupe, et attente avant la prochaine échéance
+
+        Quand un lot part, les symboles à mi-intervalle ou plus l'accompagnent :
+        une requête groupée coûte autant pour un symbole que pour cinquante.
+        """
+        phase = self.scheduler.phase()
+        plan = []
+        waits = []
+        for group, symbols in self._groups(now).items():
+            api_source = group[0]
+            due, pending = [], []
+            for symbol, (base, watchers) in symbols.items():
+                key = (api_source, symbol)
+                if key not in self._quotes:
+                    due.append(symbol)
+                    waits.append(base)
+                    continue
+                interval = self.scheduler.interval(symbol, base, watchers, phase)
+                if interval is None:
+                    continue
+                remaining = self._last_polled.get(key, 0.0) + interval - now
+                if remaining <= 0:
+                    due.append(symbol)
+                    waits.append(interval)
+                else:
+                    pending.append((symbol, remaining, interval))
+            for symbol, remaining, interval in pending:
+                if due and remaining <= interval / 2:
+                    due.append(symbol)
+                    waits.append(interval)
+                else:
+                    waits.append(remaining)
+            if due:
+                plan.append((group, due))
+        wake = min(waits) if waits else None
+        if wake is None:
+            # Marché fermé ou aucune session : réveil à l'ouverture, ou pour purger les abonnements
+            wake = min(self.scheduler.seconds_until_open() or self.subscription_ttl, self.subscription_ttl)
+        return plan, wake
+
+    def poll_once(self, now: Optional[float] = None) -> float:
+        """Interroge les symboles arrivés à échéance ; retourne l'attente avant les suivants"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            plan, wake = self._plan(now)
+
+        for (api_source, api_key), symbols in plan:
+            start = time.perf_counter()
+            try:
+                results, failed = self.fetch(symbols, api_source, api_key)
+            except Exception:
+                logger.exception("Échec de l'interrogation %s", api_source)
+                with self._lock:
+                    self._errors += 1
+                continue
+            received = time.monotonic()
+            with self._lock:
+                fresh = self._store(results, api_source, received)
+                # Les échecs attendent leur prochain intervalle au lieu de boucler
+                for symbol in failed:
+                    self._last_polled[(api_source, symbol)] = received
+                self._polls += 1
+                self._last_poll_ms = (time.perf_counter() - start) * 1000
+            self._deliver(fresh, received)
+
+        return max(0.0, wake - (time.monotonic() - now))
+
+    def _run(self):
+        while not self._stopped.is_set():
+            delay = self.poll_once()
+            with self._lock:
+                if not self._subscriptions:
+                    # Plus aucune session : le thread s'arrête, il repartira au prochain abonnement
+                    self._thread = None
+                    return
+            self._wake.wait(delay)
+            self._wake.clear()
+
+    def stop(self, timeout: float = 5.0):
+        self._stopped.set()
+        self._wake.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "subscribers": len(self._subscriptions),
+                "symbols": len({s for sub in self._subscriptions.values() for s in sub.symbols}),
+                "phase": self.scheduler.phase(),
+                "polls": self._polls,
+                "errors": self._errors,
+                "version": self._version,
+                "last_poll_ms": self._last_poll_ms
+            }
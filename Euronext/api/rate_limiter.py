@@ -1,43 +1,194 @@
 # api/rate_limiter.py
-from datetime import datetime, timedelta
-from collections import deque
-import streamlit as st
+import heapq
+import itertools
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config.settings import RateLimitConfig
+
+# Classes de priorité : la plus petite passe en premier
+PRIORITY_INTERACTIVE = 0  # Cotations des symboles affichés
+PRIORITY_BACKGROUND = 1   # Rattrapage d'historiques
+
+
+class RateLimitExceeded(Exception):
+    """Aucun jeton obtenu avant l'échéance"""
+
+
+class _GCRA:
+    """Une limite « count requêtes par period secondes » (Generic Cell Rate Algorithm)
+
+    Un seul horodatage théorique (TAT) par limite : vérifier ou consommer
+    un jeton est en O(1). Une rafale de `count` requêtes reste permise.
+    """
+
+    __slots__ = ("count", "period", "emission", "tolerance", "tat")
+
+    def __init__(self, count: int, period: float):
+        self.count = count
+        self.period = period
+        self.emission = period / count
+        self.tolerance = period - self.emission
+        self.tat = 0.0
+
+    def wait(self, now: float) -> float:
+        """Secondes avant qu'un jeton soit disponible (0 : tout de suite)"""
+        return max(0.0, max(self.tat, now) - self.tolerance - now)
+
+    def take(self, now: float):
+        self.tat = max(self.tat, now) + self.emission
+
+    def remaining(self, now: float) -> int:
+        return max(0, int((now + self.tolerance + self.emission - max(self.tat, now)) // self.emission))
+
+    def reset(self):
+        self.tat = 0.0
+
+
+class ProviderLimiter:
+    """Budget de requêtes d'un fournisseur, partagé par tout le processus
+
+    Toutes les limites (ex. 5/min et 25/jour pour Alpha Vantage) doivent
+    accorder un jeton. Les demandes en attente sont servies par priorité
+    puis par ordre d'arrivée : un rattrapage en arrière-plan ne passe pas
+    devant le rafraîchissement d'un symbole affiché.
+    """
+
+    def __init__(self, name: str, limits: Iterable[Tuple[int, float]] = ()):
+        self.name = name
+        self._cells = [_GCRA(count, period) for count, period in limits]
+        self._cond = threading.Condition()
+        self._waiting: List[Tuple[int, int]] = []
+        self._seq = itertools.count()
+        self._acquired = 0
+        self._timeouts = 0
+        self._wait_s = 0.0
+
+    @property
+    def limits(self) -> List[Tuple[int, float]]:
+        return [(cell.count, cell.period) for cell in self._cells]
+
+    def _wait_time(self, now: float) -> float:
+        return max((cell.wait(now) for cell in self._cells), default=0.0)
+
+    def _take(self, now: float):
+        for cell in self._cells:
+            cell.take(now)
+        self._acquired += 1
+
+    def acquire(self, priority: int = PRIORITY_INTERACTIVE, timeout: Optional[float] = None) -> bool:
+        """Attend un jeton au plus `timeout` secondes (None : sans limite) ; False si échéance"""
+        if not self._cells:
+            return True
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        with self._cond:
+            ticket = (priority, next(self._seq))
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    head = self._waiting[0] == ticket
+                    wait = self._wait_time(now)
+                    if head and wait <= 0:
+                        self._take(now)
+                        self._wait_s += now - start
+                        return True
+                    # Jeton disponible trop tard : inutile d'attendre l'échéance
+                    if deadline is not None and (now >= deadline or wait > deadline - now):
+                        self._timeouts += 1
+                        return False
+                    # La tête attend son jeton, les autres attendent de devenir la tête
+                    delay = wait if head else None
+                    if deadline is not None:
+                        delay = deadline - now if delay is None else min(delay, deadline - now)
+                    self._cond.wait(delay)
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+
+    def try_acquire(self, priority: int = PRIORITY_INTERACTIVE) -> bool:
+        return self.acquire(priority, timeout=0)
+
+    def record(self):
+        """Compte une requête déjà partie, sans attendre"""
+        with self._cond:
+            self._take(time.monotonic())
+
+    def get_wait_time(self) -> float:
+        with self._cond:
+            return self._wait_time(time.monotonic())
+
+    def get_remaining(self) -> Optional[int]:
+        """Jetons disponibles sur la limite la plus stricte (None : illimité)"""
+        with self._cond:
+            now = time.monotonic()
+            return min((cell.remaining(now) for cell in self._cells), default=None)
+
+    def reset(self):
+        with self._cond:
+            for cell in self._cells:
+                cell.reset()
+            self._cond.notify_all()
+
+    def get_stats(self) -> Dict:
+        with self._cond:
+            now = time.monotonic()
+            return {
+                "limits": self.limits,
+                "remaining": min((cell.remaining(now) for cell in self._cells), default=None),
+                "acquired": self._acquired,
+                "timeouts": self._timeouts,
+                "waiting": len(self._waiting),
+                "wait_s": round(self._wait_s, 3)
+            }
+
+
+_limiters: Dict[str, ProviderLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(provider: str, limits: Optional[Iterable[Tuple[int, float]]] = None) -> ProviderLimiter:
+    """Limiteur partagé du fournisseur ('yahoo', 'alpha'), limites de RateLimitConfig par défaut"""
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            if limits is None:
+                limits = RateLimitConfig.LIMITS.get(provider, ())
+            limiter = ProviderLimiter(provider, limits)
+            _limiters[provider] = limiter
+        return limiter
+
 
 class RateLimiter:
-    def __init__(self, max_requests=30, time_window=60):
+    """Interface historique, adossée à un `ProviderLimiter` partagé
+
+    Les requêtes sont comptées pour tout le processus et non plus par
+    session Streamlit.
+    """
+
+    def __init__(self, max_requests=30, time_window=60, provider=None):
         self.max_requests = max_requests
         self.time_window = time_window
-        
-        if 'request_history' not in st.session_state:
-            st.session_state.request_history = deque()
-    
-    def _clean_old_requests(self):
-        now = datetime.now()
-        valid_requests = deque()
-        for ts in st.session_state.request_history:
-            if ts > now - timedelta(seconds=self.time_window):
-                valid_requests.append(ts)
-        st.session_state.request_history = valid_requests
-    
+        self.limiter = get_limiter(provider or f"{max_requests}/{time_window}s", [(max_requests, time_window)])
+
     def can_proceed(self):
-        self._clean_old_requests()
-        return len(st.session_state.request_history) < self.max_requests
-    
+        return self.limiter.get_wait_time() <= 0
+
     def add_request(self):
-        self._clean_old_requests()
-        st.session_state.request_history.append(datetime.now())
-    
+        self.limiter.record()
+
+    def acquire(self, priority=PRIORITY_INTERACTIVE, timeout=None):
+        return self.limiter.acquire(priority, timeout)
+
     def get_remaining_requests(self):
-        self._clean_old_requests()
-        return max(0, self.max_requests - len(st.session_state.request_history))
-    
+        remaining = self.limiter.get_remaining()
+        return self.max_requests if remaining is None else remaining
+
     def get_wait_time(self):
-        self._clean_old_requests()
-        if len(st.session_state.request_history) >= self.max_requests:
-            oldest = min(st.session_state.request_history)
-            wait = (oldest + timedelta(seconds=self.time_window) - datetime.now()).total_seconds()
-            return max(0, wait)
-        return 0
-    
+        return self.limiter.get_wait_time()
+
     def clear_history(self):
-        st.session_state.request_history = deque()
+        self.limiter.reset()
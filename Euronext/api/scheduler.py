@@ -0,0 +1,100 @@
+# api/scheduler.py - Intervalle d'interrogation selon la séance, la volatilité et l'audience
+import math
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from config.settings import PollerConfig
+from utils import market_calendar
+
+# Multiplicateur de l'intervalle par phase ; absent = pas d'interrogation
+PHASE_FACTORS = {
+    market_calendar.PRE_OPEN: 3.0,          # Seuls les prix indicatifs bougent
+    market_calendar.CONTINUOUS: 1.0,
+    market_calendar.CLOSING_AUCTION: 0.5,   # Formation du cours de clôture
+}
+
+SESSION_SECONDS = 8.5 * 3600
+
+
+class PollScheduler:
+    """Décide, symbole par symbole, de l'intervalle entre deux interrogations
+
+    L'intervalle demandé par les sessions (le curseur de fréquence) est
+    multiplié selon la phase de séance d'Euronext Paris, raccourci pour un
+    titre plus volatil que la référence ou suivi par plusieurs sessions,
+    puis borné à [min_interval, max_interval]. Marché fermé : `interval`
+    retourne None et le poller attend la prochaine pré-ouverture.
+    """
+
+    def __init__(
+        self,
+        market_hours: bool = PollerConfig.MARKET_HOURS,
+        min_interval: float = PollerConfig.MIN_INTERVAL,
+        max_interval: float = PollerConfig.MAX_INTERVAL,
+        reference_volatility: float = PollerConfig.REFERENCE_VOLATILITY,
+        clock: Callable[[], datetime] = lambda: datetime.now(market_calendar.PARIS)
+    ):
+        self.market_hours = market_hours
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.clock = clock
+        # Variance de référence par seconde de séance
+        self._reference_variance = reference_volatility ** 2 / SESSION_SECONDS
+
+        self._lock = threading.Lock()
+        self._last: Dict[str, tuple] = {}        # symbole -> (horodatage, prix)
+        self._variance: Dict[str, float] = {}    # variance des rendements par seconde (EWMA)
+        self._observations: Dict[str, int] = {}
+
+    def phase(self) -> str:
+        if not self.market_hours:
+            return market_calendar.CONTINUOUS
+        return market_calendar.market_phase(self.clock())
+
+    def observe(self, symbol: str, price: float, ts: float):
+        """Intègre un prix reçu (ts en secondes monotones) dans la volatilité du symbole"""
+        if not price or price <= 0:
+            return
+        with self._lock:
+            last = self._last.get(symbol)
+            self._last[symbol] = (ts, price)
+            if last is None or ts <= last[0] or last[1] <= 0:
+                return
+            variance = math.log(price / last[1]) ** 2 / (ts - last[0])
+            previous = self._variance.get(symbol)
+            self._variance[symbol] = variance if previous is None else (
+                previous + PollerConfig.VOLATILITY_ALPHA * (variance - previous)
+            )
+            self._observations[symbol] = self._observations.get(symbol, 0) + 1
+
+    def _volatility_factor(self, symbol: str) -> float:
+        """> 1 pour un titre calme, < 1 pour un titre agité, 1 sans historique"""
+        with self._lock:
+            if self._observations.get(symbol, 0) < 3:
+                return 1.0
+            variance = self._variance[symbol]
+        if variance <= 0:
+            return 2.0
+        return min(2.0, max(0.5, math.sqrt(self._reference_variance / variance)))
+
+    def interval(self, symbol: str, base: float, watchers: int = 1, phase: Optional[str] = None) -> Optional[float]:
+        """Secondes avant la prochaine interrogation de `symbol`, None si le marché est fermé"""
+        factor = PHASE_FACTORS.get(phase or self.phase())
+        if factor is None:
+            return None
+        interval = base * factor * self._volatility_factor(symbol)
+        # Une interrogation profite à toutes les sessions qui suivent le titre
+        interval /= 1 + 0.25 * math.log2(max(watchers, 1))
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def seconds_until_open(self) -> float:
+        if not self.market_hours:
+            return 0.0
+        return market_calendar.seconds_until_open(self.clock())
+
+    def forget(self, symbol: str):
+        with self._lock:
+            self._last.pop(symbol, None)
+            self._variance.pop(symbol, None)
+            self._observations.pop(symbol, None)
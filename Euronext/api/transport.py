@@ -0,0 +1,153 @@
+# api/transport.py - Transport HTTP partagé par fournisseur
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from api.rate_limiter import PRIORITY_INTERACTIVE, ProviderLimiter, RateLimitExceeded, get_limiter
+from config.settings import APIConfig
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Connection': 'keep-alive'
+}
+
+
+class HTTPTransport:
+    """Session HTTP keep-alive avec pool de connexions et reprises
+
+    Une instance est partagée par tous les threads qui interrogent un même
+    fournisseur : les connexions TCP/TLS sont réutilisées d'un appel à
+    l'autre. Les erreurs réseau et les codes 429/5xx sont rejoués avec un
+    backoff exponentiel à jitter, en respectant `Retry-After` quand il est
+    fourni, sans dépasser `total_timeout` secondes au total. Avec un
+    `limiter`, chaque envoi (reprises comprises) consomme un jeton du
+    budget du fournisseur.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = APIConfig.POOL_SIZE,
+        connect_timeout: float = APIConfig.CONNECT_TIMEOUT,
+        read_timeout: float = APIConfig.READ_TIMEOUT,
+        max_retries: int = APIConfig.MAX_RETRIES,
+        backoff_factor: float = APIConfig.BACKOFF_FACTOR,
+        total_timeout: float = APIConfig.TIMEOUT,
+        headers: Optional[Dict] = None,
+        limiter: Optional[ProviderLimiter] = None
+    ):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.total_timeout = total_timeout
+        self.limiter = limiter
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._retries = 0
+
+    def _backoff(self, attempt: int) -> float:
+        """Délai avant la reprise n° attempt (full jitter)"""
+        return random.uniform(0, self.backoff_factor * (2 ** attempt))
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> Optional[float]:
+        """Lit l'en-tête Retry-After (secondes ou date HTTP)"""
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            when = parsedate_to_datetime(value)
+            return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+    def get(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None,
+            priority: int = PRIORITY_INTERACTIVE, timeout: Optional[float] = None) -> requests.Response:
+        """GET avec reprises ; lève l'erreur réseau si toutes échouent
+
+        `timeout` réduit le budget total de l'appel (échéance de l'appelant).
+        Lève RateLimitExceeded si le budget du fournisseur n'accorde pas de
+        jeton dans le délai restant.
+        """
+        start = time.monotonic()
+        budget = self.total_timeout if timeout is None else min(self.total_timeout, timeout)
+        attempt = 0
+
+        while True:
+            remaining = budget - (time.monotonic() - start)
+            if remaining <= 0:
+                raise requests.Timeout(f"Budget de {budget:.1f}s dépassé pour {url}")
+            if self.limiter is not None:
+                if not self.limiter.acquire(priority, timeout=remaining):
+                    raise RateLimitExceeded(f"Budget de requêtes {self.limiter.name} épuisé pour {url}")
+                remaining = max(0.01, budget - (time.monotonic() - start))
+
+            with self._lock:
+                self._requests += 1
+
+            # La lecture ne dépasse pas l'échéance restante
+            request_timeout = (min(self.timeout[0], remaining), min(self.timeout[1], remaining))
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=request_timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                response = None
+                delay = self._backoff(attempt)
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                delay = None
+                if response.status_code in (429, 503):
+                    delay = self._retry_after(response)
+                if delay is None:
+                    delay = self._backoff(attempt)
+
+            if time.monotonic() - start + delay > budget:
+                if response is None:
+                    raise requests.Timeout(f"Budget de {budget:.1f}s dépassé pour {url}")
+                return response
+
+            with self._lock:
+                self._retries += 1
+            time.sleep(delay)
+            attempt += 1
+
+    def get_stats(self) -> Dict:
+        """Retourne le nombre de requêtes envoyées et de reprises"""
+        with self._lock:
+            return {"requests": self._requests, "retries": self._retries}
+
+    def close(self):
+        self.session.close()
+
+
+_transports: Dict[str, HTTPTransport] = {}
+_transports_lock = threading.Lock()
+
+
+def get_transport(provider: str) -> HTTPTransport:
+    """Retourne le transport partagé du fournisseur ('yahoo', 'alpha')"""
+    with _transports_lock:
+        transport = _transports.get(provider)
+        if transport is None:
+            transport = HTTPTransport(limiter=get_limiter(provider))
+            _transports[provider] = transport
+        return transport
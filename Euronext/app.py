@@ -1,26 +1,47 @@
 # app.py - Version avec comparaison et données réelles uniquement
 import streamlit as st
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import pandas as pd
 import numpy as np
 import json
 import time
+import uuid
 import sqlite3
-import requests
 import os
 from pathlib import Path
-from streamlit.components.v1 import html
+from concurrent.futures import ThreadPoolExecutor, wait
 import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
-import ta
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
-import joblib
 import warnings
 warnings.filterwarnings('ignore')
 
+from config.settings import APIConfig, CacheConfig, FetchConfig, HistoryConfig, StorageConfig
+from api.cache import CacheManager
+from api.coalescing import CoalescingAPIManager
+from api.poller import QuotePoller
+from api.rate_limiter import PRIORITY_BACKGROUND, get_limiter
+from api.transport import get_transport
+from utils.history_sync import HistorySync
+from utils.write_behind import get_writer
+from utils.bars import BarAggregator, INTRADAY_TIMEFRAMES, RESAMPLE_RULES, merge_quote, resample_bars
+from utils.streaming_indicators import IncrementalIndicatorEngine
+from utils.market_calendar import PHASE_LABELS
+from components.charts import SingleSymbolChart, scatter_class
+from components.tables import historical_column_config
+from utils.decimation import decimate_line
+from utils.formatters import StockFormatter
+from utils import indicator_graph, panel_indicators
+from utils.lazy import lazy_import
+
+# Dépendances lourdes (apprentissage, analyse technique, graphiques express,
+# HTML embarqué) : importées seulement quand la fonctionnalité s'en sert
+px = lazy_import("plotly.express")
+components = lazy_import("streamlit.components.v1")
+ta = lazy_import("ta")
+joblib = lazy_import("joblib")
+sklearn_ensemble = lazy_import("sklearn.ensemble")
+sklearn_preprocessing = lazy_import("sklearn.preprocessing")
+sklearn_model_selection = lazy_import("sklearn.model_selection")
+
 # ==================== CONFIGURATION DE LA PAGE ====================
 st.set_page_config(
     page_title="Dashboard Financier Pro MC.PA",
@@ -30,53 +51,98 @@ st.set_page_config(
 )
 
 # ==================== INITIALISATION SESSION STATE ====================
-if 'last_update' not in st.session_state:
-    st.session_state.last_update = datetime.now()
-if 'data_history' not in st.session_state:
-    st.session_state.data_history = []
-if 'update_counter' not in st.session_state:
-    st.session_state.update_counter = 0
-if 'current_symbols' not in st.session_state:
-    st.session_state.current_symbols = ["MC.PA"]
-if 'paused' not in st.session_state:
-    st.session_state.paused = False
-if 'alerts' not in st.session_state:
-    st.session_state.alerts = []
-if 'api_source' not in st.session_state:
-    st.session_state.api_source = "Yahoo Finance"
-if 'api_key' not in st.session_state:
-    st.session_state.api_key = ""
-if 'db_initialized' not in st.session_state:
-    st.session_state.db_initialized = False
-if 'comparison_mode' not in st.session_state:
-    st.session_state.comparison_mode = False  # Mode comparaison
-if 'favorites' not in st.session_state:
-    st.session_state.favorites = []
-if 'ml_model_trained' not in st.session_state:
-    st.session_state.ml_model_trained = False
-if 'ml_predictions' not in st.session_state:
-    st.session_state.ml_predictions = {}
+def init_session_state():
+    """Valeurs par défaut de la session"""
+    if 'last_update' not in st.session_state:
+        st.session_state.last_update = datetime.now()
+    if 'data_history' not in st.session_state:
+        st.session_state.data_history = []
+    if 'update_counter' not in st.session_state:
+        st.session_state.update_counter = 0
+    if 'current_symbols' not in st.session_state:
+        st.session_state.current_symbols = ["MC.PA"]
+    if 'paused' not in st.session_state:
+        st.session_state.paused = False
+    if 'alerts' not in st.session_state:
+        st.session_state.alerts = []
+    if 'api_source' not in st.session_state:
+        st.session_state.api_source = "Yahoo Finance"
+    if 'api_key' not in st.session_state:
+        st.session_state.api_key = ""
+    if 'db_initialized' not in st.session_state:
+        st.session_state.db_initialized = False
+    if 'comparison_mode' not in st.session_state:
+        st.session_state.comparison_mode = False  # Mode comparaison
+    if 'favorites' not in st.session_state:
+        st.session_state.favorites = []
+    if 'ml_model_trained' not in st.session_state:
+        st.session_state.ml_model_trained = False
+    if 'ml_predictions' not in st.session_state:
+        st.session_state.ml_predictions = {}
+    if 'timeframe' not in st.session_state:
+        st.session_state.timeframe = "Jour"
+    if 'session_id' not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex  # Abonnement au poller commun
+
+init_session_state()
 
 # ==================== CONFIGURATION DES CHEMINS ====================
 BASE_DIR = Path(__file__).parent
-DB_PATH = BASE_DIR / "stock_data.db"
+DB_PATH = Path(StorageConfig.DB_PATH)
 EXPORT_DIR = BASE_DIR / "exports"
 MODELS_DIR = BASE_DIR / "models"
 EXPORT_DIR.mkdir(exist_ok=True)
 MODELS_DIR.mkdir(exist_ok=True)
 
+# Cache commun à toutes les sessions : un symbole suivi par 30 onglets
+# ne déclenche qu'un appel amont par TTL
+quote_cache = CacheManager(default_ttl=CacheConfig.QUOTE_TTL, namespace="quote")
+history_cache = CacheManager(default_ttl=CacheConfig.HISTORY_TTL, namespace="history")
+
+# Historiques stockés en local, seules les dernières barres transitent ;
+# une instance par processus pour que ses verrous valent pour toutes les sessions
+@st.cache_resource
+def get_history_sync(db_path):
+    return HistorySync(db_path)
+
+history_sync = get_history_sync(DB_PATH)
+
+# Barres intrajournalières construites à partir des cotations reçues,
+# conservées d'un rerun à l'autre
+@st.cache_resource
+def get_bar_aggregator():
+    return BarAggregator()
+
+bar_aggregator = get_bar_aggregator()
+
+# État des indicateurs par (symbole, unité), seules les nouvelles barres sont calculées
+@st.cache_resource
+def get_indicator_engine():
+    return IncrementalIndicatorEngine()
+
+indicator_engine = get_indicator_engine()
+
+TIMEFRAMES = {
+    "1 min": "1m",
+    "5 min": "5m",
+    "15 min": "15m",
+    "1 heure": "1h",
+    "Jour": "1d",
+    "Semaine": "W",
+    "Mois": "M",
+    "Trimestre": "Q"
+}
+
 # ==================== API RÉELLES ====================
 class RealAPIManager:
     """Gestionnaire d'APIs financières réelles"""
     
     @staticmethod
-    def get_yahoo_finance_data(symbol):
+    def get_yahoo_finance_data(symbol, timeout=None):
         """Récupère les données via Yahoo Finance"""
         try:
-            url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
-            headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-            
-            response = requests.get(url, headers=headers, timeout=10)
+            url = f"{APIConfig.YAHOO_BASE_URL}/v8/finance/chart/{symbol}"
+            response = get_transport("yahoo").get(url, timeout=timeout)
             
             if response.status_code == 200:
                 data = response.json()
@@ -85,38 +151,97 @@ class RealAPIManager:
                     meta = result.get('meta', {})
                     
                     price = meta.get('regularMarketPrice', 0)
-                    previous_close = meta.get('previousClose', price)
-                    change = ((price - previous_close) / previous_close) * 100 if previous_close > 0 else 0
-                    
-                    return {
-                        'success': True,
-                        'symbol': symbol,
-                        'price': round(price, 2),
-                        'change': round(change, 2),
-                        'volume': meta.get('regularMarketVolume', 0),
-                        'source': 'Yahoo Finance',
-                        'currency': meta.get('currency', 'EUR'),
-                        'timestamp': datetime.now().isoformat()
-                    }
+                    return RealAPIManager._build_yahoo_quote(
+                        symbol,
+                        price,
+                        meta.get('previousClose', price),
+                        meta.get('regularMarketVolume', 0),
+                        meta.get('currency', 'EUR')
+                    )
             return {'success': False, 'error': 'No data available', 'symbol': symbol}
         except Exception as e:
             return {'success': False, 'error': str(e), 'symbol': symbol}
     
     @staticmethod
-    def get_alpha_vantage_data(symbol, api_key):
+    def _build_yahoo_quote(symbol, price, previous_close, volume, currency):
+        """Construit le dictionnaire de cotation commun aux appels Yahoo"""
+        change = ((price - previous_close) / previous_close) * 100 if previous_close > 0 else 0
+        return {
+            'success': True,
+            'symbol': symbol,
+            'price': round(price, 2),
+            'change': round(change, 2),
+            'volume': volume,
+            'source': 'Yahoo Finance',
+            'currency': currency,
+            'timestamp': datetime.now().isoformat()
+        }
+    
+    @staticmethod
+    def get_yahoo_finance_batch(symbols, batch_size=None, timeout=None):
+        """Récupère les cotations de plusieurs symboles, une requête par lot
+        
+        Retourne un dictionnaire symbole -> résultat au même format que
+        `get_yahoo_finance_data`. Si l'endpoint multi-symboles refuse un lot,
+        ce lot est récupéré symbole par symbole. Avec `timeout`, aucune
+        requête ne part au-delà de l'échéance.
+        """
+        batch_size = batch_size or APIConfig.QUOTE_BATCH_SIZE
+        end = None if timeout is None else time.monotonic() + timeout
+        remaining = lambda: None if end is None else end - time.monotonic()
+        results = {}
+        
+        for i in range(0, len(symbols), batch_size):
+            chunk = list(symbols[i:i + batch_size])
+            try:
+                url = f"{APIConfig.YAHOO_BASE_URL}/v7/finance/quote"
+                params = {'symbols': ','.join(chunk)}
+                response = get_transport("yahoo").get(url, params=params, timeout=remaining())
+                
+                if response.status_code != 200:
+                    for symbol in chunk:
+                        results[symbol] = RealAPIManager.get_yahoo_finance_data(symbol, remaining())
+                    continue
+                
+                data = response.json()
+                quotes = data.get('quoteResponse', {}).get('result') or []
+                for quote in quotes:
+                    symbol = quote.get('symbol')
+                    if symbol not in chunk or 'regularMarketPrice' not in quote:
+                        continue
+                    price = quote.get('regularMarketPrice', 0)
+                    results[symbol] = RealAPIManager._build_yahoo_quote(
+                        symbol,
+                        price,
+                        quote.get('regularMarketPreviousClose', price),
+                        quote.get('regularMarketVolume', 0),
+                        quote.get('currency', 'EUR')
+                    )
+                
+                for symbol in chunk:
+                    if symbol not in results:
+                        results[symbol] = {'success': False, 'error': 'No data available', 'symbol': symbol}
+            except Exception as e:
+                for symbol in chunk:
+                    results[symbol] = {'success': False, 'error': str(e), 'symbol': symbol}
+        
+        return results
+    
+    @staticmethod
+    def get_alpha_vantage_data(symbol, api_key, timeout=None):
         """Récupère les données via Alpha Vantage"""
         if not api_key:
             return {'success': False, 'error': 'API key required', 'symbol': symbol}
         
         try:
-            url = "https://www.alphavantage.co/query"
+            url = APIConfig.ALPHA_VANTAGE_URL
             params = {
                 'function': 'GLOBAL_QUOTE',
                 'symbol': symbol,
                 'apikey': api_key
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = get_transport("alpha").get(url, params=params, timeout=timeout)
             
             if response.status_code == 200:
                 data = response.json()
@@ -138,15 +263,25 @@ class RealAPIManager:
             return {'success': False, 'error': str(e), 'symbol': symbol}
     
     @staticmethod
-    def get_historical_data(symbol, api_source="yahoo", api_key=None):
-        """Récupère les données historiques"""
+    def get_historical_data(symbol, api_source="yahoo", api_key=None, period="1mo", interval="1d", start=None):
+        """Récupère les données historiques
+        
+        Avec `start` (datetime UTC), seules les barres à partir de cette date
+        sont demandées au lieu de toute la période `period`. Ces requêtes
+        passent après les cotations dans le budget du fournisseur.
+        """
         try:
             if api_source == "yahoo" or api_source == "Yahoo Finance":
-                url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
-                params = {'range': '1mo', 'interval': '1d'}
-                headers = {'User-Agent': 'Mozilla/5.0'}
-                
-                response = requests.get(url, params=params, headers=headers, timeout=10)
+                url = f"{APIConfig.YAHOO_BASE_URL}/v8/finance/chart/{symbol}"
+                if start is not None:
+                    params = {
+                        'period1': int(start.replace(tzinfo=timezone.utc).timestamp()),
+                        'period2': int(time.time()),
+                        'interval': interval
+                    }
+                else:
+                    params = {'range': period, 'interval': interval}
+                response = get_transport("yahoo").get(url, params=params, priority=PRIORITY_BACKGROUND)
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -169,16 +304,15 @@ class RealAPIManager:
             elif api_source == "alpha" or api_source == "Alpha Vantage":
                 if not api_key:
                     return None
-                url = "https://www.alphavantage.co/query"
+                url = APIConfig.ALPHA_VANTAGE_URL
                 params = {
                     'function': 'TIME_SERIES_DAILY',
                     'symbol': symbol,
                     'apikey': api_key,
-                    'outputsize': 'compact'
+                    # 'compact' = 100 dernières séances, suffisant pour une mise à jour
+                    'outputsize': 'compact' if start is not None or period in ('1mo', '3mo') else 'full'
                 }
-                headers = {'User-Agent': 'Mozilla/5.0'}
-                
-                response = requests.get(url, params=params, headers=headers, timeout=10)
+                response = get_transport("alpha").get(url, params=params, priority=PRIORITY_BACKGROUND)
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -195,6 +329,8 @@ class RealAPIManager:
                                 'volume': int(values['5. volume'])
                             })
                         df = pd.DataFrame(records)
+                        if start is not None:
+                            df = df[df['date'] >= pd.Timestamp(start)]
                         return df.sort_values('date')
             
             return None
@@ -202,28 +338,143 @@ class RealAPIManager:
             st.error(f"Erreur historique {symbol}: {e}")
             return None
 
+# Les appels identiques simultanés (plusieurs sessions au même tick)
+# partagent une seule requête HTTP ; une seule instance par processus,
+# le script étant réexécuté à chaque rerun
+@st.cache_resource
+def get_api_manager():
+    return CoalescingAPIManager(RealAPIManager)
+
+api_manager = get_api_manager()
+
 # ==================== RÉCUPÉRATION DONNÉES ====================
-def get_live_data(symbol, api_source="Yahoo Finance", api_key=""):
+def get_live_data(symbol, api_source="Yahoo Finance", api_key="", timeout=None):
     """Récupère les données en direct depuis les APIs réelles"""
+    cache_key = quote_cache._generate_key("quote", api_source, symbol)
+    cached = quote_cache.get(cache_key)
+    if cached is not None:
+        return cached
     
     if api_source == "Yahoo Finance":
-        result = RealAPIManager.get_yahoo_finance_data(symbol)
-        return result
+        result = api_manager.get_yahoo_finance_data(symbol, timeout)
     
     elif api_source == "Alpha Vantage" and api_key:
-        result = RealAPIManager.get_alpha_vantage_data(symbol, api_key)
-        return result
+        result = api_manager.get_alpha_vantage_data(symbol, api_key, timeout)
+    
+    else:
+        return {'success': False, 'error': 'No API selected', 'symbol': symbol}
+    
+    if result['success']:
+        quote_cache.set(cache_key, result)
+    return result
+
+def get_history_data(symbol, hist_source="yahoo", api_key=None, interval="1d"):
+    """Récupère l'historique depuis SQLite, complété par les barres manquantes"""
+    cache_key = history_cache._generate_key("history", hist_source, symbol, interval)
+    cached = history_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    def fetch(start, period):
+        return api_manager.get_historical_data(
+            symbol, hist_source, api_key, period=period, interval=interval, start=start
+        )
+    
+    result = history_sync.get_series(hist_source, symbol, interval, fetch)
+    if result is not None:
+        history_cache.set(cache_key, result)
+    return result
+
+def get_timeframe_data(symbol, timeframe, hist_source="yahoo", api_key=None, quote=None):
+    """Barres d'un symbole dans l'unité demandée, calculées localement
     
-    return {'success': False, 'error': 'No API selected', 'symbol': symbol}
+    Les unités intrajournalières viennent des cotations agrégées, les
+    semaines/mois/trimestres du regroupement de l'historique journalier :
+    changer d'unité ne déclenche aucun appel au fournisseur. Une cotation
+    `quote` prolonge la dernière barre journalière.
+    """
+    if timeframe in INTRADAY_TIMEFRAMES:
+        return bar_aggregator.get_bars(symbol, timeframe)
+    
+    hist_data = get_history_data(symbol, hist_source, api_key)
+    if quote is not None:
+        hist_data = merge_quote(hist_data, quote['timestamp'], quote['price'], quote.get('volume'))
+    if hist_data is not None and timeframe in RESAMPLE_RULES:
+        return resample_bars(hist_data, timeframe)
+    return hist_data
+
+def display_window(df, days=HistoryConfig.DISPLAY_DAYS):
+    """Restreint un historique aux derniers jours affichés"""
+    return df[df['date'] >= df['date'].max() - pd.Timedelta(days=days)]
+
+# Pool de threads unique pour toutes les sessions : le nombre de requêtes
+# simultanées reste borné quel que soit le nombre d'onglets ouverts
+@st.cache_resource
+def get_quote_executor():
+    return ThreadPoolExecutor(max_workers=FetchConfig.POOL_SIZE, thread_name_prefix="quotes")
 
-def get_multiple_symbols_data(symbols, api_source, api_key):
-    """Récupère les données pour plusieurs symboles"""
+def get_multiple_symbols_data(symbols, api_source, api_key, max_workers=None, deadline=None, batch_size=None):
+    """Récupère les données pour plusieurs symboles en parallèle
+    
+    Avec Yahoo Finance, les symboles sont regroupés en lots de `batch_size`
+    (une requête HTTP par lot) ; Alpha Vantage reste à un appel par symbole.
+    Les lots sont répartis sur au plus `max_workers` tâches du pool partagé
+    et partagent une échéance globale, transmise au transport : aucune
+    requête ne part ni ne se prolonge au-delà. Les symboles non reçus à
+    temps sont listés dans `failed` avec ceux dont l'appel a échoué.
+    """
     results = {}
     failed = []
+    if not symbols:
+        return results, failed
     
+    # Les symboles déjà en cache ne repartent pas chez le fournisseur
+    cached = {}
     for symbol in symbols:
-        data = get_live_data(symbol, api_source, api_key)
-        if data['success']:
+        data = quote_cache.get(quote_cache._generate_key("quote", api_source, symbol))
+        if data is not None:
+            cached[symbol] = data
+    pending = [symbol for symbol in symbols if symbol not in cached]
+    
+    if api_source == "Yahoo Finance":
+        batch_size = batch_size or APIConfig.QUOTE_BATCH_SIZE
+        chunks = [tuple(pending[i:i + batch_size]) for i in range(0, len(pending), batch_size)]
+        fetch = lambda chunk, timeout: api_manager.get_yahoo_finance_batch(chunk, batch_size, timeout)
+    else:
+        chunks = [(symbol,) for symbol in pending]
+        fetch = lambda chunk, timeout: {chunk[0]: get_live_data(chunk[0], api_source, api_key, timeout)}
+    
+    received = {}
+    if chunks:
+        lanes = min(len(chunks), max_workers or FetchConfig.MAX_WORKERS)
+        deadline = FetchConfig.DEADLINE if deadline is None else deadline
+        end = time.monotonic() + deadline
+        
+        def run_lane(lane):
+            for chunk in lane:
+                remaining = end - time.monotonic()
+                if remaining <= 0:
+                    return
+                try:
+                    chunk_results = fetch(chunk, remaining)
+                except Exception:
+                    continue
+                for symbol, data in chunk_results.items():
+                    if data and data['success']:
+                        quote_cache.set(quote_cache._generate_key("quote", api_source, symbol), data)
+                        received[symbol] = data
+        
+        futures = [get_quote_executor().submit(run_lane, chunks[i::lanes]) for i in range(lanes)]
+        wait(futures, timeout=deadline)
+        # Les tâches pas encore démarrées sont abandonnées ; une requête en
+        # cours s'arrête à l'échéance et son résultat reste en cache
+        for future in futures:
+            future.cancel()
+    fetched = dict(received)
+    
+    for symbol in symbols:
+        data = cached.get(symbol) or fetched.get(symbol)
+        if data:
             results[symbol] = data
         else:
             failed.append(symbol)
@@ -233,91 +484,52 @@ def get_multiple_symbols_data(symbols, api_source, api_key):
 # ==================== INDICATEURS TECHNIQUES ====================
 class TechnicalIndicators:
     @staticmethod
-    def calculate_all(df):
+    def calculate_all(df, key=None):
+        """Ajoute RSI, MACD, Bollinger et SMA 20/50
+        
+        Avec `key` (ex. (symbole, unité)), le calcul est incrémental :
+        seules les barres nouvelles depuis l'appel précédent sont traitées.
+        """
         if df is None or df.empty:
             return None
-            
-        df = df.copy()
-        
-        # RSI
-        df['rsi'] = ta.momentum.RSIIndicator(df['close'], window=14).rsi()
         
-        # MACD
-        macd = ta.trend.MACD(df['close'])
-        df['macd'] = macd.macd()
-        df['macd_signal'] = macd.macd_signal()
-        df['macd_diff'] = macd.macd_diff()
+        if key is not None:
+            return indicator_engine.calculate(df, key)
         
-        # Bollinger Bands
-        bollinger = ta.volatility.BollingerBands(df['close'])
-        df['bb_upper'] = bollinger.bollinger_hband()
-        df['bb_middle'] = bollinger.bollinger_mavg()
-        df['bb_lower'] = bollinger.bollinger_lband()
-        
-        # Moyennes mobiles
-        df['sma_20'] = ta.trend.sma_indicator(df['close'], window=20)
-        df['sma_50'] = ta.trend.sma_indicator(df['close'], window=50)
+        # Graphe d'indicateurs : EMA et sommes glissantes partagées, résultats mémorisés
+        df = df.copy()
+        values = indicator_graph.engine.evaluate(
+            df['close'].to_numpy(dtype=float),
+            indicator_graph.TECHNICAL_INDICATORS
+        )
+        for column, series in values.items():
+            df[column] = series
         
         return df
 
+def scan_watchlist(symbols):
+    """Derniers indicateurs de chaque symbole, calculés en une passe sur le panel"""
+    histories = {symbol: get_history_data(symbol) for symbol in symbols}
+    _, panel_symbols, closes = panel_indicators.build_panel(histories)
+    values = panel_indicators.calculate_all(closes)
+    latest = {name: panel_indicators.latest(panel) for name, panel in values.items()}
+    return {
+        symbol: {name: float(column[j]) for name, column in latest.items()}
+        for j, symbol in enumerate(panel_symbols)
+    }
+
 # ==================== GRAPHIQUES ====================
 def create_single_chart(df, symbol):
     """Graphique pour un seul symbole"""
-    if df is None or df.empty:
-        return None
-    
-    fig = make_subplots(
-        rows=3, cols=1,
-        shared_xaxes=True,
-        vertical_spacing=0.05,
-        row_heights=[0.5, 0.25, 0.25],
-        subplot_titles=(f"{symbol} - Prix", "Volume", "RSI")
-    )
-    
-    # Prix
-    fig.add_trace(go.Candlestick(
-        x=df['date'],
-        open=df['open'],
-        high=df['high'],
-        low=df['low'],
-        close=df['close'],
-        name='Prix',
-        showlegend=False
-    ), row=1, col=1)
-    
-    # Volume
-    colors = ['red' if df['close'].iloc[i] < df['open'].iloc[i] else 'green' 
-              for i in range(len(df))]
-    
-    fig.add_trace(go.Bar(
-        x=df['date'],
-        y=df['volume'],
-        name='Volume',
-        marker_color=colors,
-        showlegend=False
-    ), row=2, col=1)
-    
-    # RSI
-    if 'rsi' in df.columns:
-        fig.add_trace(go.Scatter(
-            x=df['date'],
-            y=df['rsi'],
-            line=dict(color='purple'),
-            name='RSI',
-            showlegend=False
-        ), row=3, col=1)
-        
-        fig.add_hline(y=70, line_dash="dash", line_color="red", row=3, col=1)
-        fig.add_hline(y=30, line_dash="dash", line_color="green", row=3, col=1)
-    
-    fig.update_layout(
-        height=800,
-        template='plotly_white',
-        showlegend=False,
-        hovermode='x unified'
-    )
-    
-    return fig
+    return SingleSymbolChart(symbol).update(df)
+
+def get_single_chart(symbol, timeframe):
+    """Graphique de la session pour (symbole, unité), réutilisé d'un rafraîchissement à l'autre"""
+    key, chart = st.session_state.get('single_chart', (None, None))
+    if key != (symbol, timeframe):
+        chart = SingleSymbolChart(symbol)
+        st.session_state.single_chart = ((symbol, timeframe), chart)
+    return chart
 
 def create_comparison_chart(symbols_data):
     """Graphique de comparaison pour plusieurs symboles"""
@@ -325,14 +537,18 @@ def create_comparison_chart(symbols_data):
     
     for symbol, data in symbols_data.items():
         # Récupérer données historiques pour normalisation
-        hist_data = RealAPIManager.get_historical_data(symbol)
+        hist_data = get_history_data(symbol)
         
         if hist_data is not None and not hist_data.empty:
+            hist_data = display_window(hist_data)
+            # Rendu WebGL selon la taille de la série, avant réduction des points
+            trace = scatter_class(len(hist_data))
+            hist_data = decimate_line(hist_data, 'date', 'close')
             # Normaliser à 100 pour comparaison
             base_price = hist_data['close'].iloc[0]
             normalized_prices = (hist_data['close'] / base_price) * 100
             
-            fig.add_trace(go.Scatter(
+            fig.add_trace(trace(
                 x=hist_data['date'],
                 y=normalized_prices,
                 mode='lines',
@@ -381,31 +597,183 @@ class DatabaseManager:
         except Exception as e:
             st.error(f"Erreur BDD: {e}")
     
+    INSERT_PRICE_SQL = '''
+        INSERT OR REPLACE INTO stock_prices 
+        (symbol, timestamp, price, change, volume, source)
+        VALUES (?, ?, ?, ?, ?, ?)
+    '''
+    
+    @property
+    def writer(self):
+        """Écrivain différé partagé par toutes les sessions"""
+        return get_writer(self.db_path, self.INSERT_PRICE_SQL)
+    
     def save_price(self, symbol, data):
+        """Met la cotation en file ; elle sera écrite par lot en arrière-plan"""
+        return self.writer.submit((
+            symbol,
+            datetime.now().isoformat(),
+            data.get('price', 0),
+            data.get('change', 0),
+            data.get('volume', 0),
+            data.get('source', 'API')
+        ))
+    
+    def load_ticks(self, symbol, since=None):
+        """Cotations stockées d'un symbole (timestamp, price, volume)"""
+        since = (since or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)).isoformat()
+        conn = sqlite3.connect(self.db_path)
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT OR REPLACE INTO stock_prices 
-                (symbol, timestamp, price, change, volume, source)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                symbol,
-                datetime.now().isoformat(),
-                data.get('price', 0),
-                data.get('change', 0),
-                data.get('volume', 0),
-                data.get('source', 'API')
-            ))
-            
-            conn.commit()
+            return pd.read_sql_query(
+                "SELECT timestamp, price, volume FROM stock_prices "
+                "WHERE symbol = ? AND timestamp >= ? ORDER BY timestamp",
+                conn, params=[symbol, since]
+            )
+        finally:
             conn.close()
-            return True
-        except Exception as e:
-            return False
+    
+    def get_writer_stats(self):
+        """Profondeur de file et latence des écritures"""
+        return self.writer.get_stats()
+
+def record_quote(db, symbol, data):
+    """Enregistre une cotation et l'intègre aux barres intrajournalières"""
+    if not bar_aggregator.is_seeded(symbol):
+        bar_aggregator.seed(symbol, db.load_ticks(symbol))
+    bar_aggregator.on_tick(symbol, data['timestamp'], data['price'], data['volume'])
+    return db.save_price(symbol, data)
+
+# Un seul thread interroge le fournisseur pour toutes les sessions ouvertes
+# et enregistre chaque cotation une fois ; les sessions lisent son instantané
+@st.cache_resource
+def get_quote_poller():
+    db = DatabaseManager()
+    
+    def on_update(results):
+        for symbol, data in results.items():
+            record_quote(db, symbol, data)
+    
+    return QuotePoller(get_multiple_symbols_data, on_update)
+
+quote_poller = get_quote_poller()
+
+def get_live_quotes(symbols, api_source, api_key, interval):
+    """Cotations publiées par le poller ; appel direct pour les symboles encore jamais interrogés
+    
+    L'appel direct n'a lieu qu'au premier abonnement à un symbole : s'il
+    échoue, les reprises sont laissées au poller et à son intervalle au
+    lieu de repartir à chaque rerun.
+    """
+    quote_poller.subscribe(st.session_state.session_id, symbols, api_source, api_key, interval)
+    first = quote_poller.claim_first_fetch(symbols, api_source)
+    if first:
+        fetched, _ = get_multiple_symbols_data(first, api_source, api_key)
+        quote_poller.publish(fetched, api_source)
+    results = quote_poller.latest(symbols, api_source)
+    failed = [symbol for symbol in symbols if symbol not in results]
+    return results, failed
 
 # ==================== INTERFACE PRINCIPALE ====================
+def render_comparison_live(symbols, api_source, api_key, interval, indicators):
+    """Tableau comparatif en direct (relancé seul à chaque intervalle)"""
+    with st.spinner(f"Chargement des données pour {len(symbols)} symboles..."):
+        results, failed = get_live_quotes(symbols, api_source, api_key, interval)
+    
+    if failed:
+        st.error(f"❌ Impossible de charger: {', '.join(failed)}")
+    
+    if results:
+        st.session_state.update_counter += 1
+        
+        # Tableau comparatif
+        st.subheader("📋 Comparaison en direct")
+        
+        comparison_data = []
+        for symbol, data in results.items():
+            rsi = indicators.get(symbol, {}).get('rsi', float('nan'))
+            comparison_data.append({
+                "Symbole": symbol,
+                "Prix": f"{data['price']:.2f} €",
+                "Variation": f"{data['change']:+.2f}%",
+                "Volume": f"{data['volume']:,}",
+                "RSI": f"{rsi:.1f}" if not np.isnan(rsi) else "N/A",
+                "Source": data['source']
+            })
+        
+        df = pd.DataFrame(comparison_data)
+        st.dataframe(df, use_container_width=True, hide_index=True)
+
+def render_single_live(symbol, api_source, api_key, interval):
+    """Métriques et graphique d'un symbole (relancés seuls à chaque intervalle)
+    
+    L'historique vient des caches, la cotation du poller : seule la
+    dernière barre et ses indicateurs sont recalculés.
+    """
+    with st.spinner(f"Chargement des données pour {symbol}..."):
+        results, _ = get_live_quotes([symbol], api_source, api_key, interval)
+    data = results.get(symbol) or {'success': False, 'error': 'Cotation indisponible'}
+    
+    if data['success']:
+        st.session_state.update_counter += 1
+        st.session_state.last_update = datetime.now()
+        
+        # Métriques principales
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Cours", f"{data['price']:.2f} €", f"{data['change']:+.2f}%")
+        with col2:
+            st.metric("Volume", f"{data['volume']:,}")
+        with col3:
+            st.metric("Source", data['source'])
+        with col4:
+            st.metric("Dernière MAJ", datetime.now().strftime('%H:%M:%S'))
+        
+        # Données historiques, prolongées par la cotation en direct
+        hist_source = "yahoo" if api_source == "Yahoo Finance" else "alpha"
+        timeframe = TIMEFRAMES[st.session_state.timeframe]
+        hist_data = get_timeframe_data(
+            symbol, 
+            timeframe,
+            hist_source, 
+            api_key if api_source == "Alpha Vantage" else None,
+            quote=data
+        )
+        
+        if hist_data is not None and not hist_data.empty:
+            # Indicateurs techniques
+            # Calcul sur tout l'historique stocké, affichage de la fenêtre récente
+            hist_data_with_indicators = TechnicalIndicators.calculate_all(hist_data, key=(symbol, timeframe))
+            if timeframe == "1d":
+                hist_data_with_indicators = display_window(hist_data_with_indicators)
+            
+            # Graphique
+            st.subheader("📈 Analyse technique")
+            fig = get_single_chart(symbol, timeframe).update(hist_data_with_indicators)
+            if fig:
+                st.plotly_chart(fig, use_container_width=True)
+            
+            # Dernières valeurs
+            with st.expander("📊 Voir les données historiques"):
+                st.dataframe(
+                    StockFormatter.format_historical_data(
+                        hist_data[['date', 'open', 'high', 'low', 'close', 'volume']].tail(10), numeric=True
+                    ),
+                    column_config=historical_column_config(),
+                    use_container_width=True,
+                    hide_index=True
+                )
+        else:
+            st.warning("Données historiques non disponibles")
+    
+    else:
+        st.error(f"❌ Erreur: {data.get('error', 'Inconnue')}")
+        st.info("""
+        Vérifiez:
+        - Votre connexion internet
+        - Le symbole est correct
+        - Votre clé API Alpha Vantage (si utilisée)
+        """)
+
 def main():
     st.title("📊 Dashboard Financier Pro - Données Réelles")
     st.caption("Mode Comparaison inclus • Yahoo Finance • Alpha Vantage")
@@ -443,6 +811,13 @@ def main():
                 index=all_symbols.index(st.session_state.current_symbols[0]) if st.session_state.current_symbols else 0
             )
             st.session_state.current_symbols = [symbol]
+            
+            timeframe_labels = list(TIMEFRAMES)
+            st.session_state.timeframe = st.selectbox(
+                "⏱️ Unité de temps",
+                timeframe_labels,
+                index=timeframe_labels.index(st.session_state.timeframe)
+            )
         
         # Source API
         st.subheader("🔌 Source API")
@@ -468,116 +843,52 @@ def main():
         
         st.markdown("---")
         st.metric("Mises à jour", st.session_state.update_counter)
+        flight_stats = api_manager.get_stats()
+        st.caption(f"Requêtes fusionnées: {flight_stats['merged']} / {flight_stats['calls']}")
+        limiter_stats = get_limiter("yahoo" if api_source == "Yahoo Finance" else "alpha").get_stats()
+        if limiter_stats['remaining'] is not None:
+            st.caption(f"Requêtes disponibles: {limiter_stats['remaining']} • en attente: {limiter_stats['waiting']}")
+        # Budget mémoire commun, taux de succès par cache
+        cache_stats = history_cache.backend.get_stats()
+        st.caption(
+            f"Cache: {cache_stats['memory_bytes'] / 2**20:.1f} / {cache_stats['max_bytes'] / 2**20:.0f} Mo • "
+            f"succès historiques: {history_cache.get_stats()['hit_rate']:.0%} • "
+            f"cotations: {quote_cache.get_stats()['hit_rate']:.0%} • évictions: {cache_stats['evictions']}"
+        )
+        writer_stats = db.get_writer_stats()
+        st.caption(
+            f"Écritures en attente: {writer_stats['queue_depth']} • "
+            f"dernier lot: {writer_stats['last_flush_ms']:.1f} ms"
+        )
+        poller_stats = quote_poller.get_stats()
+        st.caption(
+            f"Marché: {PHASE_LABELS[poller_stats['phase']]} • "
+            f"sessions abonnées: {poller_stats['subscribers']} • interrogations: {poller_stats['polls']}"
+        )
     
     # ==================== CORPS PRINCIPAL ====================
     
+    # Seules les parties en direct sont relancées à chaque intervalle ;
+    # sidebar, historiques et graphique de comparaison restent en place
+    run_every = None if st.session_state.get('paused', False) else refresh_rate
+    live_args = (st.session_state.api_source, st.session_state.api_key, refresh_rate)
+    
     if st.session_state.comparison_mode:
         # MODE COMPARAISON
         st.subheader("📊 Mode Comparaison Multi-symboles")
+        symbols = st.session_state.current_symbols
         
-        with st.spinner(f"Chargement des données pour {len(st.session_state.current_symbols)} symboles..."):
-            results, failed = get_multiple_symbols_data(
-                st.session_state.current_symbols,
-                st.session_state.api_source,
-                st.session_state.api_key
-            )
-        
-        if failed:
-            st.error(f"❌ Impossible de charger: {', '.join(failed)}")
+        # Graphique de comparaison (historiques journaliers)
+        fig_comp = create_comparison_chart(dict.fromkeys(symbols))
+        st.plotly_chart(fig_comp, use_container_width=True)
         
-        if results:
-            st.session_state.update_counter += 1
-            
-            # Graphique de comparaison
-            fig_comp = create_comparison_chart(results)
-            st.plotly_chart(fig_comp, use_container_width=True)
-            
-            # Tableau comparatif
-            st.subheader("📋 Comparaison en direct")
-            
-            comparison_data = []
-            for symbol, data in results.items():
-                comparison_data.append({
-                    "Symbole": symbol,
-                    "Prix": f"{data['price']:.2f} €",
-                    "Variation": f"{data['change']:+.2f}%",
-                    "Volume": f"{data['volume']:,}",
-                    "Source": data['source']
-                })
-            
-            df = pd.DataFrame(comparison_data)
-            st.dataframe(df, use_container_width=True, hide_index=True)
-            
-            # Sauvegarde BDD
-            for symbol, data in results.items():
-                db.save_price(symbol, data)
+        indicators = scan_watchlist(symbols)
+        st.fragment(render_comparison_live, run_every=run_every)(symbols, *live_args, indicators)
     
     else:
         # MODE SIMPLE
         symbol = st.session_state.current_symbols[0]
-        
-        with st.spinner(f"Chargement des données pour {symbol}..."):
-            data = get_live_data(symbol, st.session_state.api_source, st.session_state.api_key)
-        
-        if data['success']:
-            st.session_state.update_counter += 1
-            st.session_state.last_update = datetime.now()
-            
-            # Sauvegarde BDD
-            db.save_price(symbol, data)
-            
-            # Métriques principales
-            col1, col2, col3, col4 = st.columns(4)
-            with col1:
-                st.metric("Cours", f"{data['price']:.2f} €", f"{data['change']:+.2f}%")
-            with col2:
-                st.metric("Volume", f"{data['volume']:,}")
-            with col3:
-                st.metric("Source", data['source'])
-            with col4:
-                st.metric("Dernière MAJ", datetime.now().strftime('%H:%M:%S'))
-            
-            # Données historiques
-            hist_source = "yahoo" if st.session_state.api_source == "Yahoo Finance" else "alpha"
-            hist_data = RealAPIManager.get_historical_data(
-                symbol, 
-                hist_source, 
-                st.session_state.api_key if st.session_state.api_source == "Alpha Vantage" else None
-            )
-            
-            if hist_data is not None and not hist_data.empty:
-                # Indicateurs techniques
-                hist_data_with_indicators = TechnicalIndicators.calculate_all(hist_data)
-                
-                # Graphique
-                st.subheader("📈 Analyse technique")
-                fig = create_single_chart(hist_data_with_indicators, symbol)
-                if fig:
-                    st.plotly_chart(fig, use_container_width=True)
-                
-                # Dernières valeurs
-                with st.expander("📊 Voir les données historiques"):
-                    st.dataframe(
-                        hist_data[['date', 'open', 'high', 'low', 'close', 'volume']].tail(10),
-                        use_container_width=True,
-                        hide_index=True
-                    )
-            else:
-                st.warning("Données historiques non disponibles")
-        
-        else:
-            st.error(f"❌ Erreur: {data.get('error', 'Inconnue')}")
-            st.info("""
-            Vérifiez:
-            - Votre connexion internet
-            - Le symbole est correct
-            - Votre clé API Alpha Vantage (si utilisée)
-            """)
-    
-    # Auto-refresh
-    if not st.session_state.get('paused', False):
-        time.sleep(refresh_rate)
-        st.rerun()
+        st.fragment(render_single_live, run_every=run_every)(symbol, *live_args)
 
 if __name__ == "__main__":
     main()
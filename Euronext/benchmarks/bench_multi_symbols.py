@@ -0,0 +1,80 @@
+# benchmarks/bench_multi_symbols.py - Temps de récupération d'une watchlist
+#
+# Usage (depuis Euronext/) :
+#     python -m benchmarks.bench_multi_symbols --latency 0.2
+import argparse
+import os
+import time
+
+from benchmarks.mock_provider import MockProvider
+from benchmarks.synthetic import make_symbols
+
+SIZES = [4, 10, 25, 50]
+
+
+def run(latency: float, workers: int, deadline: float):
+    # Mesure des appels amont : pas de cache disque, qui servirait les tours suivants
+    os.environ["CACHE_PERSISTENT"] = "0"
+    from config.settings import APIConfig, RateLimitConfig
+    # Le faux fournisseur n'a pas de quota : seul le code de l'application est mesuré
+    RateLimitConfig.LIMITS = {}
+    import app
+
+    slow = {"SLOW.PA": deadline * 3}
+    with MockProvider(latency=latency, slow_symbols=slow) as provider:
+        APIConfig.YAHOO_BASE_URL = provider.url
+
+        print(f"Latence simulée: {latency * 1000:.0f} ms - workers: {workers} - échéance: {deadline}s")
+        print(f"{'symboles':>9} | {'séquentiel (s)':>14} | {'parallèle (s)':>13} | {'par lots (s)':>12} | {'requêtes lots':>13}")
+        for n in SIZES:
+            symbols = make_symbols(n)
+
+            app.quote_cache.clear()
+            start = time.perf_counter()
+            app.get_multiple_symbols_data(
+                symbols, "Yahoo Finance", "", max_workers=1, deadline=3600, batch_size=1
+            )
+            sequential = time.perf_counter() - start
+
+            app.quote_cache.clear()
+            start = time.perf_counter()
+            results, failed = app.get_multiple_symbols_data(
+                symbols, "Yahoo Finance", "", max_workers=workers, deadline=deadline, batch_size=1
+            )
+            concurrent = time.perf_counter() - start
+            assert len(results) == n and not failed
+
+            app.quote_cache.clear()
+            before = provider.request_count
+            start = time.perf_counter()
+            results, failed = app.get_multiple_symbols_data(
+                symbols, "Yahoo Finance", "", max_workers=workers, deadline=deadline
+            )
+            batched = time.perf_counter() - start
+            requests_used = provider.request_count - before
+            assert len(results) == n and not failed
+
+            print(f"{n:>9} | {sequential:>14.2f} | {concurrent:>13.2f} | {batched:>12.2f} | {requests_used:>13}")
+
+        # Un symbole lent ne bloque plus la page au-delà de l'échéance
+        symbols = make_symbols(9) + ["SLOW.PA"]
+        app.quote_cache.clear()
+        start = time.perf_counter()
+        results, failed = app.get_multiple_symbols_data(
+            symbols, "Yahoo Finance", "", max_workers=workers, deadline=deadline, batch_size=1
+        )
+        elapsed = time.perf_counter() - start
+        print(f"Avec un symbole lent: {len(results)} reçus, échecs={failed}, {elapsed:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark get_multiple_symbols_data")
+    parser.add_argument("--latency", type=float, default=0.2, help="latence par requête (s)")
+    parser.add_argument("--workers", type=int, default=max(SIZES), help="taille du pool")
+    parser.add_argument("--deadline", type=float, default=2.0, help="échéance globale (s)")
+    args = parser.parse_args()
+    run(args.latency, args.workers, args.deadline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# benchmarks/import_time.py - Coût des imports au démarrage de app.py (python -X importtime)
+#
+# Usage (depuis Euronext/) :
+#     python -m benchmarks.import_time --output benchmarks/import_time.json
+#     python -m benchmarks.import_time --budget-ms 1500  # code 1 si dépassé
+#
+# Seuls les imports de premier niveau de app.py sont exécutés, dans un
+# interpréteur neuf : l'application elle-même (page Streamlit, bases,
+# threads) n'est pas lancée.
+import argparse
+import ast
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+SCHEMA_VERSION = 1
+ROOT = Path(__file__).resolve().parent.parent
+APP = ROOT / "app.py"
+
+# Dépendances qui ne doivent pas être chargées au démarrage (voir utils/lazy.py)
+DEFERRED = ["sklearn", "joblib", "ta", "plotly.express"]
+
+# Budget du temps d'import (somme des temps propres), mesuré à ~1,1 s une
+# fois scikit-learn différé contre ~2,3 s auparavant
+BUDGET_MS = 2000
+
+# Marqueur imprimé après les imports, pour lister les modules chargés
+_LOADED_MARKER = "__LOADED_MODULES__"
+
+
+def startup_imports(path: Path = APP) -> str:
+    """Instructions d'import de premier niveau d'un script, dans l'ordre"""
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    return "\n".join(
+        ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))
+    )
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """Lignes « import time: self | cumulative | module » -> enregistrements (µs)"""
+    records = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        records.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us)
+        })
+    return records
+
+
+def measure_once(code: str) -> Dict:
+    """Exécute les imports dans un interpréteur neuf"""
+    script = code + f"\nimport sys\nprint({_LOADED_MARKER!r}, *sorted(sys.modules))\n"
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    loaded = next(
+        line.split()[1:] for line in result.stdout.splitlines() if line.startswith(_LOADED_MARKER)
+    )
+    return {"wall_ms": wall_ms, "records": parse_importtime(result.stderr), "loaded": set(loaded)}
+
+
+def summarize(run: Dict, top: int) -> Dict:
+    records = run["records"]
+    by_package: Dict[str, int] = {}
+    for record in records:
+        package = record["module"].split(".")[0]
+        by_package[package] = by_package.get(package, 0) + record["self_us"]
+    roots = [record for record in records if record["depth"] == 0]
+    return {
+        "wall_ms": round(run["wall_ms"], 1),
+        "import_ms": round(sum(record["self_us"] for record in records) / 1000, 1),
+        "modules": len(records),
+        "top_level": [
+            {"module": record["module"], "cumulative_ms": round(record["cumulative_us"] / 1000, 1)}
+            for record in sorted(roots, key=lambda r: -r["cumulative_us"])[:top]
+        ],
+        "by_package_ms": {
+            package: round(us / 1000, 1)
+            for package, us in sorted(by_package.items(), key=lambda item: -item[1])[:top]
+        },
+        "deferred_loaded": sorted(
+            name for name in DEFERRED
+            if any(module == name or module.startswith(name + ".") for module in run["loaded"])
+        )
+    }
+
+
+def run(args) -> Dict:
+    code = startup_imports()
+    runs = [measure_once(code) for _ in range(args.repeat)]
+    # Le plus rapide est le moins bruité (caches disque chauds, machine calme)
+    best = min(runs, key=lambda r: sum(record["self_us"] for record in r["records"]))
+    report = {
+        "schema": SCHEMA_VERSION,
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "budget_ms": args.budget_ms
+        },
+        "wall_ms_median": round(statistics.median(r["wall_ms"] for r in runs), 1),
+        **summarize(best, args.top)
+    }
+    report["within_budget"] = report["import_ms"] <= args.budget_ms and not report["deferred_loaded"]
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Temps d'import au démarrage de app.py")
+    parser.add_argument("--output", help="fichier JSON de résultats (sinon sortie standard)")
+    parser.add_argument("--repeat", type=int, default=3, help="interpréteurs lancés")
+    parser.add_argument("--top", type=int, default=15, help="modules et paquets détaillés")
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS,
+                        help="échec (code 1) au-delà de ce temps d'import ou si une dépendance différée est chargée")
+    args = parser.parse_args()
+
+    report = run(args)
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+        print(f"Résultats écrits dans {args.output}", file=sys.stderr)
+    else:
+        print(output)
+    if not report["within_budget"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
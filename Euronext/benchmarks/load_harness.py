@@ -0,0 +1,373 @@
+# benchmarks/load_harness.py - Charge de N sessions exécutant app.main sans navigateur
+#
+# Usage (depuis Euronext/) :
+#     python -m benchmarks.load_harness --sessions 20 --duration 30 --mode mixed
+#     python -m benchmarks.load_harness --sessions 50 --replay stock_data.db --speed 120
+#     python -m benchmarks.load_harness --sessions 50 --replay synthetic --output load.json
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.mock_provider import MockProvider
+from benchmarks.replay import ReplayFeed
+from benchmarks.synthetic import generate_ticks
+
+SYMBOLS = ["MC.PA", "RMS.PA", "KER.PA", "CDI.PA", "AI.PA", "OR.PA", "BNP.PA", "SAN.PA", "TOT.PA"]
+
+
+# ==================== FAUX STREAMLIT ====================
+
+class RerunRequested(Exception):
+    """Levée par `st.rerun()` : le harnais relance la session au tour suivant"""
+
+
+class SessionState(dict):
+    """session_state d'une session : accès par attribut ou par clé"""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+    def __delattr__(self, name):
+        del self[name]
+
+
+class _Block:
+    """Conteneur (sidebar, colonne, expander...) : ses appels vont à `st`"""
+
+    def __init__(self, st: "FakeStreamlit"):
+        self._st = st
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return getattr(self._st, name)
+
+
+class Session:
+    """Une session simulée : son état et ce qu'elle a affiché"""
+
+    def __init__(self, index: int, mode: str, symbols: List[str]):
+        self.index = index
+        self.mode = mode
+        self.symbols = symbols
+        self.state = SessionState()
+        self.elements = 0
+        self.errors: List[str] = []
+        self.timings: List[float] = []
+        self.fragment_timings: List[float] = []
+        self.fragments: List[tuple] = []
+
+
+class FakeStreamlit:
+    """Remplaçant minimal du module `streamlit` pour exécuter `app.main`
+
+    Chaque thread est lié à une `Session` : `session_state` et les éléments
+    affichés lui sont propres. Les widgets retournent leur valeur par
+    défaut, ce qui reproduit une page laissée ouverte sans interaction.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self.sidebar = _Block(self)
+
+    def bind(self, session: Session):
+        self._local.session = session
+
+    @property
+    def session(self) -> Session:
+        return self._local.session
+
+    @property
+    def session_state(self) -> SessionState:
+        return self._local.session.state
+
+    def _record(self, *args, **kwargs):
+        self.session.elements += 1
+
+    def __getattr__(self, name):
+        # title, caption, metric, plotly_chart, dataframe, markdown...
+        return self._record
+
+    def error(self, message, *args, **kwargs):
+        self.session.elements += 1
+        self.session.errors.append(str(message))
+
+    def rerun(self):
+        raise RerunRequested()
+
+    def fragment(self, func=None, *, run_every=None, **kwargs):
+        """Exécute la fonction et la mémorise : les tours suivants ne relancent qu'elle"""
+        if func is None:
+            return lambda f: self.fragment(f, run_every=run_every, **kwargs)
+
+        def wrapper(*args, **kw):
+            self.session.fragments.append((func, args, kw))
+            return func(*args, **kw)
+        return wrapper
+
+    def spinner(self, *args, **kwargs):
+        return _Block(self)
+
+    def expander(self, *args, **kwargs):
+        return _Block(self)
+
+    def container(self, *args, **kwargs):
+        return _Block(self)
+
+    def columns(self, spec, *args, **kwargs):
+        count = spec if isinstance(spec, int) else len(spec)
+        return [_Block(self) for _ in range(count)]
+
+    def checkbox(self, label, value=False, *args, **kwargs):
+        return value
+
+    def button(self, *args, **kwargs):
+        return False
+
+    def selectbox(self, label, options, index=0, *args, **kwargs):
+        return list(options)[index]
+
+    def radio(self, label, options, index=0, *args, **kwargs):
+        return list(options)[index]
+
+    def multiselect(self, label, options, default=None, *args, **kwargs):
+        return list(default or [])
+
+    def slider(self, label, min_value=None, max_value=None, value=None, *args, **kwargs):
+        return value if value is not None else min_value
+
+    def text_input(self, label, value="", *args, **kwargs):
+        return value
+
+
+# ==================== MESURES ====================
+
+def rss_kb() -> int:
+    """Mémoire résidente actuelle du processus (Ko)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    # Repli : pic de mémoire (Ko sous Linux, octets sous macOS)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def percentiles(timings: List[float]) -> Dict:
+    if not timings:
+        return {"reruns": 0}
+    values = np.asarray(timings) * 1000
+    return {
+        "reruns": len(values),
+        "p50_ms": round(float(np.percentile(values, 50)), 2),
+        "p99_ms": round(float(np.percentile(values, 99)), 2),
+        "max_ms": round(float(values.max()), 2)
+    }
+
+
+# ==================== HARNAIS ====================
+
+def make_sessions(count: int, mode: str) -> List[Session]:
+    """Répartit les sessions entre les modes et les symboles"""
+    sessions = []
+    for i in range(count):
+        session_mode = mode if mode != "mixed" else ("comparison" if i % 2 else "single")
+        if session_mode == "comparison":
+            symbols = [SYMBOLS[(i + k) % len(SYMBOLS)] for k in range(2)]
+        else:
+            symbols = [SYMBOLS[i % len(SYMBOLS)]]
+        sessions.append(Session(i, session_mode, symbols))
+    return sessions
+
+
+def make_feed(replay: Optional[str], speed: float, seed: int) -> Optional[ReplayFeed]:
+    if not replay:
+        return None
+    if replay == "synthetic":
+        ticks = pd.concat(
+            [generate_ticks(symbol, days=1, ticks_per_day=2000, seed=seed).assign(symbol=symbol) for symbol in SYMBOLS],
+            ignore_index=True
+        )
+        return ReplayFeed(ticks, speed)
+    return ReplayFeed.from_database(replay, SYMBOLS, speed)
+
+
+def _run_fragments(session: Session):
+    for func, args, kwargs in session.fragments:
+        func(*args, **kwargs)
+
+
+def run_session(app, fake: FakeStreamlit, session: Session, interval: float, full_every: int,
+                stop: threading.Event):
+    """Une exécution complète, puis seuls les fragments (comme `run_every`)
+
+    Avec `full_every` > 0, la page entière est relancée tous les
+    `full_every` tours, comme après une interaction de l'utilisateur.
+    """
+    fake.bind(session)
+    app.init_session_state()
+    session.state.comparison_mode = session.mode == "comparison"
+    session.state.current_symbols = list(session.symbols)
+
+    tick = 0
+    while not stop.is_set():
+        full = not session.fragments or (full_every and tick % full_every == 0)
+        start = time.perf_counter()
+        try:
+            if full:
+                session.fragments.clear()
+                app.init_session_state()
+                app.main()
+            else:
+                _run_fragments(session)
+        except RerunRequested:
+            pass
+        except Exception as e:
+            session.errors.append(repr(e))
+        elapsed = time.perf_counter() - start
+        (session.timings if full else session.fragment_timings).append(elapsed)
+        tick += 1
+        stop.wait(max(0.0, interval - elapsed))
+
+
+def run(args) -> Dict:
+    # Base dédiée, conservée pour un rejeu ultérieur (--replay) ;
+    # à positionner avant l'import de l'application
+    db_path = args.db or str(Path(tempfile.mkdtemp(prefix="load_harness_")) / "load.db")
+    os.environ["STOCK_DB_PATH"] = db_path
+    os.environ["CACHE_DB_PATH"] = str(Path(db_path).with_name("cache.db"))
+    # Le rejeu ne suit pas l'horloge : sans --market-hours, le poller ignore le calendrier
+    os.environ["POLL_MARKET_HOURS"] = "1" if args.market_hours else "0"
+
+    feed = make_feed(args.replay, args.speed, args.seed)
+    with MockProvider(latency=args.latency, error_rate=args.error_rate, seed=args.seed, feed=feed) as provider:
+        from config.settings import APIConfig, RateLimitConfig
+        RateLimitConfig.LIMITS = {}  # Le faux fournisseur n'a pas de quota
+        APIConfig.YAHOO_BASE_URL = provider.url
+        APIConfig.ALPHA_VANTAGE_URL = provider.alpha_url
+
+        import app
+        from utils.write_behind import get_writer
+        fake = FakeStreamlit()
+        app.st = fake
+        writer = get_writer(app.DB_PATH, app.DatabaseManager.INSERT_PRICE_SQL)
+
+        sessions = make_sessions(args.sessions, args.mode)
+        rss_before = rss_kb()
+        stop = threading.Event()
+        threads = [
+            threading.Thread(target=run_session, args=(app, fake, s, args.interval, args.full_every, stop), daemon=True)
+            for s in sessions
+        ]
+
+        if feed:
+            feed.start()
+        for thread in threads:
+            thread.start()
+        # Relances de fragments hors mesure pendant la chauffe ; les exécutions
+        # complètes (dont la première, à froid) sont toutes conservées
+        time.sleep(args.warmup)
+        for s in sessions:
+            s.fragment_timings.clear()
+        requests_start = provider.request_count
+        rows_start = writer.get_stats()["rows_written"]
+        start = time.monotonic()
+
+        time.sleep(args.duration)
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=60)
+        elapsed = time.monotonic() - start
+        app.quote_poller.stop()
+
+        writer.flush(timeout=30)
+        rows_written = writer.get_stats()["rows_written"] - rows_start
+        upstream = provider.request_count - requests_start
+        rss_after = rss_kb()
+
+    report = {
+        "config": {
+            "sessions": args.sessions,
+            "mode": args.mode,
+            "duration_s": args.duration,
+            "interval_s": args.interval,
+            "full_every": args.full_every,
+            "market_hours": args.market_hours,
+            "latency_s": args.latency,
+            "error_rate": args.error_rate,
+            "replay": args.replay,
+            "speed": args.speed,
+            "seed": args.seed
+        },
+        "full_run": percentiles([t for s in sessions for t in s.timings]),
+        "fragment_run": percentiles([t for s in sessions for t in s.fragment_timings]),
+        "by_mode": {
+            mode: {
+                "full_run": percentiles([t for s in sessions if s.mode == mode for t in s.timings]),
+                "fragment_run": percentiles([t for s in sessions if s.mode == mode for t in s.fragment_timings])
+            }
+            for mode in sorted({s.mode for s in sessions})
+        },
+        "poller": app.quote_poller.get_stats(),
+        "upstream_requests_per_s": round(upstream / elapsed, 2),
+        "sqlite_rows_per_s": round(rows_written / elapsed, 2),
+        "rss_kb": rss_after,
+        "rss_kb_per_session": round((rss_after - rss_before) / max(len(sessions), 1), 1),
+        "errors": sorted({e for s in sessions for e in s.errors})[:20],
+        "db": db_path
+    }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Charge multi-sessions sur app.main")
+    parser.add_argument("--sessions", type=int, default=10, help="nombre de sessions simultanées")
+    parser.add_argument("--mode", choices=["single", "comparison", "mixed"], default="mixed")
+    parser.add_argument("--duration", type=float, default=20.0, help="durée mesurée (s)")
+    parser.add_argument("--warmup", type=float, default=3.0, help="durée de chauffe non mesurée (s)")
+    parser.add_argument("--interval", type=float, default=1.0, help="intervalle entre relances d'une session (s)")
+    parser.add_argument("--full-every", type=int, default=0,
+                        help="relance complète tous les N tours (0 : fragments seulement)")
+    parser.add_argument("--market-hours", action="store_true",
+                        help="appliquer le calendrier Euronext au poller (marché fermé : aucune interrogation)")
+    parser.add_argument("--latency", type=float, default=0.05, help="latence simulée du fournisseur (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="part de réponses en erreur")
+    parser.add_argument("--replay", help="base stock_prices à rejouer, ou 'synthetic'")
+    parser.add_argument("--speed", type=float, default=60.0, help="accélération du rejeu")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--db", help="base SQLite de l'application (temporaire par défaut)")
+    parser.add_argument("--output", help="fichier JSON de résultats (sinon sortie standard)")
+    args = parser.parse_args()
+
+    output = json.dumps(run(args), indent=2, sort_keys=True, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+# benchmarks/mock_provider.py - Faux serveur Yahoo Finance / Alpha Vantage local
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import urlparse, parse_qs
+
+import pandas as pd
+
+from benchmarks.synthetic import generate_ohlcv
+
+# Nombre de séances renvoyées pour le paramètre `range` de Yahoo
+RANGE_DAYS = {"1d": 1, "5d": 5, "1mo": 21, "3mo": 63, "6mo": 126, "1y": 252, "2y": 504, "5y": 1260}
+
+# Nombre de séances de la réponse Alpha Vantage outputsize=compact
+COMPACT_DAYS = 100
+
+
+class MockProvider:
+    """Serveur HTTP local imitant Yahoo Finance (chart, quote) et Alpha Vantage
+
+    Les historiques viennent de `benchmarks.synthetic` ; `latency` est
+    ajoutée à chaque réponse et une fraction `error_rate` des requêtes
+    répond `error_status`, tirée d'un générateur initialisé par `seed`.
+    Avec `feed` (voir `benchmarks.replay.ReplayFeed`), les cotations des
+    symboles du flux viennent du rejeu plutôt que du dernier cours.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.2,
+        slow_symbols: Optional[Dict[str, float]] = None,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        seed: int = 0,
+        history_years: float = 5,
+        feed=None
+    ):
+        self.latency = latency
+        self.slow_symbols = slow_symbols or {}
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.seed = seed
+        self.history_years = history_years
+        self.feed = feed
+        self.request_count = 0
+        self.error_count = 0
+        self._random = random.Random(seed)
+        self._series: Dict[str, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockProvider":
+        """Démarre le serveur sur un port libre"""
+        provider = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # HTTP/1.1 pour que les clients keep-alive réutilisent la connexion
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                provider._handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        class Server(ThreadingHTTPServer):
+            # File d'attente large : les rafales de connexions ne sont pas rejetées
+            request_queue_size = 256
+            daemon_threads = True
+
+        self._server = Server(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Arrête le serveur"""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def alpha_url(self) -> str:
+        return f"{self.url}/query"
+
+    def series(self, symbol: str) -> pd.DataFrame:
+        """Historique synthétique complet d'un symbole (mis en cache)"""
+        with self._lock:
+            df = self._series.get(symbol)
+        if df is None:
+            df = generate_ohlcv(symbol, self.history_years, self.seed)
+            with self._lock:
+                self._series[symbol] = df
+        return df
+
+    def live(self, symbol: str) -> Dict:
+        """Cours, clôture précédente et volume courants d'un symbole"""
+        quote = self.feed.quote(symbol) if self.feed else None
+        if quote is not None:
+            return quote
+        df = self.series(symbol)
+        return {
+            "price": float(df['close'].iloc[-1]),
+            "previous_close": float(df['close'].iloc[-2] if len(df) > 1 else df['close'].iloc[-1]),
+            "volume": int(df['volume'].iloc[-1])
+        }
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            failed = self.error_rate > 0 and self._random.random() < self.error_rate
+            if failed:
+                self.error_count += 1
+            return failed
+
+    def _handle(self, handler: BaseHTTPRequestHandler):
+        with self._lock:
+            self.request_count += 1
+
+        parsed = urlparse(handler.path)
+        params = parse_qs(parsed.query)
+
+        if parsed.path.startswith("/v8/finance/chart/"):
+            symbols = [parsed.path.rsplit("/", 1)[-1]]
+            build = lambda: self._chart_payload(symbols[0], params)
+        elif parsed.path == "/v7/finance/quote":
+            symbols = params.get("symbols", [""])[0].split(",")
+            build = lambda: self._quote_payload(symbols)
+        elif parsed.path == "/query":
+            symbols = params.get("symbol", [""])
+            build = lambda: self._alpha_payload(symbols[0], params)
+        else:
+            self._send_json(handler, {"error": "not found"}, status=404)
+            return
+
+        time.sleep(max(self.slow_symbols.get(s, self.latency) for s in symbols))
+        if self._should_fail():
+            self._send_json(handler, {"error": "injected failure"}, status=self.error_status)
+        else:
+            self._send_json(handler, build())
+
+    @staticmethod
+    def _send_json(handler: BaseHTTPRequestHandler, payload: Dict, status: int = 200):
+        body = json.dumps(payload).encode()
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def _quote_payload(self, symbols) -> Dict:
+        result = []
+        for symbol in symbols:
+            if not symbol:
+                continue
+            live = self.live(symbol)
+            result.append({
+                "symbol": symbol,
+                "currency": "EUR",
+                "regularMarketPrice": live["price"],
+                "regularMarketPreviousClose": live["previous_close"],
+                "regularMarketVolume": live["volume"],
+            })
+        return {"quoteResponse": {"result": result, "error": None}}
+
+    def _chart_payload(self, symbol: str, params: Dict) -> Dict:
+        df = self.series(symbol)
+        if "period1" in params:
+            start = pd.to_datetime(int(params["period1"][0]), unit="s")
+            end = pd.to_datetime(int(params.get("period2", [time.time()])[0]), unit="s")
+            bars = df[(df['date'] >= start.normalize()) & (df['date'] <= end)]
+        else:
+            bars = df.tail(RANGE_DAYS.get(params.get("range", ["1mo"])[0], len(df)))
+
+        live = self.live(symbol)
+        return {
+            "chart": {
+                "result": [{
+                    "meta": {
+                        "symbol": symbol,
+                        "currency": "EUR",
+                        "regularMarketPrice": live["price"],
+                        "previousClose": live["previous_close"],
+                        "regularMarketVolume": live["volume"],
+                    },
+                    "timestamp": (bars['date'].values.astype('datetime64[s]').astype('int64')).tolist(),
+                    "indicators": {"quote": [{
+                        "open": bars['open'].tolist(),
+                        "high": bars['high'].tolist(),
+                        "low": bars['low'].tolist(),
+                        "close": bars['close'].tolist(),
+                        "volume": bars['volume'].tolist(),
+                    }]},
+                }],
+                "error": None,
+            }
+        }
+
+    def _alpha_payload(self, symbol: str, params: Dict) -> Dict:
+        function = params.get("function", [""])[0]
+        if function == "GLOBAL_QUOTE":
+            live = self.live(symbol)
+            change = live["price"] / live["previous_close"] * 100 - 100
+            return {"Global Quote": {
+                "01. symbol": symbol,
+                "05. price": f"{live['price']:.4f}",
+                "06. volume": str(live["volume"]),
+                "10. change percent": f"{change:.4f}%",
+            }}
+        if function == "TIME_SERIES_DAILY":
+            df = self.series(symbol)
+            if params.get("outputsize", ["compact"])[0] == "compact":
+                df = df.tail(COMPACT_DAYS)
+            return {"Time Series (Daily)": {
+                row.date.strftime("%Y-%m-%d"): {
+                    "1. open": f"{row.open:.4f}",
+                    "2. high": f"{row.high:.4f}",
+                    "3. low": f"{row.low:.4f}",
+                    "4. close": f"{row.close:.4f}",
+                    "5. volume": str(row.volume),
+                } for row in df.iloc[::-1].itertuples()
+            }}
+        return {"Error Message": f"Invalid API call: {function}"}
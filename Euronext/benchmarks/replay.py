@@ -0,0 +1,87 @@
+# benchmarks/replay.py - Rejeu accéléré de cotations enregistrées
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class ReplayFeed:
+    """Source de cotations qui rejoue des ticks stockés à vitesse accélérée
+
+    Les ticks de tous les symboles partagent une même horloge : au bout de
+    `t` secondes réelles, le flux est positionné à `début + t × speed`. Le
+    flux reboucle à la fin si `loop` est vrai. Utilisé par `MockProvider`
+    pour que deux exécutions voient exactement la même séquence de prix.
+    """
+
+    def __init__(self, ticks: pd.DataFrame, speed: float = 60.0, loop: bool = True):
+        if ticks.empty:
+            raise ValueError("Aucune cotation à rejouer")
+        self.speed = speed
+        self.loop = loop
+        ts = pd.to_datetime(ticks['timestamp'], format='ISO8601').values.astype('datetime64[ms]').astype(np.int64) / 1000.0
+        self.first = float(ts.min())
+        self.span = max(float(ts.max()) - self.first, 1.0)
+
+        self._symbols: Dict[str, tuple] = {}
+        frame = pd.DataFrame({
+            'symbol': ticks['symbol'].to_numpy(),
+            'ts': ts,
+            'price': ticks['price'].to_numpy(dtype=float),
+            'volume': ticks['volume'].fillna(0).to_numpy(dtype=float)
+        }).sort_values(['symbol', 'ts'], kind='stable')
+        for symbol, group in frame.groupby('symbol', sort=False):
+            self._symbols[symbol] = (
+                group['ts'].to_numpy(), group['price'].to_numpy(), group['volume'].to_numpy()
+            )
+
+        self._lock = threading.Lock()
+        self._start: Optional[float] = None
+
+    @classmethod
+    def from_database(cls, db_path, symbols: Optional[Iterable[str]] = None,
+                      speed: float = 60.0, loop: bool = True) -> "ReplayFeed":
+        """Charge la table stock_prices d'une base de l'application"""
+        sql = "SELECT symbol, timestamp, price, volume FROM stock_prices"
+        params = []
+        if symbols:
+            symbols = list(symbols)
+            sql += f" WHERE symbol IN ({','.join('?' * len(symbols))})"
+            params = symbols
+        conn = sqlite3.connect(db_path)
+        try:
+            ticks = pd.read_sql_query(sql + " ORDER BY timestamp", conn, params=params)
+        finally:
+            conn.close()
+        return cls(ticks, speed, loop)
+
+    @property
+    def symbols(self):
+        return sorted(self._symbols)
+
+    def start(self):
+        """Démarre l'horloge du rejeu (sinon au premier appel de `quote`)"""
+        with self._lock:
+            self._start = time.monotonic()
+
+    def position(self) -> float:
+        """Horodatage (epoch) courant du flux rejoué"""
+        with self._lock:
+            if self._start is None:
+                self._start = time.monotonic()
+            elapsed = (time.monotonic() - self._start) * self.speed
+        if self.loop:
+            elapsed %= self.span
+        return self.first + min(elapsed, self.span)
+
+    def quote(self, symbol: str) -> Optional[Dict]:
+        """Dernière cotation rejouée d'un symbole (None s'il n'est pas dans le flux)"""
+        series = self._symbols.get(symbol)
+        if series is None:
+            return None
+        ts, price, volume = series
+        i = max(int(np.searchsorted(ts, self.position(), side='right')) - 1, 0)
+        return {"price": float(price[i]), "previous_close": float(price[0]), "volume": int(volume[i])}
@@ -0,0 +1,272 @@
+# benchmarks/run.py - Suite de benchmarks hors ligne, résultats en JSON
+#
+# Usage (depuis Euronext/) :
+#     python -m benchmarks.run --output benchmarks/results.json
+#     python -m benchmarks.run --quick --only calculate_all
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.mock_provider import MockProvider
+from benchmarks.synthetic import generate_ohlcv, make_symbols, to_database_frame
+
+SCHEMA_VERSION = 1
+
+
+def measure(func: Callable, repeat: int, setup: Optional[Callable] = None) -> Dict:
+    """Exécute `func` `repeat` fois (après `setup`, non chronométré), en ms"""
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "runs": repeat,
+        "min_ms": round(min(timings), 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "max_ms": round(max(timings), 3)
+    }
+
+
+def memory_tier(cache):
+    """Niveau mémoire d'un CacheManager (le cache disque éventuel reste intact)"""
+    return getattr(cache.backend, "memory", cache.backend)
+
+
+class Context:
+    """Paramètres partagés par les benchmarks"""
+
+    def __init__(self, args, provider: MockProvider, workdir: Path):
+        self.seed = args.seed
+        self.repeat = args.repeat
+        self.quick = args.quick
+        self.provider = provider
+        self.workdir = workdir
+
+    def sizes(self, full: List[int], quick: List[int]) -> List[int]:
+        return quick if self.quick else full
+
+
+# ==================== BENCHMARKS ====================
+
+def bench_get_multiple_symbols_data(ctx: Context) -> Dict:
+    import app
+
+    results = {}
+    for n in ctx.sizes([10, 50, 200], [10]):
+        symbols = make_symbols(n)
+        for source, key in (("Yahoo Finance", ""), ("Alpha Vantage", "demo")):
+            before = ctx.provider.request_count
+            stats = measure(
+                lambda: app.get_multiple_symbols_data(symbols, source, key),
+                ctx.repeat,
+                setup=lambda: memory_tier(app.quote_cache).clear(app.quote_cache.namespace)
+            )
+            stats["requests_per_run"] = (ctx.provider.request_count - before) / ctx.repeat
+            results[f"{source}/symbols={n}"] = stats
+    return results
+
+
+def bench_calculate_all(ctx: Context) -> Dict:
+    import app
+    from utils import indicator_graph
+
+    results = {}
+    for years in ctx.sizes([1, 5, 20], [1]):
+        df = generate_ohlcv("BENCH.PA", years, ctx.seed)
+        label = f"years={years}"
+
+        results[f"full/{label}"] = measure(
+            lambda: app.TechnicalIndicators.calculate_all(df), ctx.repeat,
+            setup=indicator_graph.engine.clear
+        )
+        results[f"memoized/{label}"] = measure(
+            lambda: app.TechnicalIndicators.calculate_all(df), ctx.repeat
+        )
+
+        # Rafraîchissement : seule la dernière barre change
+        key = ("BENCH.PA", label)
+        app.TechnicalIndicators.calculate_all(df, key=key)
+        frames = []
+        for factor in np.linspace(0.99, 1.01, ctx.repeat):
+            frame = df.copy()
+            frame.loc[frame.index[-1], 'close'] *= factor
+            frames.append(frame)
+        pending = iter(frames)
+        results[f"incremental/{label}"] = measure(
+            lambda: app.TechnicalIndicators.calculate_all(next(pending), key=key), ctx.repeat
+        )
+    return results
+
+
+def bench_save_price(ctx: Context) -> Dict:
+    import app
+
+    db = app.DatabaseManager(db_path=ctx.workdir / "ticks.db")
+    quote = {"price": 101.5, "change": 0.4, "volume": 12345, "source": "bench"}
+    results = {}
+    for n in ctx.sizes([100, 1000], [100]):
+        def enqueue():
+            for i in range(n):
+                db.save_price(f"S{i % 50:03d}.PA", quote)
+
+        results[f"enqueue/quotes={n}"] = measure(enqueue, ctx.repeat)
+        results[f"enqueue_and_flush/quotes={n}"] = measure(lambda: (enqueue(), db.writer.flush()), ctx.repeat)
+    return results
+
+
+def bench_database(ctx: Context) -> Dict:
+    from utils.database import Database
+
+    results = {}
+    for years in ctx.sizes([1, 5, 20], [1]):
+        database = Database(str(ctx.workdir / f"prices_{years}.db"))
+        frame = to_database_frame(generate_ohlcv("BENCH.PA", years, ctx.seed))
+        start, end = frame['Date'].min().strftime('%Y-%m-%d'), frame['Date'].max().strftime('%Y-%m-%d')
+
+        results[f"save_prices/years={years}"] = measure(lambda: database.save_prices("BENCH.PA", frame), ctx.repeat)
+        results[f"load_prices/years={years}"] = measure(
+            lambda: database.load_prices("BENCH.PA", start, end), ctx.repeat
+        )
+        database.conn.close()
+    return results
+
+
+def bench_create_single_chart(ctx: Context) -> Dict:
+    import app
+    from components.charts import SingleSymbolChart
+
+    results = {}
+    for days in ctx.sizes([31, 252, 1260, 20160], [31]):
+        df = app.TechnicalIndicators.calculate_all(generate_ohlcv("BENCH.PA", days / 252, ctx.seed))
+        results[f"bars={days}"] = measure(lambda: app.create_single_chart(df, "BENCH.PA"), ctx.repeat)
+
+        # Rafraîchissement : figure en place, seule la dernière barre change
+        chart = SingleSymbolChart("BENCH.PA")
+        chart.update(df)
+        frames = []
+        for factor in np.linspace(0.99, 1.01, ctx.repeat):
+            frame = df.copy()
+            frame.loc[frame.index[-1], 'close'] *= factor
+            frames.append(frame)
+        pending = iter(frames)
+        results[f"refresh/bars={days}"] = measure(lambda: chart.update(next(pending)), ctx.repeat)
+    return results
+
+
+def bench_format_historical_data(ctx: Context) -> Dict:
+    from utils.formatters import StockFormatter
+
+    results = {}
+    for days in ctx.sizes([252, 1260, 5040], [252]):
+        frame = to_database_frame(generate_ohlcv("BENCH.PA", days / 252, ctx.seed))
+        results[f"rows={days}"] = measure(lambda: StockFormatter.format_historical_data(frame), ctx.repeat)
+    return results
+
+
+def bench_decimation(ctx: Context) -> Dict:
+    from utils import decimation
+
+    results = {}
+    for bars in ctx.sizes([20_000, 200_000], [20_000]):
+        df = generate_ohlcv("BENCH.PA", bars / 252, ctx.seed)
+        results[f"ohlc/bars={bars}"] = measure(lambda: decimation.decimate_ohlc(df), ctx.repeat)
+        results[f"lttb/bars={bars}"] = measure(lambda: decimation.decimate_line(df, 'date', 'close'), ctx.repeat)
+    return results
+
+
+BENCHMARKS = {
+    "get_multiple_symbols_data": bench_get_multiple_symbols_data,
+    "calculate_all": bench_calculate_all,
+    "save_price": bench_save_price,
+    "database": bench_database,
+    "create_single_chart": bench_create_single_chart,
+    "format_historical_data": bench_format_historical_data,
+    "decimation": bench_decimation,
+}
+
+
+def run(args) -> Dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        # Base et cache disque dans le répertoire temporaire ;
+        # à positionner avant l'import de la configuration et de l'application
+        os.environ["STOCK_DB_PATH"] = str(Path(tmp) / "stock_data.db")
+        os.environ["CACHE_DB_PATH"] = str(Path(tmp) / "cache.db")
+        return _run(args, Path(tmp))
+
+
+def _run(args, workdir: Path) -> Dict:
+    from config.settings import APIConfig, RateLimitConfig
+    # Le faux fournisseur n'a pas de quota : seul le code de l'application est mesuré
+    RateLimitConfig.LIMITS = {}
+
+    report = {
+        "schema": SCHEMA_VERSION,
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "quick": args.quick,
+            "latency": args.latency,
+            "error_rate": args.error_rate
+        },
+        "benchmarks": {}
+    }
+
+    with MockProvider(latency=args.latency, error_rate=args.error_rate, seed=args.seed) as provider:
+        # Aucune requête ne sort de la machine
+        APIConfig.YAHOO_BASE_URL = provider.url
+        APIConfig.ALPHA_VANTAGE_URL = provider.alpha_url
+        ctx = Context(args, provider, workdir)
+
+        for name, bench in BENCHMARKS.items():
+            if args.only and name not in args.only:
+                continue
+            print(f"- {name}", file=sys.stderr)
+            report["benchmarks"][name] = bench(ctx)
+
+        report["meta"]["mock_requests"] = provider.request_count
+        report["meta"]["mock_errors"] = provider.error_count
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks hors ligne de Stock Tracker Pro")
+    parser.add_argument("--output", help="fichier JSON de résultats (sinon sortie standard)")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="benchmarks à exécuter")
+    parser.add_argument("--repeat", type=int, default=5, help="mesures par cas")
+    parser.add_argument("--seed", type=int, default=0, help="graine des données synthétiques")
+    parser.add_argument("--latency", type=float, default=0.05, help="latence simulée du fournisseur (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="part de réponses en erreur")
+    parser.add_argument("--quick", action="store_true", help="tailles réduites")
+    args = parser.parse_args()
+
+    report = run(args)
+    output = json.dumps(report, indent=2, sort_keys=True, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+        print(f"Résultats écrits dans {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
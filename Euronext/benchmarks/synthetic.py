@@ -0,0 +1,89 @@
+# benchmarks/synthetic.py - Données de marché synthétiques reproductibles
+import zlib
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS_PER_YEAR = 252
+
+# Séance Euronext Paris (heure locale, sans fuseau)
+SESSION_OPEN = dtime(9, 0)
+SESSION_CLOSE = dtime(17, 30)
+
+
+def make_symbols(n: int) -> List[str]:
+    """Génère n symboles fictifs au format Euronext"""
+    return [f"S{i:03d}.PA" for i in range(n)]
+
+
+def _rng(symbol: str, seed: int) -> np.random.Generator:
+    """Générateur propre au symbole : mêmes données quel que soit l'ordre d'appel"""
+    return np.random.default_rng([seed, zlib.crc32(symbol.encode())])
+
+
+def generate_ohlcv(symbol: str, years: float = 1, seed: int = 0, end: Optional[date] = None) -> pd.DataFrame:
+    """Historique journalier (colonnes date, open, high, low, close, volume)
+
+    Marche aléatoire géométrique sur les jours ouvrés se terminant à `end`
+    (aujourd'hui par défaut) ; le résultat ne dépend que de (symbole, seed).
+    """
+    rng = _rng(symbol, seed)
+    days = max(1, int(round(years * TRADING_DAYS_PER_YEAR)))
+    dates = pd.bdate_range(end=pd.Timestamp(end or date.today()), periods=days)
+
+    start_price = 20 + (zlib.crc32(symbol.encode()) % 480)
+    close = start_price * np.exp(np.cumsum(rng.normal(0.0002, 0.018, days)))
+    open_ = close * np.exp(rng.normal(0, 0.006, days))
+    spread = np.abs(rng.normal(0, 0.008, days))
+    high = np.maximum(open_, close) * (1 + spread)
+    low = np.minimum(open_, close) * (1 - spread)
+    volume = rng.lognormal(13, 0.5, days).astype(np.int64)
+
+    return pd.DataFrame({
+        'date': dates,
+        'open': open_.round(4),
+        'high': high.round(4),
+        'low': low.round(4),
+        'close': close.round(4),
+        'volume': volume
+    })
+
+
+def generate_market(symbols, years: float = 1, seed: int = 0) -> Dict[str, pd.DataFrame]:
+    """Historiques de plusieurs symboles ; `symbols` est une liste ou un nombre"""
+    if isinstance(symbols, int):
+        symbols = make_symbols(symbols)
+    return {symbol: generate_ohlcv(symbol, years, seed) for symbol in symbols}
+
+
+def to_database_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Colonnes attendues par utils.database.Database (Date, Open, ...)"""
+    return df.rename(columns=str.capitalize)
+
+
+def generate_ticks(symbol: str, days: int = 1, ticks_per_day: int = 1000, seed: int = 0,
+                   end: Optional[date] = None) -> pd.DataFrame:
+    """Cotations intrajournalières (colonnes timestamp, price, volume)
+
+    Même format que la table stock_prices : horodatage ISO local, prix et
+    volume cumulé depuis l'ouverture de la séance.
+    """
+    rng = _rng(symbol, seed + 1)
+    sessions = pd.bdate_range(end=pd.Timestamp(end or date.today()), periods=days)
+    session_seconds = (datetime.combine(date.min, SESSION_CLOSE) - datetime.combine(date.min, SESSION_OPEN)).seconds
+
+    frames = []
+    price = 20 + (zlib.crc32(symbol.encode()) % 480)
+    for session in sessions:
+        offsets = np.sort(rng.choice(session_seconds, ticks_per_day, replace=False))
+        opening = datetime.combine(session.date(), SESSION_OPEN)
+        prices = price * np.exp(np.cumsum(rng.normal(0, 0.0008, ticks_per_day)))
+        price = prices[-1]
+        frames.append(pd.DataFrame({
+            'timestamp': [(opening + timedelta(seconds=int(s))).isoformat() for s in offsets],
+            'price': prices.round(4),
+            'volume': np.cumsum(rng.integers(1, 500, ticks_per_day))
+        }))
+    return pd.concat(frames, ignore_index=True)
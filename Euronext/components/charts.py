@@ -1,6 +1,14 @@
 # components/charts.py - À ajouter progressivement
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
+from plotly.subplots import make_subplots
+
+from config.settings import ChartConfig
+from utils.decimation import decimate_ohlc, target_points
 
 def create_candlestick_chart(df, symbol):
     """Graphique en chandeliers"""
@@ -30,3 +38,142 @@ def create_volume_chart(df):
     )])
     fig.update_layout(height=200, showlegend=False)
     return fig
+
+
+VOLUME_COLORSCALE = [[0, 'green'], [1, 'red']]
+
+
+def scatter_class(points: int, threshold: int = ChartConfig.WEBGL_THRESHOLD):
+    """go.Scattergl (WebGL) au-delà de `threshold` points, go.Scatter (SVG) sinon"""
+    return go.Scattergl if points > threshold else go.Scatter
+
+
+class SingleSymbolChart:
+    """Graphique prix / volume / RSI d'un symbole, mis à jour en place
+
+    La mise en page et les traces sont créées une fois ; les appels
+    suivants de `update` ne remplacent que les barres nouvelles et la
+    dernière (provisoire), tant que les barres déjà affichées n'ont pas
+    changé. Les historiques plus longs que `max_bars` (une barre par
+    pixel) sont regroupés par seaux OHLC de taille fixe, ce qui garde les
+    seaux déjà affichés stables quand une barre s'ajoute. Au-delà de
+    `webgl_threshold` barres (comptées avant regroupement), le prix passe
+    en ligne de clôture et volume/RSI en traces WebGL (pas de chandeliers
+    ni de barres WebGL dans Plotly).
+    """
+
+    def __init__(self, symbol: str, webgl_threshold: int = ChartConfig.WEBGL_THRESHOLD,
+                 max_bars: Optional[int] = None):
+        self.symbol = symbol
+        self.max_bars = max_bars or target_points(per_pixel=ChartConfig.BARS_PER_PIXEL)
+        self.webgl_threshold = webgl_threshold
+        self.fig: Optional[go.Figure] = None
+        self.rebuilds = 0
+        self._webgl = False
+        self._rsi = False
+        self._columns: Dict[str, np.ndarray] = {}
+
+    @staticmethod
+    def _extract(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        columns = {
+            'date': df['date'].to_numpy(),
+            'open': df['open'].to_numpy(dtype=float),
+            'high': df['high'].to_numpy(dtype=float),
+            'low': df['low'].to_numpy(dtype=float),
+            'close': df['close'].to_numpy(dtype=float),
+            'volume': df['volume'].to_numpy(dtype=float),
+        }
+        # Couleur du volume : 1 (rouge) pour une barre baissière, 0 (vert) sinon ;
+        # un tableau numérique est validé par Plotly sans boucle Python
+        columns['color'] = (columns['close'] < columns['open']).astype(np.int8)
+        if 'rsi' in df.columns:
+            columns['rsi'] = df['rsi'].to_numpy(dtype=float)
+        return columns
+
+    def _appendable(self, df: pd.DataFrame, webgl: bool) -> int:
+        """Nombre de barres réutilisables (0 : reconstruction complète)"""
+        if self.fig is None:
+            return 0
+        n = len(self._columns['date'])
+        keep = n - 1  # La dernière barre affichée a pu évoluer
+        if keep < 1 or len(df) < n:
+            return 0
+        if webgl != self._webgl or ('rsi' in df.columns) != self._rsi:
+            return 0
+        dates = df['date']
+        if dates.iloc[0] != self._columns['date'][0] or dates.iloc[keep - 1] != self._columns['date'][keep - 1]:
+            return 0
+        return keep
+
+    def update(self, df: pd.DataFrame) -> Optional[go.Figure]:
+        if df is None or df.empty:
+            return None
+
+        webgl = len(df) > self.webgl_threshold
+        df = decimate_ohlc(df, self.max_bars, extra=['rsi'])
+        keep = self._appendable(df, webgl)
+        if not keep:
+            self._columns = self._extract(df)
+            self._build(webgl)
+            return self.fig
+
+        tail = self._extract(df.iloc[keep:])
+        self._columns = {
+            name: np.concatenate([self._columns[name][:keep], tail[name]]) for name in self._columns
+        }
+        self._refresh()
+        return self.fig
+
+    def _build(self, webgl: bool):
+        c = self._columns
+        self.rebuilds += 1
+        self._webgl = webgl
+        self._rsi = 'rsi' in c
+
+        fig = make_subplots(
+            rows=3, cols=1,
+            shared_xaxes=True,
+            vertical_spacing=0.05,
+            row_heights=[0.5, 0.25, 0.25],
+            subplot_titles=(f"{self.symbol} - Prix", "Volume", "RSI")
+        )
+
+        if self._webgl:
+            fig.add_trace(go.Scattergl(x=c['date'], y=c['close'], mode='lines', name='Prix',
+                                       showlegend=False), row=1, col=1)
+            fig.add_trace(go.Scattergl(x=c['date'], y=c['volume'], mode='lines', fill='tozeroy',
+                                       name='Volume', showlegend=False), row=2, col=1)
+        else:
+            fig.add_trace(go.Candlestick(x=c['date'], open=c['open'], high=c['high'], low=c['low'],
+                                         close=c['close'], name='Prix', showlegend=False), row=1, col=1)
+            fig.add_trace(go.Bar(x=c['date'], y=c['volume'], name='Volume',
+                                 marker=dict(color=c['color'], colorscale=VOLUME_COLORSCALE, cmin=0, cmax=1),
+                                 showlegend=False), row=2, col=1)
+
+        if self._rsi:
+            rsi_trace = go.Scattergl if self._webgl else go.Scatter
+            fig.add_trace(rsi_trace(x=c['date'], y=c['rsi'], line=dict(color='purple'), name='RSI',
+                                    showlegend=False), row=3, col=1)
+            fig.add_hline(y=70, line_dash="dash", line_color="red", row=3, col=1)
+            fig.add_hline(y=30, line_dash="dash", line_color="green", row=3, col=1)
+
+        fig.update_layout(
+            height=800,
+            template='plotly_white',
+            showlegend=False,
+            hovermode='x unified'
+        )
+        self.fig = fig
+
+    def _refresh(self):
+        c = self._columns
+        price, volume = self.fig.data[0], self.fig.data[1]
+        with self.fig.batch_update():
+            if self._webgl:
+                price.update(x=c['date'], y=c['close'])
+                volume.update(x=c['date'], y=c['volume'])
+            else:
+                price.update(x=c['date'], open=c['open'], high=c['high'], low=c['low'], close=c['close'])
+                volume.update(x=c['date'], y=c['volume'], marker_color=c['color'])
+            if self._rsi:
+                self.fig.data[2].update(x=c['date'], y=c['rsi'])
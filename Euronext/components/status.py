@@ -2,7 +2,6 @@
 import streamlit as st
 from datetime import datetime
 from typing import Optional, Dict, List
-import time
 
 class StatusDisplay:
     """Gestionnaire d'affichage des statuts"""
@@ -70,11 +69,8 @@ class StatusDisplay:
     
     @staticmethod
     def show_success_message(message: str, duration: int = 3):
-        """Affiche un message de succès temporaire"""
-        placeholder = st.empty()
-        placeholder.success(f"✅ {message}")
-        time.sleep(duration)
-        placeholder.empty()
+        """Affiche un message de succès temporaire, sans bloquer le script"""
+        st.toast(f"✅ {message}", duration=duration)
     
     @staticmethod
     def show_loading_state(message: str = "Chargement en cours..."):
@@ -0,0 +1,14 @@
+# components/tables.py - Formats d'affichage des tableaux
+from typing import Dict
+
+import streamlit as st
+
+from utils.formatters import StockFormatter
+
+
+def historical_column_config() -> Dict:
+    """Formats pour `st.dataframe(..., column_config=...)` d'un historique formaté en mode numérique"""
+    config = {col: st.column_config.NumberColumn(col, format="euro") for col in StockFormatter.PRICE_COLUMNS}
+    config['Volume'] = st.column_config.NumberColumn("Volume", format="localized")
+    config['Date'] = st.column_config.DateColumn("Date", format="DD/MM/YYYY")
+    return config
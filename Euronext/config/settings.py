@@ -1,5 +1,6 @@
 # config/settings.py
 import os
+from pathlib import Path
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -8,10 +9,72 @@ class APIConfig:
     BASE_URL = os.getenv("API_BASE_URL", "https://api.example.com")
     API_KEY = os.getenv("API_KEY", "")
     TIMEOUT = 30
+    CONNECT_TIMEOUT = 3.05
+    READ_TIMEOUT = 10
+    POOL_SIZE = 16
     MAX_REQUESTS_PER_MINUTE = 30
     CACHE_TTL = 3600
     MAX_RETRIES = 3
+    QUOTE_BATCH_SIZE = 50
     BACKOFF_FACTOR = 1.0
+    YAHOO_BASE_URL = os.getenv("YAHOO_BASE_URL", "https://query1.finance.yahoo.com")
+    ALPHA_VANTAGE_URL = os.getenv("ALPHA_VANTAGE_URL", "https://www.alphavantage.co/query")
+
+class RateLimitConfig:
+    # Budgets par fournisseur, partagés par tout le processus : (requêtes, période en s)
+    LIMITS = {
+        "yahoo": [(120, 60), (2000, 3600)],
+        "alpha": [(5, 60), (25, 86400)],  # Offre gratuite Alpha Vantage
+    }
+
+class FetchConfig:
+    MAX_WORKERS = 16
+    POOL_SIZE = 32  # Threads de requêtes partagés par toutes les sessions
+    DEADLINE = 12.0
+
+class CacheConfig:
+    QUOTE_TTL = 5
+    HISTORY_TTL = 60
+    MAX_BYTES = int(os.getenv("CACHE_MAX_MB", "256")) * 1024 * 1024  # Budget mémoire du cache partagé
+    SWEEP_INTERVAL = 30  # Purge des entrées expirées (s)
+    PERSISTENT = os.getenv("CACHE_PERSISTENT", "1") != "0"  # Cache disque (L2) derrière la mémoire
+    DISK_MAX_BYTES = int(os.getenv("CACHE_DISK_MAX_MB", "1024")) * 1024 * 1024
+
+class HistoryConfig:
+    BACKFILL_PERIOD = "1y"
+    MIN_SYNC_INTERVAL = 60
+    DISPLAY_DAYS = 31
+
+class WriterConfig:
+    BATCH_SIZE = 200
+    FLUSH_INTERVAL = 2.0
+    MAX_QUEUE = 50000
+
+class BarConfig:
+    MAX_BARS = 1000
+
+class PollerConfig:
+    SUBSCRIPTION_TTL = 30  # Abonnement d'une session non renouvelée (s)
+    MIN_INTERVAL = CacheConfig.QUOTE_TTL  # Plus souvent, le cache resservirait la même cotation
+    MAX_INTERVAL = 300
+    MARKET_HOURS = os.getenv("POLL_MARKET_HOURS", "1") != "0"  # 0 : interroger même marché fermé
+    REFERENCE_VOLATILITY = 0.018  # Volatilité journalière d'un titre « normal »
+    VOLATILITY_ALPHA = 0.2
+
+class IndicatorConfig:
+    MEMO_ENTRIES = 512  # Résultats intermédiaires gardés en mémoire
+
+class ChartConfig:
+    WEBGL_THRESHOLD = 5000  # Au-delà (points par trace), traces WebGL au lieu de SVG
+    WIDTH_PX = 1200         # Largeur utile d'un graphique en mise en page « wide »
+    POINTS_PER_PIXEL = 2    # Séries en ligne (LTTB)
+    BARS_PER_PIXEL = 1      # Chandeliers et barres de volume (min/max par seau)
+
+class StorageConfig:
+    DATA_DIR = Path(__file__).resolve().parent.parent
+    COLUMNAR_DIR = os.getenv("COLUMNAR_DIR", str(DATA_DIR / "columnar"))
+    DB_PATH = os.getenv("STOCK_DB_PATH", str(DATA_DIR / "stock_data.db"))
+    CACHE_PATH = os.getenv("CACHE_DB_PATH", str(DATA_DIR / "cache.db"))
 
 class AppConfig:
     APP_NAME = "Analyse Financière MC.PA"
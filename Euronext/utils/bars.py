@@ -0,0 +1,254 @@
+# utils/bars.py - Agrégation de ticks en barres OHLCV et rééchantillonnage
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from config.settings import BarConfig
+
+# Unités intrajournalières construites à partir des cotations (en secondes)
+INTRADAY_TIMEFRAMES = {"1m": 60, "5m": 300, "15m": 900, "1h": 3600}
+
+# Unités obtenues en regroupant des barres journalières
+RESAMPLE_RULES = ("W", "M", "Q")
+
+BAR_COLUMNS = ['date', 'open', 'high', 'low', 'close', 'volume']
+
+
+def _epoch_seconds(ts) -> float:
+    """Secondes depuis l'epoch ; une date naïve est lue comme heure murale"""
+    if isinstance(ts, (int, float)):
+        return float(ts)
+    if isinstance(ts, str):
+        ts = datetime.fromisoformat(ts)
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.timestamp()
+
+
+class _Bar:
+    __slots__ = ("start", "open", "high", "low", "close", "volume")
+
+    def __init__(self, start: int, price: float, volume: float):
+        self.start = start
+        self.open = self.high = self.low = self.close = price
+        self.volume = volume
+
+    def as_row(self):
+        return (self.start, self.open, self.high, self.low, self.close, self.volume)
+
+
+def _frame(rows) -> pd.DataFrame:
+    df = pd.DataFrame(rows, columns=BAR_COLUMNS)
+    df['date'] = pd.to_datetime(df['date'], unit='s')
+    return df
+
+
+class BarAggregator:
+    """Construit des barres intrajournalières à partir des cotations
+
+    Chaque cotation met à jour la barre courante de chaque unité en temps
+    constant ; quand une cotation tombe dans une nouvelle période, la barre
+    courante est close et rangée dans un tampon borné. Le volume des
+    fournisseurs étant cumulé sur la séance, c'est sa variation qui est
+    attribuée à la barre.
+    """
+
+    def __init__(self, timeframes: Iterable[str] = tuple(INTRADAY_TIMEFRAMES), max_bars: int = BarConfig.MAX_BARS):
+        self.timeframes = {tf: INTRADAY_TIMEFRAMES[tf] for tf in timeframes}
+        self.max_bars = max_bars
+        self._lock = threading.Lock()
+        self._closed: Dict[tuple, deque] = {}
+        self._current: Dict[tuple, _Bar] = {}
+        self._last_tick: Dict[str, tuple] = {}
+        self._seeded = set()
+
+    def _volume_delta(self, symbol: str, ts: float, volume: Optional[float]) -> float:
+        """Variation du volume cumulé depuis la cotation précédente"""
+        if volume is None:
+            return 0.0
+        last = self._last_tick.get(symbol)
+        day = int(ts // 86400)
+        self._last_tick[symbol] = (ts, day, volume)
+        if last is None:
+            return 0.0
+        if last[1] != day or volume < last[2]:
+            # Nouvelle séance : le cumul repart de zéro
+            return float(volume)
+        return float(volume - last[2])
+
+    def on_tick(self, symbol: str, ts, price: float, volume: Optional[float] = None) -> bool:
+        """Intègre une cotation ; False si elle n'est pas plus récente que la précédente"""
+        ts = _epoch_seconds(ts)
+        with self._lock:
+            last = self._last_tick.get(symbol)
+            if last is not None and ts <= last[0]:
+                return False
+            delta = self._volume_delta(symbol, ts, volume)
+
+            for tf, seconds in self.timeframes.items():
+                key = (symbol, tf)
+                start = int(ts - ts % seconds)
+                bar = self._current.get(key)
+                if bar is None or start != bar.start:
+                    if bar is not None:
+                        self._closed.setdefault(key, deque(maxlen=self.max_bars)).append(bar.as_row())
+                    self._current[key] = _Bar(start, price, delta)
+                else:
+                    if price > bar.high:
+                        bar.high = price
+                    if price < bar.low:
+                        bar.low = price
+                    bar.close = price
+                    bar.volume += delta
+            return True
+
+    def is_seeded(self, symbol: str) -> bool:
+        with self._lock:
+            return symbol in self._seeded
+
+    def seed(self, symbol: str, ticks: Optional[pd.DataFrame]):
+        """Reconstruit les barres d'un symbole à partir de cotations stockées
+
+        `ticks` contient les colonnes timestamp, price et volume (table
+        stock_prices). Les cotations reçues ensuite via `on_tick`
+        prolongent les barres reconstruites.
+        """
+        with self._lock:
+            self._seeded.add(symbol)
+            if ticks is None or ticks.empty:
+                return
+            for tf in self.timeframes:
+                bars = rollup_ticks(ticks, tf)
+                if bars.empty:
+                    continue
+                rows = list(zip(
+                    (bars['date'].values.astype('datetime64[s]').astype(np.int64)).tolist(),
+                    bars['open'].tolist(), bars['high'].tolist(), bars['low'].tolist(),
+                    bars['close'].tolist(), bars['volume'].tolist()
+                ))
+                self._closed[(symbol, tf)] = deque(rows[:-1], maxlen=self.max_bars)
+                last = rows[-1]
+                bar = _Bar(last[0], last[1], last[5])
+                bar.high, bar.low, bar.close = last[2], last[3], last[4]
+                self._current[(symbol, tf)] = bar
+
+            ts = ticks['timestamp'].map(_epoch_seconds).to_numpy()
+            last_ts = float(ts.max())
+            last_volume = ticks['volume'].to_numpy()[int(ts.argmax())]
+            self._last_tick[symbol] = (last_ts, int(last_ts // 86400), last_volume)
+
+    def get_bars(self, symbol: str, timeframe: str, include_current: bool = True) -> pd.DataFrame:
+        """Barres d'un symbole (colonnes date, open, high, low, close, volume)"""
+        key = (symbol, timeframe)
+        with self._lock:
+            rows = list(self._closed.get(key, ()))
+            if include_current and key in self._current:
+                rows.append(self._current[key].as_row())
+        return _frame(rows)
+
+
+def rollup_ticks(ticks: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+    """Agrège des cotations (timestamp, price, volume cumulé) en barres, vectorisé"""
+    if ticks is None or ticks.empty:
+        return _frame([])
+
+    seconds = INTRADAY_TIMEFRAMES[timeframe]
+    ts = pd.to_datetime(ticks['timestamp']).values.astype('datetime64[s]').astype(np.int64)
+    order = np.argsort(ts, kind='stable')
+    ts = ts[order]
+    price = ticks['price'].to_numpy(dtype=float)[order]
+    cumulative = ticks['volume'].fillna(0).to_numpy(dtype=float)[order]
+
+    # Volume par cotation = variation du cumul de séance
+    day = ts // 86400
+    volume = np.diff(cumulative, prepend=cumulative[0])
+    new_day = np.r_[False, day[1:] != day[:-1]]
+    volume[new_day] = cumulative[new_day]
+    volume[volume < 0] = cumulative[volume < 0]
+
+    return _group_bars(ts - ts % seconds, price, price, price, price, volume, unit='s')
+
+
+def _group_bars(keys, opens, highs, lows, closes, volumes, unit) -> pd.DataFrame:
+    """Regroupe des séries triées par clé de période (une barre par clé)"""
+    boundaries = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+    starts = np.r_[0, boundaries]
+    ends = np.r_[boundaries - 1, len(keys) - 1]
+    df = pd.DataFrame({
+        'date': keys[starts],
+        'open': opens[starts],
+        'high': np.maximum.reduceat(highs, starts),
+        'low': np.minimum.reduceat(lows, starts),
+        'close': closes[ends],
+        'volume': np.add.reduceat(volumes, starts)
+    })
+    df['date'] = pd.to_datetime(df['date'], unit=unit) if unit else pd.to_datetime(df['date'])
+    return df
+
+
+def resample_bars(df: pd.DataFrame, rule: str) -> pd.DataFrame:
+    """Regroupe des barres journalières en semaines, mois ou trimestres
+
+    `rule` vaut "W", "M" ou "Q" ; chaque barre est datée du premier jour
+    de sa période. Calcul vectorisé, sans appel au fournisseur.
+    """
+    if df is None or df.empty:
+        return df
+    if rule not in RESAMPLE_RULES:
+        raise ValueError(f"Unité inconnue: {rule}")
+
+    df = df.sort_values('date')
+    days = df['date'].values.astype('datetime64[D]')
+    if rule == "W":
+        # 1970-01-01 était un jeudi : +3 ramène le lundi à 0
+        offset = (days.astype(np.int64) + 3) % 7
+        keys = days - offset.astype('timedelta64[D]')
+    else:
+        months = days.astype('datetime64[M]').astype(np.int64)
+        if rule == "Q":
+            months = months - months % 3
+        keys = months.astype('datetime64[M]').astype('datetime64[D]')
+
+    return _group_bars(
+        keys,
+        df['open'].to_numpy(dtype=float),
+        df['high'].to_numpy(dtype=float),
+        df['low'].to_numpy(dtype=float),
+        df['close'].to_numpy(dtype=float),
+        df['volume'].to_numpy(dtype=float),
+        unit=None
+    )
+
+
+def merge_quote(df: pd.DataFrame, ts, price: float, volume: Optional[float] = None) -> pd.DataFrame:
+    """Intègre une cotation en direct dans la dernière barre journalière
+
+    La barre du jour est prolongée (clôture, extrêmes, volume cumulé de
+    séance) ; si l'historique s'arrête la veille, une barre est ajoutée
+    pour un jour ouvré. Retourne une copie, l'historique en cache n'est
+    pas modifié.
+    """
+    if df is None or df.empty or price is None:
+        return df
+
+    day = pd.Timestamp(datetime.fromisoformat(ts) if isinstance(ts, str) else ts).normalize()
+    last = df['date'].iloc[-1].normalize()
+    if day < last or (day > last and day.dayofweek >= 5):
+        return df
+
+    df = df.copy()
+    if day == last:
+        i = df.index[-1]
+        df.loc[i, 'close'] = price
+        df.loc[i, 'high'] = max(df.at[i, 'high'], price)
+        df.loc[i, 'low'] = min(df.at[i, 'low'], price)
+        if volume:
+            df.loc[i, 'volume'] = max(df.at[i, 'volume'], volume)
+        return df
+
+    row = {'date': day, 'open': price, 'high': price, 'low': price, 'close': price, 'volume': volume or 0}
+    return pd.concat([df, pd.DataFrame([row]).astype({c: df[c].dtype for c in row if c in df})], ignore_index=True)
@@ -0,0 +1,213 @@
+# utils/columnar_store.py - Stockage colonnaire des historiques (mmap)
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config.settings import StorageConfig
+
+FIELDS = {
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'volume': np.int64,
+}
+DATE_FILE = 'date'
+CURRENT_FILE = 'CURRENT'
+
+
+def _to_day(value) -> np.datetime64:
+    """Convertit une date (str, datetime, Timestamp) en datetime64[D]"""
+    return np.datetime64(pd.Timestamp(value).date(), 'D')
+
+
+class ColumnarStore:
+    """Historiques journaliers stockés par colonne, un fichier .npy par champ
+
+    Chaque symbole a un répertoire contenant un index de dates trié
+    (`date.npy`, datetime64[D]) et un tableau typé par champ OHLCV, dans
+    un sous-répertoire par génération désigné par le fichier CURRENT. Les
+    fichiers sont ouverts en mmap : `load_column` retourne une vue NumPy
+    sans copie, découpée par recherche dichotomique dans l'index.
+
+    Le stockage est alimenté par `import_from_database` ; l'application ne
+    le lit pas, ses panels sont construits à partir de SQLite
+    (`panel_indicators.build_panel`).
+    """
+
+    def __init__(self, root=StorageConfig.COLUMNAR_DIR):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._maps: Dict[Tuple[str, int, str], np.ndarray] = {}
+        self._lock = threading.Lock()
+        self._write_locks: Dict[str, threading.Lock] = {}
+
+    def _dir(self, symbol: str) -> Path:
+        return self.root / symbol
+
+    def _generation(self, symbol: str) -> Optional[int]:
+        """Génération courante du symbole (None s'il n'existe pas)"""
+        try:
+            return int((self._dir(symbol) / CURRENT_FILE).read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _path(self, symbol: str, generation: int, field: str) -> Path:
+        return self._dir(symbol) / f"g{generation}" / f"{field}.npy"
+
+    def _open(self, symbol: str, generation: int, field: str) -> np.ndarray:
+        """Ouvre (ou réutilise) la projection mémoire d'une colonne"""
+        key = (symbol, generation, field)
+        with self._lock:
+            array = self._maps.get(key)
+        if array is None:
+            array = np.load(self._path(symbol, generation, field), mmap_mode='r')
+            with self._lock:
+                self._maps[key] = array
+        return array
+
+    def symbols(self) -> List[str]:
+        """Liste les symboles présents"""
+        return sorted(p.name for p in self.root.iterdir() if (p / CURRENT_FILE).exists())
+
+    def _bounds(self, symbol: str, start_date, end_date) -> Tuple[Optional[int], int, int]:
+        generation = self._generation(symbol)
+        if generation is None:
+            return None, 0, 0
+        dates = self._open(symbol, generation, DATE_FILE)
+        lo = 0 if start_date is None else int(np.searchsorted(dates, _to_day(start_date), side='left'))
+        hi = len(dates) if end_date is None else int(np.searchsorted(dates, _to_day(end_date), side='right'))
+        return generation, lo, hi
+
+    def load_dates(self, symbol: str, start_date=None, end_date=None) -> np.ndarray:
+        """Vue sur l'index de dates entre deux bornes incluses"""
+        generation, lo, hi = self._bounds(symbol, start_date, end_date)
+        if generation is None:
+            return np.empty(0, dtype='datetime64[D]')
+        return self._open(symbol, generation, DATE_FILE)[lo:hi]
+
+    def load_column(self, symbol: str, field: str, start_date=None, end_date=None) -> np.ndarray:
+        """Vue sans copie sur une colonne entre deux bornes incluses"""
+        generation, lo, hi = self._bounds(symbol, start_date, end_date)
+        if generation is None:
+            return np.empty(0, dtype=FIELDS[field])
+        return self._open(symbol, generation, field)[lo:hi]
+
+    def load_prices(self, symbol, start_date, end_date) -> pd.DataFrame:
+        """Charge les prix historiques
+
+        Mêmes colonnes que `Database.load_prices` (symbol, date, OHLCV,
+        Date), sans l'identifiant `id` de la table SQLite.
+        """
+        generation, lo, hi = self._bounds(symbol, start_date, end_date)
+        if generation is None or hi <= lo:
+            return pd.DataFrame(columns=['symbol', 'date', *FIELDS])
+
+        day_index = np.asarray(self._open(symbol, generation, DATE_FILE)[lo:hi])
+        df = pd.DataFrame({
+            'symbol': symbol,
+            'date': np.datetime_as_string(day_index, unit='D'),
+            **{field: np.asarray(self._open(symbol, generation, field)[lo:hi]) for field in FIELDS}
+        })
+        df['Date'] = pd.to_datetime(day_index)
+        return df
+
+    def load_panel(self, symbols: Iterable[str], field: str = 'close',
+                   start_date=None, end_date=None) -> Tuple[np.ndarray, List[str], np.ndarray]:
+        """Matrice temps × symboles d'un champ, NaN les jours sans cotation
+
+        Retourne (dates, symboles, matrice) sur l'union des dates.
+        """
+        symbols = list(symbols)
+        bounds = [self._bounds(s, start_date, end_date) for s in symbols]
+        date_views = [
+            self._open(s, g, DATE_FILE)[lo:hi] if g is not None else np.empty(0, dtype='datetime64[D]')
+            for s, (g, lo, hi) in zip(symbols, bounds)
+        ]
+        all_dates = np.unique(np.concatenate(date_views)) if date_views else np.empty(0, dtype='datetime64[D]')
+
+        panel = np.full((len(all_dates), len(symbols)), np.nan)
+        for j, (symbol, (generation, lo, hi), dates) in enumerate(zip(symbols, bounds, date_views)):
+            if len(dates):
+                rows = np.searchsorted(all_dates, dates)
+                panel[rows, j] = self._open(symbol, generation, field)[lo:hi]
+        return all_dates, symbols, panel
+
+    def save_prices(self, symbol, df: pd.DataFrame) -> int:
+        """Fusionne un DataFrame OHLCV dans le stockage, retourne le nombre de jours
+
+        Accepte les colonnes `Date/Open/...` ou `date/open/...`. Les dates
+        déjà présentes sont remplacées. Une nouvelle génération de fichiers
+        est écrite puis publiée atomiquement : les lecteurs voient soit
+        l'ancienne version complète, soit la nouvelle, et les vues déjà
+        ouvertes restent valides.
+        """
+        frame = df.rename(columns=str.lower)
+        new_dates = pd.to_datetime(frame['date']).values.astype('datetime64[D]')
+        new_columns = {field: frame[field].to_numpy(dtype=dtype) for field, dtype in FIELDS.items()}
+
+        # En cas de doublons dans le DataFrame, la dernière ligne l'emporte
+        _, last = np.unique(new_dates[::-1], return_index=True)
+        if len(last) < len(new_dates):
+            keep_new = np.sort(len(new_dates) - 1 - last)
+            new_dates = new_dates[keep_new]
+            new_columns = {field: values[keep_new] for field, values in new_columns.items()}
+
+        with self._lock:
+            write_lock = self._write_locks.setdefault(symbol, threading.Lock())
+
+        with write_lock:
+            current = self._generation(symbol)
+            if current is not None:
+                old_dates = self._open(symbol, current, DATE_FILE)
+                keep = ~np.isin(old_dates, new_dates)
+                dates = np.concatenate([old_dates[keep], new_dates])
+                columns = {
+                    field: np.concatenate([self._open(symbol, current, field)[keep], new_columns[field]])
+                    for field in FIELDS
+                }
+            else:
+                dates, columns = new_dates, new_columns
+
+            generation = (current or 0) + 1
+            folder = self._dir(symbol) / f"g{generation}"
+            folder.mkdir(parents=True, exist_ok=True)
+
+            order = np.argsort(dates, kind='stable')
+            np.save(folder / f"{DATE_FILE}.npy", np.ascontiguousarray(dates[order]))
+            for field, values in columns.items():
+                np.save(folder / f"{field}.npy", np.ascontiguousarray(values[order]))
+
+            tmp = self._dir(symbol) / f"{CURRENT_FILE}.tmp"
+            tmp.write_text(str(generation))
+            os.replace(tmp, self._dir(symbol) / CURRENT_FILE)
+
+            # On garde la génération précédente pour les lecteurs en cours
+            if current is not None:
+                self._drop_generation(symbol, current - 1)
+            return len(dates)
+
+    def _drop_generation(self, symbol: str, generation: int):
+        folder = self._dir(symbol) / f"g{generation}"
+        if not folder.exists():
+            return
+        with self._lock:
+            for key in [k for k in self._maps if k[0] == symbol and k[1] == generation]:
+                del self._maps[key]
+        shutil.rmtree(folder, ignore_errors=True)
+
+    def import_from_database(self, database, symbol, start_date, end_date, chunksize: int = 50000) -> int:
+        """Copie l'historique d'un symbole depuis `utils.database.Database`
+
+        Les morceaux lus sont réunis puis enregistrés en une seule
+        génération, au lieu d'une réécriture complète par morceau.
+        """
+        chunks = [chunk[['date', *FIELDS]] for chunk in database.iter_prices(symbol, start_date, end_date, chunksize)]
+        if not chunks:
+            return 0
+        return self.save_prices(symbol, pd.concat(chunks, ignore_index=True))
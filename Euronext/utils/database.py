@@ -1,12 +1,24 @@
 # utils/database.py - Nouveau fichier
 import sqlite3
 import pandas as pd
+import numpy as np
 from datetime import datetime
+from typing import Dict, Iterator, Optional
 import streamlit as st
 
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+
 class Database:
-    def __init__(self):
-        self.conn = sqlite3.connect('stock_data.db', check_same_thread=False)
+    LOAD_SQL = '''
+        SELECT * FROM stock_prices
+        WHERE symbol = ? AND date BETWEEN ? AND ?
+        ORDER BY date
+    '''
+    
+    def __init__(self, db_path='stock_data.db'):
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
         self.create_tables()
     
     def create_tables(self):
@@ -26,36 +38,91 @@ class Database:
         ''')
         self.conn.commit()
     
-    def save_prices(self, symbol, df):
-        """Sauvegarde les prix historiques"""
-        for _, row in df.iterrows():
-            try:
-                self.conn.execute('''
-                    INSERT OR REPLACE INTO stock_prices 
-                    (symbol, date, open, high, low, close, volume)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    symbol,
-                    row['Date'].strftime('%Y-%m-%d'),
-                    row['Open'],
-                    row['High'],
-                    row['Low'],
-                    row['Close'],
-                    row['Volume']
-                ))
-            except:
-                pass
-        self.conn.commit()
+    @staticmethod
+    def _prepare_rows(symbol, df):
+        """Valide un DataFrame par colonnes et construit les lignes à insérer
+        
+        Retourne (lignes, rejets) où rejets est une liste de
+        (index, raison) pour les lignes écartées.
+        """
+        dates = pd.to_datetime(df['Date'], errors='coerce')
+        prices = df[PRICE_COLUMNS].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+        volumes = pd.to_numeric(df['Volume'], errors='coerce').to_numpy(dtype=float)
+        
+        bad_date = dates.isna().to_numpy()
+        bad_price = ~np.isfinite(prices).all(axis=1)
+        bad_volume = ~np.isfinite(volumes) | (volumes < 0)
+        rejected_mask = bad_date | bad_price | bad_volume
+        
+        reasons = np.select(
+            [bad_date, bad_price, bad_volume],
+            ["date invalide", "prix manquant ou invalide", "volume invalide"],
+            default=""
+        )
+        rejected = list(zip(df.index[rejected_mask].tolist(), reasons[rejected_mask].tolist()))
+        
+        keep = ~rejected_mask
+        day_strings = dates[keep].dt.strftime('%Y-%m-%d').tolist()
+        kept_prices = prices[keep]
+        rows = zip(
+            [symbol] * len(day_strings),
+            day_strings,
+            kept_prices[:, 0].tolist(),
+            kept_prices[:, 1].tolist(),
+            kept_prices[:, 2].tolist(),
+            kept_prices[:, 3].tolist(),
+            volumes[keep].astype(np.int64).tolist()
+        )
+        return list(rows), rejected
+    
+    def _insert_rows(self, rows):
+        self.conn.executemany('''
+            INSERT OR REPLACE INTO stock_prices
+            (symbol, date, open, high, low, close, volume)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
     
-    def load_prices(self, symbol, start_date, end_date):
-        """Charge les prix historiques"""
-        query = '''
-            SELECT * FROM stock_prices 
-            WHERE symbol = ? AND date BETWEEN ? AND ?
-            ORDER BY date
-        '''
-        df = pd.read_sql_query(query, self.conn, 
+    def save_prices(self, symbol, df) -> Dict:
+        """Sauvegarde les prix historiques
+        
+        Insertion en un seul `executemany` ; les lignes invalides ne sont
+        pas insérées et sont listées dans le rapport retourné :
+        {"saved": n, "rejected": [(index, raison), ...]}.
+        """
+        rows, rejected = self._prepare_rows(symbol, df)
+        with self.conn:
+            self._insert_rows(rows)
+        return {"saved": len(rows), "rejected": rejected}
+    
+    def save_prices_bulk(self, frames: Dict[str, pd.DataFrame]) -> Dict[str, Dict]:
+        """Sauvegarde plusieurs symboles dans une seule transaction"""
+        reports = {}
+        with self.conn:
+            for symbol, df in frames.items():
+                rows, rejected = self._prepare_rows(symbol, df)
+                self._insert_rows(rows)
+                reports[symbol] = {"saved": len(rows), "rejected": rejected}
+        return reports
+    
+    def load_prices(self, symbol, start_date, end_date, chunksize: Optional[int] = None):
+        """Charge les prix historiques
+        
+        Avec `chunksize`, retourne un générateur de DataFrames de
+        `chunksize` lignes au plus, pour parcourir de longues périodes sans
+        tout charger en mémoire.
+        """
+        if chunksize:
+            return self.iter_prices(symbol, start_date, end_date, chunksize)
+        df = pd.read_sql_query(self.LOAD_SQL, self.conn,
                                params=[symbol, start_date, end_date])
         if not df.empty:
             df['Date'] = pd.to_datetime(df['date'])
         return df
+    
+    def iter_prices(self, symbol, start_date, end_date, chunksize: int = 50000) -> Iterator[pd.DataFrame]:
+        """Parcourt les prix historiques par blocs"""
+        for chunk in pd.read_sql_query(self.LOAD_SQL, self.conn,
+                                       params=[symbol, start_date, end_date],
+                                       chunksize=chunksize):
+            chunk['Date'] = pd.to_datetime(chunk['date'])
+            yield chunk
@@ -0,0 +1,152 @@
+# utils/decimation.py - Réduction de points préservant la forme des séries
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from config.settings import ChartConfig
+
+
+def target_points(width_px: Optional[int] = None, per_pixel: float = ChartConfig.POINTS_PER_PIXEL) -> int:
+    """Nombre de points utiles pour une zone de `width_px` pixels"""
+    return max(2, int((width_px or ChartConfig.WIDTH_PX) * per_pixel))
+
+
+def _bucket_starts(n: int, buckets: int) -> np.ndarray:
+    """Débuts de seaux de taille fixe, alignés sur la première ligne
+
+    Une taille fixe (et non n / buckets arrondi par seau) garde les seaux
+    déjà formés identiques quand des lignes s'ajoutent en fin de série.
+    """
+    size = -(-n // buckets)
+    return np.arange(0, n, size)
+
+
+def minmax_indices(y: np.ndarray, buckets: int) -> np.ndarray:
+    """Indices du minimum et du maximum de chaque seau (plus premier et dernier point)
+
+    Aucun extrême n'est perdu : au plus 2 × buckets + 2 indices, triés.
+    Les NaN sont ignorés.
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= 2 * buckets + 2:
+        return np.arange(n)
+    size = -(-n // buckets)
+    rows = -(-n // size)
+    padded = np.full(rows * size, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(rows, size)
+    valid = ~np.isnan(padded).all(axis=1)
+    offsets = np.arange(rows)[valid] * size
+    padded = padded[valid]
+    lows = np.argmin(np.where(np.isnan(padded), np.inf, padded), axis=1) + offsets
+    highs = np.argmax(np.where(np.isnan(padded), -np.inf, padded), axis=1) + offsets
+    return np.unique(np.concatenate([[0, n - 1], lows, highs]))
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets : indices de `n_out` points représentatifs
+
+    Chaque seau garde le point formant le plus grand triangle avec le point
+    retenu au seau précédent et la moyenne du seau suivant. Une
+    présélection min/max vectorisée (MinMaxLTTB) réduit la série à quatre
+    candidats par seau ; la sélection, séquentielle par nature, ne parcourt
+    plus que ces candidats, quelle que soit la taille de la série.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # Présélection des extrêmes : 4 candidats par seau de sortie
+    candidates = minmax_indices(y, 2 * n_out) if n > 8 * n_out else np.arange(n)
+    cx, cy = x[candidates], y[candidates]
+    m = len(candidates)
+    if n_out >= m:
+        return candidates
+
+    # Seaux intérieurs [bounds[i], bounds[i + 1]) ; le dernier point forme son propre seau
+    every = (m - 2) / (n_out - 2)
+    bounds = (np.arange(n_out - 1) * every).astype(np.int64) + 1
+    bounds[-1] = m - 1
+    counts = np.diff(np.r_[bounds, m])
+    avg_x = np.add.reduceat(cx, bounds) / counts
+    avg_y = np.add.reduceat(np.nan_to_num(cy), bounds) / counts
+
+    # Après présélection, un seau compte au plus quelques points : des listes
+    # Python coûtent moins cher ici que des opérations NumPy sur 2 à 8 éléments
+    xs, ys = cx.tolist(), np.nan_to_num(cy).tolist()
+    next_x, next_y = avg_x[1:].tolist(), avg_y[1:].tolist()
+    limits = bounds.tolist()
+    selected = [0]
+    a = 0
+    for i in range(n_out - 2):
+        ax, ay, bx, by = xs[a], ys[a], next_x[i], next_y[i]
+        best, best_area = limits[i], -1.0
+        for j in range(limits[i], limits[i + 1]):
+            area = abs((ax - bx) * (ys[j] - ay) - (ax - xs[j]) * (by - ay))
+            if area > best_area:
+                best, best_area = j, area
+        a = best
+        selected.append(a)
+    selected.append(m - 1)
+    return candidates[np.asarray(selected)]
+
+
+def _numeric_x(values) -> np.ndarray:
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype('datetime64[ns]').astype(np.int64).astype(float)
+    return values.astype(float)
+
+
+def decimate_line(df: pd.DataFrame, x: str, y: str, n_out: Optional[int] = None) -> pd.DataFrame:
+    """Lignes de `df` retenues par LTTB sur (x, y) ; inchangé si déjà assez court"""
+    n_out = n_out or target_points()
+    if df is None or len(df) <= n_out:
+        return df
+    return df.iloc[lttb_indices(_numeric_x(df[x]), df[y].to_numpy(dtype=float), n_out)]
+
+
+def decimate_ohlc(df: pd.DataFrame, max_bars: Optional[int] = None,
+                  date: str = 'date', extra: Sequence[str] = ()) -> pd.DataFrame:
+    """Regroupe des barres OHLCV en au plus `max_bars` barres
+
+    Ouverture du premier, plus haut et plus bas du seau, clôture et
+    `extra` (indicateurs) du dernier, volume cumulé : aucun extrême de
+    prix n'est perdu. Chaque barre est datée de sa première ligne.
+    """
+    max_bars = max_bars or target_points(per_pixel=ChartConfig.BARS_PER_PIXEL)
+    if df is None or len(df) <= max_bars:
+        return df
+
+    starts = _bucket_starts(len(df), max_bars)
+    ends = np.r_[starts[1:] - 1, len(df) - 1]
+    columns = {
+        date: df[date].to_numpy()[starts],
+        'open': df['open'].to_numpy(dtype=float)[starts],
+        'high': np.fmax.reduceat(df['high'].to_numpy(dtype=float), starts),
+        'low': np.fmin.reduceat(df['low'].to_numpy(dtype=float), starts),
+        'close': df['close'].to_numpy(dtype=float)[ends],
+        'volume': np.add.reduceat(np.nan_to_num(df['volume'].to_numpy(dtype=float)), starts),
+    }
+    for column in extra:
+        if column in df.columns and column not in columns:
+            columns[column] = df[column].to_numpy()[ends]
+    return pd.DataFrame(columns)
+
+
+def decimate_rows(df: pd.DataFrame, max_rows: int, column: Optional[str] = None) -> pd.DataFrame:
+    """Sous-ensemble de lignes réelles gardant les extrêmes de `column` (min/max par seau)"""
+    if df is None or len(df) <= max_rows:
+        return df
+    if column is None:
+        numeric = df.select_dtypes('number').columns
+        column = next((c for c in ('close', 'Close', 'Clôture') if c in df.columns),
+                      numeric[0] if len(numeric) else None)
+    if column is None:
+        return df.iloc[np.linspace(0, len(df) - 1, max_rows, dtype=int)]
+    indices = minmax_indices(df[column].to_numpy(dtype=float), max(1, (max_rows - 2) // 2))
+    return df.iloc[indices]
@@ -4,24 +4,151 @@ from typing import Any, Union, Optional, Dict, List
 import pandas as pd
 import numpy as np
 
+from utils.decimation import decimate_rows
+
+# Séparateurs français : espace pour les milliers, virgule pour les décimales
+THOUSANDS_SEPARATOR = " "
+DECIMAL_SEPARATOR = ","
+
+# Suffixes d'unité, du plus grand au plus petit
+UNIT_SUFFIXES = ((1e9, "Md"), (1e6, "M"), (1e3, "k"))
+
+
+def _format_fixed(num: float, decimals: int) -> str:
+    """Version scalaire de format_fixed_array, pour un appel par valeur"""
+    if round(num, decimals) == 0:
+        num = 0.0  # Pas de "-0,00"
+    return f"{num:_.{decimals}f}".replace(".", DECIMAL_SEPARATOR).replace("_", THOUSANDS_SEPARATOR)
+
+
+def _to_float_array(values: Any) -> np.ndarray:
+    """Valeurs en float64 ; ce qui n'est pas un nombre devient NaN"""
+    return pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=float)
+
+
+def _digits(values: np.ndarray, width: int) -> np.ndarray:
+    """Matrice (n, width) des chiffres ASCII d'entiers positifs, complétés par des zéros"""
+    out = np.empty((len(values), width), dtype=np.uint8)
+    for position in range(width - 1, -1, -1):
+        values, out[:, position] = np.divmod(values, 10)
+    return out + np.uint8(ord("0"))
+
+
+def _ascii_text(matrix: np.ndarray) -> np.ndarray:
+    """Lignes d'une matrice d'octets ASCII -> tableau de textes"""
+    matrix = np.ascontiguousarray(matrix)
+    return matrix.view(f"S{matrix.shape[1]}").ravel().astype(str)
+
+
+def _integer_matrix(ints: np.ndarray, sep: str) -> np.ndarray:
+    """Entiers positifs alignés à droite, groupés par milliers ("1 234 567")
+
+    Chaque chiffre est calculé pour toute la colonne d'un coup ; les zéros
+    de tête et les séparateurs sans chiffre à leur gauche sont des espaces.
+    """
+    width = len(str(int(ints.max()))) if len(ints) else 1
+    digits = _digits(ints, width)
+    lengths = np.searchsorted(10 ** np.arange(1, width, dtype=np.int64), ints, side='right') + 1
+    powers = np.arange(width)[::-1]
+    digits[powers[None, :] >= lengths[:, None]] = ord(" ")
+    if not sep:
+        return digits
+
+    out = np.full((len(ints), width + (width - 1) // 3), ord(" "), dtype=np.uint8)
+    last = out.shape[1] - 1
+    out[:, last - (powers + powers // 3)] = digits
+    sep_powers = np.arange(3, width, 3)
+    out[:, last - (sep_powers + sep_powers // 3) + 1] = np.where(
+        lengths[:, None] > sep_powers[None, :], ord(sep), ord(" ")
+    )
+    return out
+
+
+def format_fixed_array(values: Any, decimals: int = 2, thousands: str = THOUSANDS_SEPARATOR,
+                       decimal: str = DECIMAL_SEPARATOR, missing: str = "N/A") -> np.ndarray:
+    """Nombres en texte à `decimals` décimales, sans boucle Python par valeur
+
+    Le texte est assemblé octet par octet dans une matrice (séparateurs
+    ASCII d'un caractère) puis converti en une fois.
+    """
+    values = _to_float_array(values)
+    invalid = ~np.isfinite(values)
+    scale = 10 ** decimals
+    rounded = np.rint(np.abs(np.where(invalid, 0.0, values)) * scale).astype(np.int64)
+    ints, fracs = np.divmod(rounded, scale)
+
+    parts = [_integer_matrix(ints, thousands)]
+    if decimals:
+        parts.append(np.full((len(ints), 1), ord(decimal), dtype=np.uint8))
+        parts.append(_digits(fracs, decimals))
+    text = np.char.lstrip(_ascii_text(np.hstack(parts)), " ")
+
+    negative = (values < 0) & (rounded > 0)
+    if negative.any():
+        text = np.where(negative, np.char.add("-", text), text)
+    if invalid.any():
+        text = np.where(invalid, missing, text)
+    return text
+
+
+def format_currency_array(values: Any, currency: str = "€", decimals: int = 2) -> np.ndarray:
+    """Montants avec suffixe k/M/Md choisi valeur par valeur ("1,23 M€", "12,50 €")"""
+    values = _to_float_array(values)
+    magnitude = np.abs(values)
+    conditions = [magnitude >= limit for limit, _ in UNIT_SUFFIXES]
+    divisors = np.select(conditions, [limit for limit, _ in UNIT_SUFFIXES], 1.0)
+    units = np.select(conditions, [f" {suffix}{currency}" for _, suffix in UNIT_SUFFIXES], f" {currency}")
+    text = np.char.add(format_fixed_array(values / divisors, decimals, missing="N/A"), units)
+    return np.where(np.isfinite(values), text, f"N/A {currency}")
+
+
+def format_number_array(values: Any, decimals: int = 0, compact: bool = False) -> np.ndarray:
+    """Nombres groupés par milliers ; `compact` : suffixe k/M/Md ("1,2 M")"""
+    values = _to_float_array(values)
+    if not compact:
+        # Comme format_number : pas de décimales pour une valeur entière
+        whole = np.isfinite(values) & (values == np.round(values))
+        if decimals == 0 or whole.all():
+            return format_fixed_array(values, 0)
+        return np.where(whole, format_fixed_array(values, 0), format_fixed_array(values, decimals))
+    magnitude = np.abs(values)
+    conditions = [magnitude >= limit for limit, _ in UNIT_SUFFIXES]
+    divisors = np.select(conditions, [limit for limit, _ in UNIT_SUFFIXES], 1.0)
+    units = np.select(conditions, [f" {suffix}" for _, suffix in UNIT_SUFFIXES], "")
+    scaled = np.where(divisors > 1, format_fixed_array(values / divisors, max(decimals, 1)),
+                      format_fixed_array(values, decimals))
+    return np.where(np.isfinite(values), np.char.add(scaled, units), "N/A")
+
+
+def format_date_array(values: Any, fmt: str = "%d/%m/%Y") -> np.ndarray:
+    """Dates en texte ; le format par défaut est assemblé sans strftime par valeur"""
+    dates = pd.to_datetime(pd.Series(values), errors='coerce')
+    if fmt != "%d/%m/%Y":
+        return dates.dt.strftime(fmt).fillna("").to_numpy(dtype=str)
+    invalid = dates.isna().to_numpy()
+    fields = [dates.dt.day, dates.dt.month, dates.dt.year]
+    day, month, year = (field.fillna(0).to_numpy(dtype=np.int64) for field in fields)
+    slash = np.full((len(dates), 1), ord("/"), dtype=np.uint8)
+    text = _ascii_text(np.hstack([_digits(day, 2), slash, _digits(month, 2), slash, _digits(year, 4)]))
+    return np.where(invalid, "", text) if invalid.any() else text
+
+
 class DataFormatter:
     """Formateur de données générales"""
     
     @staticmethod
     def format_currency(value: Any, currency: str = "€", decimals: int = 2) -> str:
-        """Formate une valeur en devise"""
+        """Formate une valeur en devise (format_currency_array pour une colonne)"""
         try:
             num = float(value)
-            if abs(num) >= 1e9:
-                return f"{num/1e9:.{decimals}f} Md{currency}"
-            elif abs(num) >= 1e6:
-                return f"{num/1e6:.{decimals}f} M{currency}"
-            elif abs(num) >= 1e3:
-                return f"{num/1e3:.{decimals}f} k{currency}"
-            else:
-                return f"{num:.{decimals}f} {currency}"
         except (TypeError, ValueError):
             return f"N/A {currency}"
+        if not np.isfinite(num):
+            return f"N/A {currency}"
+        for limit, suffix in UNIT_SUFFIXES:
+            if abs(num) >= limit:
+                return f"{_format_fixed(num / limit, decimals)} {suffix}{currency}"
+        return f"{_format_fixed(num, decimals)} {currency}"
     
     @staticmethod
     def format_percentage(value: Any, decimals: int = 2) -> str:
@@ -35,15 +162,14 @@ class DataFormatter:
     
     @staticmethod
     def format_number(value: Any, decimals: int = 0) -> str:
-        """Formate un nombre avec séparateurs"""
+        """Formate un nombre avec séparateurs (format_number_array pour une colonne)"""
         try:
             num = float(value)
-            if num.is_integer():
-                return f"{int(num):,}".replace(",", " ")
-            else:
-                return f"{num:,.{decimals}f}".replace(",", " ")
         except (TypeError, ValueError):
             return "N/A"
+        if not np.isfinite(num):
+            return "N/A"
+        return _format_fixed(num, 0 if num.is_integer() else decimals)
     
     @staticmethod
     def format_date(date: Any, fmt: str = "%d/%m/%Y") -> str:
@@ -121,42 +247,46 @@ class StockFormatter:
         
         return formatted
     
+    # Colonnes d'historique (base ou fournisseur) -> libellés affichés
+    HISTORICAL_COLUMNS = {
+        'Date': 'Date', 'date': 'Date',
+        'Open': 'Ouverture', 'open': 'Ouverture',
+        'High': 'Plus haut', 'high': 'Plus haut',
+        'Low': 'Plus bas', 'low': 'Plus bas',
+        'Close': 'Clôture', 'close': 'Clôture',
+        'Volume': 'Volume', 'volume': 'Volume'
+    }
+    PRICE_COLUMNS = ['Ouverture', 'Plus haut', 'Plus bas', 'Clôture']
+    
     @staticmethod
-    def format_historical_data(df: pd.DataFrame) -> pd.DataFrame:
-        """Formate un DataFrame historique"""
-        formatted = df.copy()
+    def format_historical_data(df: pd.DataFrame, numeric: bool = False) -> pd.DataFrame:
+        """Formate un DataFrame historique
         
+        Chaque colonne est formatée d'un bloc (pas d'appel par cellule).
+        Avec `numeric=True`, les valeurs restent numériques (tri et export
+        intacts) : le formatage est confié au tableau via
+        `components.tables.historical_column_config()`.
+        """
         # Renommer les colonnes
-        column_mapping = {
-            'Open': 'Ouverture',
-            'High': 'Plus haut',
-            'Low': 'Plus bas',
-            'Close': 'Clôture',
-            'Volume': 'Volume',
-            'Date': 'Date'
-        }
+        formatted = df.rename(columns=StockFormatter.HISTORICAL_COLUMNS)
         
-        formatted = formatted.rename(columns=column_mapping)
+        if numeric:
+            if 'Date' in formatted.columns:
+                formatted['Date'] = pd.to_datetime(formatted['Date'])
+            return formatted
         
         # Formater les dates
         if 'Date' in formatted.columns:
-            formatted['Date'] = formatted['Date'].apply(
-                lambda x: DataFormatter.format_date(x)
-            )
+            formatted['Date'] = format_date_array(formatted['Date'])
         
         # Formater les prix
-        price_columns = ['Ouverture', 'Plus haut', 'Plus bas', 'Clôture']
-        for col in price_columns:
+        for col in StockFormatter.PRICE_COLUMNS:
             if col in formatted.columns:
-                formatted[col] = formatted[col].apply(
-                    lambda x: DataFormatter.format_currency(x, "€", 2)
-                )
+                formatted[col] = format_currency_array(formatted[col], "€", 2)
         
         # Formater le volume
         if 'Volume' in formatted.columns:
-            formatted['Volume'] = formatted['Volume'].apply(
-                lambda x: DataFormatter.format_number(x)
-            )
+            formatted['Volume'] = format_number_array(formatted['Volume'])
         
         return formatted
 
@@ -183,12 +313,11 @@ class DataFrameFormatter:
         return styled
     
     @staticmethod
-    def prepare_for_display(df: pd.DataFrame, max_rows: int = 100) -> pd.DataFrame:
+    def prepare_for_display(df: pd.DataFrame, max_rows: int = 100, column: Optional[str] = None) -> pd.DataFrame:
         """Prépare un DataFrame pour l'affichage"""
         if len(df) > max_rows:
-            # Échantillonnage si trop de lignes
-            indices = np.linspace(0, len(df)-1, max_rows, dtype=int)
-            df = df.iloc[indices]
+            # Réduction min/max par seau : les pics de `column` (clôture par défaut) restent visibles
+            df = decimate_rows(df, max_rows, column)
         
         return df
 
@@ -0,0 +1,26 @@
+# utils/hashing.py - Empreintes de séries pour la mémoïsation
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+
+def array_fingerprint(values: np.ndarray) -> str:
+    """Empreinte du contenu d'un tableau (type, forme et octets)"""
+    values = np.ascontiguousarray(values)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(values.dtype).encode())
+    digest.update(str(values.shape).encode())
+    digest.update(values.view(np.uint8) if values.size else b"")
+    return digest.hexdigest()
+
+
+def series_fingerprint(series) -> str:
+    """Empreinte des valeurs d'une série, indépendante de son index
+
+    Les indicateurs ne dépendent que de la suite des valeurs : deux séries
+    de mêmes clôtures partagent leurs résultats.
+    """
+    if isinstance(series, pd.Series):
+        series = series.to_numpy(dtype=float)
+    return array_fingerprint(np.asarray(series, dtype=float))
@@ -0,0 +1,183 @@
+# utils/history_sync.py - Synchronisation incrémentale des historiques
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from config.settings import HistoryConfig
+
+# Intervalles dont les barres sont alignées sur minuit UTC
+DAILY_INTERVALS = {"1d", "1wk", "1mo", "3mo"}
+
+# fetch(start, period) -> DataFrame (date, open, high, low, close, volume) ou None
+Fetcher = Callable[[Optional[datetime], str], Optional[pd.DataFrame]]
+
+
+class HistorySync:
+    """Historiques OHLCV stockés dans SQLite et complétés par la fin
+
+    Au premier accès à une série (fournisseur, symbole, intervalle),
+    `backfill_period` est téléchargé une fois. Ensuite seules les barres postérieures à la
+    dernière barre stockée sont demandées au fournisseur (la dernière est
+    redemandée car elle évolue pendant la séance), fusionnées, et la série
+    complète est servie depuis le disque. Une même série n'est pas
+    resynchronisée plus d'une fois toutes les `min_interval` secondes.
+    """
+
+    def __init__(
+        self,
+        db_path,
+        backfill_period: str = HistoryConfig.BACKFILL_PERIOD,
+        min_interval: float = HistoryConfig.MIN_SYNC_INTERVAL
+    ):
+        self.db_path = db_path
+        self.backfill_period = backfill_period
+        self.min_interval = min_interval
+        self._locks: Dict[tuple, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._init_tables()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _init_tables(self):
+        with closing(self._connect()) as conn, conn:
+            # Les tables sans colonne source ne disent pas de quel fournisseur
+            # viennent leurs barres : elles sont supprimées et retéléchargées
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(price_bars)")]
+            if columns and "source" not in columns:
+                conn.execute("DROP TABLE price_bars")
+                conn.execute("DROP TABLE IF EXISTS sync_state")
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS price_bars (
+                    source TEXT NOT NULL,
+                    symbol TEXT NOT NULL,
+                    interval TEXT NOT NULL,
+                    ts INTEGER NOT NULL,
+                    open REAL,
+                    high REAL,
+                    low REAL,
+                    close REAL,
+                    volume INTEGER,
+                    PRIMARY KEY (source, symbol, interval, ts)
+                ) WITHOUT ROWID
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    source TEXT NOT NULL,
+                    symbol TEXT NOT NULL,
+                    interval TEXT NOT NULL,
+                    last_sync REAL NOT NULL,
+                    PRIMARY KEY (source, symbol, interval)
+                )
+            ''')
+
+    def _lock_for(self, source: str, symbol: str, interval: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault((source, symbol, interval), threading.Lock())
+
+    def last_bar_ts(self, source: str, symbol: str, interval: str = "1d") -> Optional[int]:
+        """Horodatage (epoch s) de la dernière barre stockée"""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT MAX(ts) FROM price_bars WHERE source = ? AND symbol = ? AND interval = ?",
+                (source, symbol, interval)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _last_sync(self, conn: sqlite3.Connection, source: str, symbol: str, interval: str) -> float:
+        row = conn.execute(
+            "SELECT last_sync FROM sync_state WHERE source = ? AND symbol = ? AND interval = ?",
+            (source, symbol, interval)
+        ).fetchone()
+        return row[0] if row else 0.0
+
+    def store(self, source: str, symbol: str, interval: str, df: pd.DataFrame) -> int:
+        """Insère ou remplace les barres d'un DataFrame, retourne leur nombre"""
+        if df is None or df.empty:
+            return 0
+
+        ts = df['date'].values.astype('datetime64[s]').astype(np.int64)
+        if interval in DAILY_INTERVALS:
+            ts = ts - ts % 86400
+
+        rows = zip(
+            [source] * len(df),
+            [symbol] * len(df),
+            [interval] * len(df),
+            ts.tolist(),
+            df['open'].astype(float).tolist(),
+            df['high'].astype(float).tolist(),
+            df['low'].astype(float).tolist(),
+            df['close'].astype(float).tolist(),
+            df['volume'].fillna(0).astype(np.int64).tolist()
+        )
+        with closing(self._connect()) as conn, conn:
+            conn.executemany('''
+                INSERT OR REPLACE INTO price_bars
+                (source, symbol, interval, ts, open, high, low, close, volume)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+        return len(df)
+
+    def sync(self, source: str, symbol: str, interval: str, fetch: Fetcher, force: bool = False) -> int:
+        """Télécharge les barres manquantes, retourne le nombre de barres reçues"""
+        with self._lock_for(source, symbol, interval):
+            with closing(self._connect()) as conn:
+                last_sync = self._last_sync(conn, source, symbol, interval)
+            if not force and time.time() - last_sync < self.min_interval:
+                return 0
+
+            last_ts = self.last_bar_ts(source, symbol, interval)
+            if last_ts is None:
+                df = fetch(None, self.backfill_period)
+            else:
+                start = datetime.fromtimestamp(last_ts, tz=timezone.utc).replace(tzinfo=None)
+                df = fetch(start, self.backfill_period)
+
+            if df is None:
+                return 0
+
+            if last_ts is not None and not df.empty:
+                df = df[df['date'] >= pd.Timestamp(last_ts, unit='s').normalize()]
+            received = self.store(source, symbol, interval, df)
+
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO sync_state (source, symbol, interval, last_sync) VALUES (?, ?, ?, ?)",
+                    (source, symbol, interval, time.time())
+                )
+            return received
+
+    def load(self, source: str, symbol: str, interval: str = "1d", since: Optional[datetime] = None) -> pd.DataFrame:
+        """Charge la série stockée (colonnes date, open, high, low, close, volume)"""
+        since_ts = int(since.replace(tzinfo=timezone.utc).timestamp()) if since else 0
+        with closing(self._connect()) as conn:
+            df = pd.read_sql_query('''
+                SELECT ts, open, high, low, close, volume FROM price_bars
+                WHERE source = ? AND symbol = ? AND interval = ? AND ts >= ?
+                ORDER BY ts
+            ''', conn, params=[source, symbol, interval, since_ts])
+
+        df.insert(0, 'date', pd.to_datetime(df.pop('ts'), unit='s'))
+        return df
+
+    def get_series(
+        self,
+        source: str,
+        symbol: str,
+        interval: str,
+        fetch: Fetcher,
+        since: Optional[datetime] = None
+    ) -> Optional[pd.DataFrame]:
+        """Synchronise puis retourne la série depuis le disque (None si vide)"""
+        self.sync(source, symbol, interval, fetch)
+        df = self.load(source, symbol, interval, since)
+        return df if not df.empty else None
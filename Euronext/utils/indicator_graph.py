@@ -0,0 +1,331 @@
+# utils/indicator_graph.py - Registre d'indicateurs et évaluation en graphe
+import inspect
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Mapping, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from config.settings import IndicatorConfig
+from utils.hashing import series_fingerprint
+
+NodeKey = Tuple[str, Tuple]
+NodeRef = Union[str, Tuple[str, Mapping], NodeKey]
+
+SOURCE = "close"
+
+
+class Indicator:
+    """Nœud du graphe : une fonction NumPy et les nœuds dont elle dépend
+
+    Les paramètres (avec leurs valeurs par défaut) sont les arguments
+    nommés de la fonction ; `inputs(**params)` retourne, pour chaque
+    argument d'entrée, la référence du nœud qui le fournit.
+    """
+
+    def __init__(self, name: str, func: Callable, inputs: Callable[..., Dict[str, NodeRef]]):
+        self.name = name
+        self.func = func
+        self.inputs = inputs
+        signature = inspect.signature(func)
+        self.defaults = {
+            n: p.default for n, p in signature.parameters.items()
+            if p.default is not inspect.Parameter.empty
+        }
+
+
+class IndicatorRegistry:
+    """Catalogue des indicateurs disponibles"""
+
+    def __init__(self):
+        self._indicators: Dict[str, Indicator] = {}
+
+    def register(self, name: str, inputs: Optional[Callable[..., Dict[str, NodeRef]]] = None):
+        """Décorateur : enregistre une fonction comme indicateur"""
+        def decorator(func):
+            self._indicators[name] = Indicator(name, func, inputs or (lambda **params: {}))
+            return func
+        return decorator
+
+    def names(self):
+        return sorted(self._indicators)
+
+    def get(self, name: str) -> Indicator:
+        try:
+            return self._indicators[name]
+        except KeyError:
+            raise ValueError(f"Indicateur inconnu: {name}") from None
+
+    def key(self, ref: NodeRef) -> NodeKey:
+        """Forme canonique d'une référence : (nom, paramètres complets triés)"""
+        if isinstance(ref, str):
+            name, params = ref, {}
+        else:
+            name, params = ref
+            if isinstance(params, tuple):
+                params = dict(params)
+        if name == SOURCE:
+            return (SOURCE, ())
+
+        indicator = self.get(name)
+        unknown = set(params) - set(indicator.defaults)
+        if unknown:
+            raise ValueError(f"Paramètres inconnus pour {name}: {sorted(unknown)}")
+        merged = {**indicator.defaults, **params}
+        if "source" in merged:
+            merged["source"] = self.key(merged["source"])
+        return (name, tuple(sorted(merged.items())))
+
+    def dependencies(self, key: NodeKey) -> Dict[str, NodeKey]:
+        """Nœuds d'entrée d'un nœud, sous forme canonique"""
+        name, params = key
+        if name == SOURCE:
+            return {}
+        refs = self.get(name).inputs(**dict(params))
+        return {arg: self.key(ref) for arg, ref in refs.items()}
+
+
+registry = IndicatorRegistry()
+
+
+def _params(key: NodeKey) -> Dict:
+    return {k: v for k, v in key[1] if k != "source"}
+
+
+class IndicatorEngine:
+    """Évalue des indicateurs en partageant les résultats intermédiaires
+
+    Les nœuds demandés et toutes leurs dépendances forment un graphe
+    dédupliqué : un intermédiaire commun (écarts de prix, EMA, sommes
+    glissantes) n'est calculé qu'une fois par série. Chaque résultat est
+    mémorisé par (empreinte de la série, nœud) dans un LRU borné, si bien
+    qu'une seconde demande sur les mêmes clôtures ne coûte rien.
+    """
+
+    def __init__(self, registry: IndicatorRegistry = registry, max_entries: int = IndicatorConfig.MEMO_ENTRIES):
+        self.registry = registry
+        self.max_entries = max_entries
+        self._memo: "OrderedDict[Tuple[str, NodeKey], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def _memo_get(self, key):
+        with self._lock:
+            value = self._memo.get(key)
+            if value is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._memo.move_to_end(key)
+            return value
+
+    def _memo_set(self, key, value: np.ndarray):
+        value.setflags(write=False)
+        with self._lock:
+            self._memo[key] = value
+            self._memo.move_to_end(key)
+            while len(self._memo) > self.max_entries:
+                self._memo.popitem(last=False)
+
+    def evaluate(self, close, refs: Mapping[str, NodeRef]) -> Dict[str, np.ndarray]:
+        """Calcule les nœuds demandés ({nom de sortie: référence}) sur une série"""
+        values = np.asarray(close, dtype=float)
+        fingerprint = series_fingerprint(values)
+        local: Dict[NodeKey, np.ndarray] = {(SOURCE, ()): values}
+
+        def resolve(key: NodeKey) -> np.ndarray:
+            if key in local:
+                return local[key]
+            result = self._memo_get((fingerprint, key))
+            if result is None:
+                args = {arg: resolve(dep) for arg, dep in self.registry.dependencies(key).items()}
+                result = np.asarray(self.registry.get(key[0]).func(**args, **_params(key)), dtype=float)
+                self._memo_set((fingerprint, key), result)
+            local[key] = result
+            return result
+
+        return {name: resolve(self.registry.key(ref)) for name, ref in refs.items()}
+
+    def compute(self, close: pd.Series, refs: Mapping[str, NodeRef]) -> pd.DataFrame:
+        """Comme `evaluate`, en DataFrame aligné sur l'index de `close`"""
+        results = self.evaluate(close.to_numpy(dtype=float), refs)
+        return pd.DataFrame(results, index=close.index)
+
+    def clear(self):
+        with self._lock:
+            self._memo.clear()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "entries": len(self._memo),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / total if total else 0.0
+            }
+
+
+# ==================== INDICATEURS ====================
+
+@registry.register("delta", inputs=lambda source=SOURCE: {"x": source})
+def delta(x, source=SOURCE):
+    """Variation d'une barre à l'autre (NaN pour la première)"""
+    return np.diff(x, prepend=np.nan)
+
+
+@registry.register("gain", inputs=lambda source=SOURCE: {"d": ("delta", {"source": source})})
+def gain(d, source=SOURCE):
+    return np.where(d > 0, d, 0.0)
+
+
+@registry.register("loss", inputs=lambda source=SOURCE: {"d": ("delta", {"source": source})})
+def loss(d, source=SOURCE):
+    return np.where(d < 0, -d, 0.0)
+
+
+@registry.register("shifted", inputs=lambda source=SOURCE: {"x": source})
+def shifted(x, source=SOURCE):
+    """Écart à la première valeur valide, pour des sommes glissantes précises"""
+    finite = np.flatnonzero(np.isfinite(x))
+    return x - x[finite[0]] if len(finite) else x
+
+
+@registry.register("square", inputs=lambda source=SOURCE: {"x": source})
+def square(x, source=SOURCE):
+    return x * x
+
+
+@registry.register("rolling_sum", inputs=lambda source=SOURCE, window=20: {"x": source})
+def rolling_sum(x, source=SOURCE, window=20):
+    return pd.Series(x).rolling(window=window, min_periods=window).sum().to_numpy()
+
+
+def _centered_sum(source, window):
+    return ("rolling_sum", {"source": ("shifted", {"source": source}), "window": window})
+
+
+def _centered_sumsq(source, window):
+    return ("rolling_sum", {"source": ("square", {"source": ("shifted", {"source": source})}), "window": window})
+
+
+@registry.register("sma", inputs=lambda source=SOURCE, window=20: {
+    "x": source, "s": _centered_sum(source, window)
+})
+def sma(x, s, source=SOURCE, window=20):
+    """Moyenne mobile simple (NaN tant que la fenêtre n'est pas pleine)"""
+    finite = np.flatnonzero(np.isfinite(x))
+    return s / window + (x[finite[0]] if len(finite) else 0.0)
+
+
+@registry.register("rolling_std", inputs=lambda source=SOURCE, window=20, ddof=0: {
+    "s": _centered_sum(source, window), "q": _centered_sumsq(source, window)
+})
+def rolling_std(s, q, source=SOURCE, window=20, ddof=0):
+    """Écart-type glissant, à partir des mêmes sommes que `sma`"""
+    variance = (q - s * s / window) / (window - ddof)
+    return np.sqrt(np.maximum(variance, 0.0))
+
+
+@registry.register("ema", inputs=lambda source=SOURCE, span=12, min_periods=0: {"x": source})
+def ema(x, source=SOURCE, span=12, min_periods=0):
+    """Moyenne mobile exponentielle, ewm(adjust=False)"""
+    return pd.Series(x).ewm(span=span, min_periods=min_periods, adjust=False).mean().to_numpy()
+
+
+def _wilder(source, window):
+    # alpha = 1/window, soit span = 2·window - 1
+    return ("ema", {"source": source, "span": 2 * window - 1, "min_periods": window})
+
+
+def _rsi(up, down):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 - 100 / (1 + up / down)
+
+
+@registry.register("rsi", inputs=lambda window=14: {
+    "up": _wilder("gain", window), "down": _wilder("loss", window)
+})
+def rsi(up, down, window=14):
+    """RSI de Wilder, comme ta.momentum.RSIIndicator"""
+    return np.where(down == 0, 100.0, _rsi(up, down))
+
+
+@registry.register("rsi_sma", inputs=lambda window=14: {
+    "up": ("sma", {"source": "gain", "window": window}),
+    "down": ("sma", {"source": "loss", "window": window})
+})
+def rsi_sma(up, down, window=14):
+    """RSI de Cutler (moyennes simples), celui de utils.indicators.calculate_rsi"""
+    return _rsi(up, down)
+
+
+def _macd_inputs(fast=12, slow=26, warmup=True):
+    return {
+        "fast_ema": ("ema", {"span": fast, "min_periods": fast if warmup else 0}),
+        "slow_ema": ("ema", {"span": slow, "min_periods": slow if warmup else 0})
+    }
+
+
+@registry.register("macd", inputs=_macd_inputs)
+def macd(fast_ema, slow_ema, fast=12, slow=26, warmup=True):
+    """Ligne MACD ; warmup=True masque la période de chauffe comme `ta`"""
+    return fast_ema - slow_ema
+
+
+def _signal_ref(fast, slow, signal, warmup):
+    return ("ema", {
+        "source": ("macd", {"fast": fast, "slow": slow, "warmup": warmup}),
+        "span": signal,
+        "min_periods": signal if warmup else 0
+    })
+
+
+@registry.register("macd_signal", inputs=lambda fast=12, slow=26, signal=9, warmup=True: {
+    "x": _signal_ref(fast, slow, signal, warmup)
+})
+def macd_signal(x, fast=12, slow=26, signal=9, warmup=True):
+    return x
+
+
+@registry.register("macd_diff", inputs=lambda fast=12, slow=26, signal=9, warmup=True: {
+    "line": ("macd", {"fast": fast, "slow": slow, "warmup": warmup}),
+    "signal_line": _signal_ref(fast, slow, signal, warmup)
+})
+def macd_diff(line, signal_line, fast=12, slow=26, signal=9, warmup=True):
+    return line - signal_line
+
+
+def _band_inputs(window=20, window_dev=2, ddof=0):
+    return {
+        "mean": ("sma", {"window": window}),
+        "std": ("rolling_std", {"window": window, "ddof": ddof})
+    }
+
+
+@registry.register("bollinger_hband", inputs=_band_inputs)
+def bollinger_hband(mean, std, window=20, window_dev=2, ddof=0):
+    return mean + window_dev * std
+
+
+@registry.register("bollinger_lband", inputs=_band_inputs)
+def bollinger_lband(mean, std, window=20, window_dev=2, ddof=0):
+    return mean - window_dev * std
+
+
+# Colonnes ajoutées par TechnicalIndicators.calculate_all
+TECHNICAL_INDICATORS = {
+    'rsi': ("rsi", {"window": 14}),
+    'macd': "macd",
+    'macd_signal': "macd_signal",
+    'macd_diff': "macd_diff",
+    'bb_upper': "bollinger_hband",
+    'bb_middle': ("sma", {"window": 20}),
+    'bb_lower': "bollinger_lband",
+    'sma_20': ("sma", {"window": 20}),
+    'sma_50': ("sma", {"window": 50}),
+}
+
+engine = IndicatorEngine()
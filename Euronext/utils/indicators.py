@@ -1,28 +1,23 @@
 # utils/indicators.py - Nouveau fichier
-import pandas as pd
-import numpy as np
+from utils.indicator_graph import engine
 
 def calculate_rsi(prices, period=14):
     """Calcul du RSI"""
-    delta = prices.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
+    return engine.compute(prices, {"rsi": ("rsi_sma", {"window": period})})["rsi"]
 
 def calculate_macd(prices):
     """Calcul du MACD"""
-    exp1 = prices.ewm(span=12, adjust=False).mean()
-    exp2 = prices.ewm(span=26, adjust=False).mean()
-    macd = exp1 - exp2
-    signal = macd.ewm(span=9, adjust=False).mean()
-    return macd, signal
+    result = engine.compute(prices, {
+        "macd": ("macd", {"warmup": False}),
+        "signal": ("macd_signal", {"warmup": False})
+    })
+    return result["macd"], result["signal"]
 
 def calculate_bollinger_bands(prices, period=20):
     """Bandes de Bollinger"""
-    sma = prices.rolling(window=period).mean()
-    std = prices.rolling(window=period).std()
-    upper_band = sma + (std * 2)
-    lower_band = sma - (std * 2)
-    return upper_band, sma, lower_band
+    result = engine.compute(prices, {
+        "upper": ("bollinger_hband", {"window": period, "ddof": 1}),
+        "sma": ("sma", {"window": period}),
+        "lower": ("bollinger_lband", {"window": period, "ddof": 1})
+    })
+    return result["upper"], result["sma"], result["lower"]
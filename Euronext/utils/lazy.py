@@ -0,0 +1,57 @@
+# utils/lazy.py - Import des dépendances lourdes à la première utilisation
+import importlib
+import sys
+import threading
+from types import ModuleType
+from typing import Dict
+
+_lock = threading.RLock()
+_handles: Dict[str, "LazyModule"] = {}
+
+
+class LazyModule(ModuleType):
+    """Module importé au premier accès à l'un de ses attributs
+
+    Tant qu'aucun attribut n'est lu, le module n'est pas chargé : ni temps
+    d'import ni mémoire pour un processus qui n'utilise pas la
+    fonctionnalité. Une dépendance absente ne lève ImportError qu'à ce
+    moment-là.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_module"] = None
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__["_module"]
+        if module is None:
+            with _lock:
+                module = self.__dict__["_module"]
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "chargé" if self.__dict__["_module"] is not None else "non chargé"
+        return f"<module '{self.__name__}' ({state}, import différé)>"
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Module `name` s'il est déjà importé, sinon un LazyModule (un par nom)"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    with _lock:
+        return _handles.setdefault(name, LazyModule(name))
+
+
+def is_loaded(name: str) -> bool:
+    """Vrai si le module a réellement été importé"""
+    return name in sys.modules
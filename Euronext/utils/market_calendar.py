@@ -0,0 +1,120 @@
+# utils/market_calendar.py - Calendrier et phases de séance d'Euronext Paris
+from datetime import date, datetime, time as dtime, timedelta
+from functools import lru_cache
+from typing import FrozenSet, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+PARIS = ZoneInfo("Europe/Paris")
+
+# Horaires du marché au comptant (heure de Paris)
+PRE_OPEN_TIME = dtime(7, 15)
+OPEN_TIME = dtime(9, 0)
+AUCTION_TIME = dtime(17, 30)
+CLOSE_TIME = dtime(17, 40)  # Fin du trading at last
+
+# Séances réduites des 24 et 31 décembre
+HALF_DAY_AUCTION_TIME = dtime(14, 0)
+HALF_DAY_CLOSE_TIME = dtime(14, 5)
+
+# Phases de séance
+CLOSED = "closed"
+PRE_OPEN = "pre_open"                # Accumulation des ordres, fixing d'ouverture
+CONTINUOUS = "continuous"            # Cotation en continu
+CLOSING_AUCTION = "closing_auction"  # Fixing de clôture et trading at last
+
+PHASE_LABELS = {
+    CLOSED: "fermé",
+    PRE_OPEN: "pré-ouverture",
+    CONTINUOUS: "continu",
+    CLOSING_AUCTION: "fixing de clôture",
+}
+
+
+def easter_sunday(year: int) -> date:
+    """Dimanche de Pâques (calendrier grégorien, algorithme de Meeus)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+@lru_cache(maxsize=32)
+def holidays(year: int) -> FrozenSet[date]:
+    """Jours de fermeture d'Euronext Paris tombant en semaine"""
+    easter = easter_sunday(year)
+    days = {
+        date(year, 1, 1),                # Jour de l'an
+        easter - timedelta(days=2),      # Vendredi saint
+        easter + timedelta(days=1),      # Lundi de Pâques
+        date(year, 5, 1),                # Fête du travail
+        date(year, 12, 25),              # Noël
+        date(year, 12, 26),              # Lendemain de Noël
+    }
+    return frozenset(d for d in days if d.weekday() < 5)
+
+
+def is_trading_day(day: date) -> bool:
+    return day.weekday() < 5 and day not in holidays(day.year)
+
+
+def session_times(day: date) -> Optional[Tuple[dtime, dtime, dtime, dtime]]:
+    """(pré-ouverture, ouverture, fixing de clôture, fermeture) d'un jour, None si fermé"""
+    if not is_trading_day(day):
+        return None
+    if (day.month, day.day) in ((12, 24), (12, 31)):
+        return PRE_OPEN_TIME, OPEN_TIME, HALF_DAY_AUCTION_TIME, HALF_DAY_CLOSE_TIME
+    return PRE_OPEN_TIME, OPEN_TIME, AUCTION_TIME, CLOSE_TIME
+
+
+def _paris(now: Optional[datetime]) -> datetime:
+    """Heure de Paris ; une date naïve est lue comme heure de Paris"""
+    if now is None:
+        return datetime.now(PARIS)
+    if now.tzinfo is None:
+        return now.replace(tzinfo=PARIS)
+    return now.astimezone(PARIS)
+
+
+def market_phase(now: Optional[datetime] = None) -> str:
+    """Phase de séance à l'instant `now` (maintenant par défaut)"""
+    now = _paris(now)
+    times = session_times(now.date())
+    if times is None:
+        return CLOSED
+    pre_open, open_, auction, close = times
+    t = now.time()
+    if pre_open <= t < open_:
+        return PRE_OPEN
+    if open_ <= t < auction:
+        return CONTINUOUS
+    if auction <= t < close:
+        return CLOSING_AUCTION
+    return CLOSED
+
+
+def next_open(now: Optional[datetime] = None) -> datetime:
+    """Prochain début de pré-ouverture (ou l'instant même si le marché est ouvert)"""
+    now = _paris(now)
+    if market_phase(now) != CLOSED:
+        return now
+    day = now.date()
+    for _ in range(15):
+        times = session_times(day)
+        if times is not None:
+            start = datetime.combine(day, times[0], tzinfo=PARIS)
+            if start > now:
+                return start
+        day += timedelta(days=1)
+    raise ValueError("Aucune séance dans les 15 prochains jours")
+
+
+def seconds_until_open(now: Optional[datetime] = None) -> float:
+    now = _paris(now)
+    return max(0.0, (next_open(now) - now).total_seconds())
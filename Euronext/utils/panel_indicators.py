@@ -0,0 +1,181 @@
+# utils/panel_indicators.py - Indicateurs vectorisés sur un panel temps × symboles
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def build_panel(frames: Dict[str, pd.DataFrame], field: str = 'close') -> Tuple[np.ndarray, List[str], np.ndarray]:
+    """Aligne des historiques sur l'union de leurs dates
+
+    Retourne (dates, symboles, matrice T × N), NaN les jours où un symbole
+    n'a pas coté ; même forme que `ColumnarStore.load_panel`.
+    """
+    symbols = [s for s, df in frames.items() if df is not None and not df.empty]
+    date_columns = [pd.to_datetime(frames[s]['date'], cache=False).to_numpy().astype('datetime64[ns]') for s in symbols]
+    dates = np.unique(np.concatenate(date_columns)) if date_columns else np.empty(0, dtype='datetime64[ns]')
+
+    panel = np.full((len(dates), len(symbols)), np.nan)
+    for j, (symbol, column) in enumerate(zip(symbols, date_columns)):
+        panel[np.searchsorted(dates, column), j] = frames[symbol][field].to_numpy(dtype=float)
+    return dates, symbols, panel
+
+
+class _Layout:
+    """Passage du panel aligné au panel compacté et retour
+
+    Le compactage remonte les valeurs de chaque colonne en tête, dans
+    l'ordre : les indicateurs sont ainsi calculés sur les séances propres
+    à chaque symbole, comme s'il était traité seul, puis replacés sur le
+    calendrier commun. Sans trou dans le panel, les deux sont identiques.
+    """
+
+    def __init__(self, panel: np.ndarray):
+        self.valid = ~np.isnan(panel)
+        self.aligned = bool(self.valid.all())
+        if not self.aligned:
+            rows, cols = panel.shape
+            order = np.argsort(~self.valid, axis=0, kind='stable')
+            self.gather = (order * cols + np.arange(cols)).ravel()
+            self.scatter = np.empty_like(self.gather)
+            self.scatter[self.gather] = np.arange(self.gather.size)
+
+    def compact(self, panel: np.ndarray) -> np.ndarray:
+        if self.aligned:
+            return panel
+        return panel.ravel()[self.gather].reshape(panel.shape)
+
+    def expand(self, values: np.ndarray) -> np.ndarray:
+        if self.aligned:
+            return values
+        out = values.ravel()[self.scatter].reshape(values.shape)
+        out[~self.valid] = np.nan
+        return out
+
+
+def _rolling_moments(compact: np.ndarray, window: int):
+    """Moyenne et écart-type population glissants par sommes cumulées
+
+    Les sommes portent sur les écarts à la première valeur de chaque
+    colonne pour limiter les pertes de précision.
+    """
+    mean = np.full(compact.shape, np.nan)
+    std = np.full(compact.shape, np.nan)
+    if len(compact) < window:
+        return mean, std
+    shifted = compact - compact[:1]
+    zero = np.zeros((1, compact.shape[1]))
+    sums = np.concatenate([zero, np.cumsum(shifted, axis=0)])
+    squares = np.concatenate([zero, np.cumsum(shifted * shifted, axis=0)])
+    window_sum = (sums[window:] - sums[:-window]) / window
+    window_sq = (squares[window:] - squares[:-window]) / window
+    mean[window - 1:] = compact[:1] + window_sum
+    std[window - 1:] = np.sqrt(np.maximum(window_sq - window_sum * window_sum, 0.0))
+    return mean, std
+
+
+def _ewm(compact: np.ndarray, alpha: float, min_periods: int = 0) -> np.ndarray:
+    """ewm(alpha, adjust=False) colonne par colonne, boucle sur le temps seulement
+
+    `compact` commence par ses valeurs valides (un éventuel préfixe NaN
+    commun à toutes les colonnes est ignoré).
+    """
+    out = np.full(compact.shape, np.nan)
+    rows = np.flatnonzero(~np.isnan(compact).all(axis=1))
+    if len(rows) == 0:
+        return out
+    first = rows[0]
+    value = compact[first].copy()
+    out[first] = value
+    for t in range(first + 1, len(compact)):
+        value = value + alpha * (compact[t] - value)
+        out[t] = value
+    if min_periods > 1:
+        out[first:first + min_periods - 1] = np.nan
+    return out
+
+
+def _rsi(compact: np.ndarray, window: int) -> np.ndarray:
+    delta = np.diff(compact, axis=0, prepend=compact[:1])
+    up = _ewm(np.maximum(delta, 0.0, where=~np.isnan(delta), out=np.full(delta.shape, np.nan)), 1.0 / window, window)
+    down = _ewm(np.maximum(-delta, 0.0, where=~np.isnan(delta), out=np.full(delta.shape, np.nan)), 1.0 / window, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = np.where(down == 0, 100.0, 100.0 - 100.0 / (1.0 + up / down))
+    values[np.isnan(up) | np.isnan(down)] = np.nan
+    return values
+
+
+def _macd(compact: np.ndarray, fast: int, slow: int, signal: int):
+    line = _ewm(compact, 2.0 / (fast + 1), fast) - _ewm(compact, 2.0 / (slow + 1), slow)
+    signal_line = _ewm(line, 2.0 / (signal + 1), signal)
+    return line, signal_line, line - signal_line
+
+
+def _bollinger(compact: np.ndarray, window: int, window_dev: float):
+    mean, std = _rolling_moments(compact, window)
+    return mean + window_dev * std, mean, mean - window_dev * std
+
+
+def sma(panel: np.ndarray, window: int) -> np.ndarray:
+    """Moyenne mobile simple de chaque colonne"""
+    layout = _Layout(panel)
+    return layout.expand(_rolling_moments(layout.compact(panel), window)[0])
+
+
+def ema(panel: np.ndarray, span: int) -> np.ndarray:
+    """Moyenne mobile exponentielle (comme `ta`, min_periods = span)"""
+    layout = _Layout(panel)
+    return layout.expand(_ewm(layout.compact(panel), 2.0 / (span + 1), span))
+
+
+def rsi(panel: np.ndarray, window: int = 14) -> np.ndarray:
+    """RSI de Wilder, comme ta.momentum.RSIIndicator"""
+    layout = _Layout(panel)
+    return layout.expand(_rsi(layout.compact(panel), window))
+
+
+def macd(panel: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9):
+    """MACD, signal et histogramme, comme ta.trend.MACD"""
+    layout = _Layout(panel)
+    return tuple(layout.expand(v) for v in _macd(layout.compact(panel), fast, slow, signal))
+
+
+def bollinger(panel: np.ndarray, window: int = 20, window_dev: float = 2.0):
+    """Bandes de Bollinger (haute, moyenne, basse), écart-type population"""
+    layout = _Layout(panel)
+    return tuple(layout.expand(v) for v in _bollinger(layout.compact(panel), window, window_dev))
+
+
+def calculate_all(panel: np.ndarray) -> Dict[str, np.ndarray]:
+    """Tous les indicateurs de TechnicalIndicators, un compactage pour l'ensemble
+
+    Les clés sont celles des colonnes ajoutées par
+    `TechnicalIndicators.calculate_all`.
+    """
+    layout = _Layout(panel)
+    compact = layout.compact(panel)
+    macd_line, macd_signal, macd_diff = _macd(compact, 12, 26, 9)
+    upper, middle, lower = _bollinger(compact, 20, 2.0)
+    values = {
+        'rsi': _rsi(compact, 14),
+        'macd': macd_line,
+        'macd_signal': macd_signal,
+        'macd_diff': macd_diff,
+        'bb_upper': upper,
+        'bb_middle': middle,
+        'bb_lower': lower,
+        'sma_20': _rolling_moments(compact, 20)[0],
+        'sma_50': _rolling_moments(compact, 50)[0]
+    }
+    return {name: layout.expand(v) for name, v in values.items()}
+
+
+def latest(panel: np.ndarray) -> np.ndarray:
+    """Dernière valeur non NaN de chaque colonne"""
+    valid = ~np.isnan(panel)
+    if len(panel) == 0:
+        return np.full(panel.shape[1], np.nan)
+    last = len(panel) - 1 - np.argmax(valid[::-1], axis=0)
+    values = panel[last, np.arange(panel.shape[1])]
+    values[~valid.any(axis=0)] = np.nan
+    return values
@@ -0,0 +1,355 @@
+# utils/streaming_indicators.py - Indicateurs techniques incrémentaux
+import math
+import threading
+from collections import deque
+from typing import Dict, Hashable, Optional
+
+import numpy as np
+import pandas as pd
+
+NAN = float('nan')
+
+INDICATOR_COLUMNS = [
+    'rsi', 'macd', 'macd_signal', 'macd_diff',
+    'bb_upper', 'bb_middle', 'bb_lower', 'sma_20', 'sma_50'
+]
+
+
+class IncrementalEMA:
+    """Moyenne mobile exponentielle (équivalent ewm(adjust=False))"""
+
+    def __init__(self, span: Optional[int] = None, alpha: Optional[float] = None, min_periods: int = 0):
+        self.alpha = alpha if alpha is not None else 2.0 / (span + 1)
+        self.min_periods = min_periods
+        self.value = NAN
+        self.count = 0
+
+    def update(self, x: float) -> float:
+        if math.isnan(x):
+            return self.current
+        self.value = x if self.count == 0 else self.value + self.alpha * (x - self.value)
+        self.count += 1
+        return self.current
+
+    @property
+    def current(self) -> float:
+        return self.value if self.count >= max(self.min_periods, 1) else NAN
+
+    def snapshot(self) -> Dict:
+        return {"alpha": self.alpha, "min_periods": self.min_periods, "value": self.value, "count": self.count}
+
+    @classmethod
+    def from_snapshot(cls, snap: Dict) -> "IncrementalEMA":
+        ema = cls(alpha=snap["alpha"], min_periods=snap["min_periods"])
+        ema.value, ema.count = snap["value"], snap["count"]
+        return ema
+
+
+class IncrementalRolling:
+    """Moyenne et écart-type glissants sur une fenêtre circulaire
+
+    Les sommes sont tenues sur les écarts à une valeur de référence pour
+    limiter les pertes de précision sur des prix élevés.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.buffer = deque(maxlen=window)
+        self.ref = None
+        self.sum = 0.0
+        self.sumsq = 0.0
+
+    def update(self, x: float):
+        if self.ref is None:
+            self.ref = x
+        d = x - self.ref
+        if len(self.buffer) == self.window:
+            old = self.buffer[0] - self.ref
+            self.sum -= old
+            self.sumsq -= old * old
+        self.buffer.append(x)
+        self.sum += d
+        self.sumsq += d * d
+
+    @property
+    def ready(self) -> bool:
+        return len(self.buffer) == self.window
+
+    @property
+    def mean(self) -> float:
+        return self.ref + self.sum / self.window if self.ready else NAN
+
+    @property
+    def std(self) -> float:
+        """Écart-type population (ddof=0), comme `ta`"""
+        if not self.ready:
+            return NAN
+        m = self.sum / self.window
+        return math.sqrt(max(self.sumsq / self.window - m * m, 0.0))
+
+    def snapshot(self) -> Dict:
+        return {"window": self.window, "buffer": list(self.buffer), "ref": self.ref,
+                "sum": self.sum, "sumsq": self.sumsq}
+
+    @classmethod
+    def from_snapshot(cls, snap: Dict) -> "IncrementalRolling":
+        rolling = cls(snap["window"])
+        rolling.buffer.extend(snap["buffer"])
+        rolling.ref, rolling.sum, rolling.sumsq = snap["ref"], snap["sum"], snap["sumsq"]
+        return rolling
+
+
+class IncrementalRSI:
+    """RSI de Wilder (lissage alpha = 1/window), comme ta.momentum.RSIIndicator"""
+
+    def __init__(self, window: int = 14):
+        self.window = window
+        self.prev = None
+        self.up = IncrementalEMA(alpha=1.0 / window, min_periods=window)
+        self.down = IncrementalEMA(alpha=1.0 / window, min_periods=window)
+
+    def update(self, close: float) -> float:
+        delta = 0.0 if self.prev is None else close - self.prev
+        self.prev = close
+        up = self.up.update(max(delta, 0.0))
+        down = self.down.update(max(-delta, 0.0))
+        if math.isnan(up) or math.isnan(down):
+            return NAN
+        if down == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + up / down)
+
+    def snapshot(self) -> Dict:
+        return {"window": self.window, "prev": self.prev,
+                "up": self.up.snapshot(), "down": self.down.snapshot()}
+
+    @classmethod
+    def from_snapshot(cls, snap: Dict) -> "IncrementalRSI":
+        rsi = cls(snap["window"])
+        rsi.prev = snap["prev"]
+        rsi.up = IncrementalEMA.from_snapshot(snap["up"])
+        rsi.down = IncrementalEMA.from_snapshot(snap["down"])
+        return rsi
+
+
+class IncrementalMACD:
+    """MACD (12, 26, 9), comme ta.trend.MACD"""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = IncrementalEMA(span=fast, min_periods=fast)
+        self.slow = IncrementalEMA(span=slow, min_periods=slow)
+        self.signal = IncrementalEMA(span=signal, min_periods=signal)
+
+    def update(self, close: float):
+        macd = self.fast.update(close) - self.slow.update(close)
+        signal = self.signal.update(macd)
+        return macd, signal, macd - signal
+
+    def snapshot(self) -> Dict:
+        return {"fast": self.fast.snapshot(), "slow": self.slow.snapshot(), "signal": self.signal.snapshot()}
+
+    @classmethod
+    def from_snapshot(cls, snap: Dict) -> "IncrementalMACD":
+        macd = cls()
+        macd.fast = IncrementalEMA.from_snapshot(snap["fast"])
+        macd.slow = IncrementalEMA.from_snapshot(snap["slow"])
+        macd.signal = IncrementalEMA.from_snapshot(snap["signal"])
+        return macd
+
+
+class IncrementalBollinger:
+    """Bandes de Bollinger (20, 2), comme ta.volatility.BollingerBands"""
+
+    def __init__(self, window: int = 20, window_dev: float = 2.0):
+        self.window_dev = window_dev
+        self.rolling = IncrementalRolling(window)
+
+    def update(self, close: float):
+        self.rolling.update(close)
+        mean, std = self.rolling.mean, self.rolling.std
+        return mean + self.window_dev * std, mean, mean - self.window_dev * std
+
+    def snapshot(self) -> Dict:
+        return {"window_dev": self.window_dev, "rolling": self.rolling.snapshot()}
+
+    @classmethod
+    def from_snapshot(cls, snap: Dict) -> "IncrementalBollinger":
+        bb = cls(window_dev=snap["window_dev"])
+        bb.rolling = IncrementalRolling.from_snapshot(snap["rolling"])
+        return bb
+
+
+class IndicatorState:
+    """Ensemble des indicateurs de TechnicalIndicators, mis à jour barre par barre"""
+
+    def __init__(self):
+        self.rsi = IncrementalRSI(14)
+        self.macd = IncrementalMACD(12, 26, 9)
+        self.bollinger = IncrementalBollinger(20, 2)
+        self.sma_20 = IncrementalRolling(20)
+        self.sma_50 = IncrementalRolling(50)
+
+    def update(self, close: float) -> tuple:
+        """Intègre une clôture, retourne les valeurs dans l'ordre de INDICATOR_COLUMNS"""
+        rsi = self.rsi.update(close)
+        macd, signal, diff = self.macd.update(close)
+        upper, middle, lower = self.bollinger.update(close)
+        self.sma_20.update(close)
+        self.sma_50.update(close)
+        return (rsi, macd, signal, diff, upper, middle, lower, self.sma_20.mean, self.sma_50.mean)
+
+    def snapshot(self) -> Dict:
+        return {
+            "rsi": self.rsi.snapshot(),
+            "macd": self.macd.snapshot(),
+            "bollinger": self.bollinger.snapshot(),
+            "sma_20": self.sma_20.snapshot(),
+            "sma_50": self.sma_50.snapshot()
+        }
+
+    @classmethod
+    def from_snapshot(cls, snap: Dict) -> "IndicatorState":
+        state = cls()
+        state.rsi = IncrementalRSI.from_snapshot(snap["rsi"])
+        state.macd = IncrementalMACD.from_snapshot(snap["macd"])
+        state.bollinger = IncrementalBollinger.from_snapshot(snap["bollinger"])
+        state.sma_20 = IncrementalRolling.from_snapshot(snap["sma_20"])
+        state.sma_50 = IncrementalRolling.from_snapshot(snap["sma_50"])
+        return state
+
+
+def _grow(array: np.ndarray, capacity: int) -> np.ndarray:
+    """Copie de `array` dont le dernier axe passe à `capacity`"""
+    grown = np.empty(array.shape[:-1] + (capacity,), dtype=array.dtype)
+    grown[..., :array.shape[-1]] = array
+    return grown
+
+
+def _readonly(array: np.ndarray) -> np.ndarray:
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+class _Series:
+    """État d'une série et tampon des lignes déjà servies
+
+    L'état des indicateurs couvre toutes les barres sauf la dernière. Le
+    tampon garde, colonne par colonne, les entrées et les indicateurs de
+    toutes les lignes, dernière barre (provisoire) comprise : un appel n'y
+    écrit que les lignes à partir de la dernière barre validée.
+    """
+
+    def __init__(self):
+        self.state = IndicatorState()
+        self.count = 0
+        self.last_date = None
+        self.last_close = None
+        self.values = np.empty((len(INDICATOR_COLUMNS), 64))
+        self.layout = None
+        self.inputs: Dict[str, np.ndarray] = {}
+
+    def reserve(self, n: int):
+        capacity = self.values.shape[1]
+        if n > capacity:
+            capacity = max(n, 2 * capacity)
+            self.values = _grow(self.values, capacity)
+            self.inputs = {name: _grow(array, capacity) for name, array in self.inputs.items()}
+
+    def commit(self, date, close: float):
+        self.reserve(self.count + 1)
+        self.values[:, self.count] = self.state.update(close)
+        self.count += 1
+        self.last_date = date
+        self.last_close = close
+
+    def write_inputs(self, df: pd.DataFrame, start: int):
+        """Recopie les lignes start: des colonnes de df (toutes si elles ont changé)"""
+        layout = tuple((name, df[name].dtype) for name in df.columns)
+        if layout != self.layout:
+            capacity = self.values.shape[1]
+            self.inputs = {
+                name: np.empty(capacity, dtype=df[name].iloc[:0].to_numpy().dtype) for name in df.columns
+            }
+            self.layout = layout
+            start = 0
+        for name, array in self.inputs.items():
+            array[start:len(df)] = df[name].iloc[start:].to_numpy()
+
+    def frame(self, n: int, index: pd.Index) -> pd.DataFrame:
+        """Les n premières lignes du tampon, sans copie et en lecture seule"""
+        columns = {name: _readonly(array[:n]) for name, array in self.inputs.items()}
+        for j, column in enumerate(INDICATOR_COLUMNS):
+            columns[column] = _readonly(self.values[j, :n])
+        return pd.DataFrame(columns, index=index, copy=False)
+
+
+class IncrementalIndicatorEngine:
+    """Calcule les indicateurs d'une série en ne traitant que les nouvelles barres
+
+    Pour chaque clé (symbole, unité), l'état des indicateurs est conservé
+    jusqu'à l'avant-dernière barre. La dernière barre, encore susceptible
+    d'évoluer pendant la séance, est calculée sur une copie de l'état.
+    Si le début de la série ne correspond plus à ce qui a été vu, tout est
+    recalculé.
+
+    Le résultat est une vue en lecture seule du tampon de la série : son
+    coût ne dépend que du nombre de lignes nouvelles. L'appel suivant peut
+    mettre à jour sa dernière ligne, qui reste la même barre.
+    """
+
+    def __init__(self):
+        self._series: Dict[Hashable, _Series] = {}
+        self._lock = threading.Lock()
+
+    def _matches(self, series: _Series, dates: np.ndarray, closes: np.ndarray) -> bool:
+        n = series.count
+        return 0 < n < len(dates) and dates[n - 1] == series.last_date and closes[n - 1] == series.last_close
+
+    def calculate(self, df: pd.DataFrame, key: Hashable) -> pd.DataFrame:
+        """Retourne les colonnes de df suivies de celles de INDICATOR_COLUMNS"""
+        dates = df['date'].to_numpy()
+        closes = df['close'].to_numpy(dtype=float)
+        n = len(closes)
+
+        with self._lock:
+            series = self._series.get(key)
+            if series is None or not self._matches(series, dates, closes):
+                series = _Series()
+                self._series[key] = series
+
+            # La barre provisoire de l'appel précédent est réécrite
+            start = series.count
+            for i in range(start, n - 1):
+                series.commit(dates[i], closes[i])
+
+            series.reserve(n)
+            series.values[:, n - 1] = IndicatorState.from_snapshot(series.state.snapshot()).update(closes[-1])
+            series.write_inputs(df, start)
+            return series.frame(n, df.index)
+
+    def snapshot(self, key: Hashable) -> Optional[Dict]:
+        """État sérialisable d'une série (barres validées uniquement)"""
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                return None
+            return {
+                "state": series.state.snapshot(),
+                "count": series.count,
+                "last_date": series.last_date,
+                "last_close": series.last_close,
+                "values": series.values[:, :series.count].T.tolist()
+            }
+
+    def restore(self, key: Hashable, snap: Dict):
+        """Reconstruit une série à partir d'un état sauvegardé"""
+        series = _Series()
+        series.state = IndicatorState.from_snapshot(snap["state"])
+        series.count = snap["count"]
+        series.last_date = snap["last_date"]
+        series.last_close = snap["last_close"]
+        values = np.asarray(snap["values"], dtype=float).reshape(-1, len(INDICATOR_COLUMNS)).T
+        series.values = _grow(values, 2 * max(64, values.shape[1]))
+        with self._lock:
+            self._series[key] = series
@@ -0,0 +1,192 @@
+# utils/write_behind.py - Écriture différée et groupée vers SQLite
+import atexit
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from config.settings import WriterConfig
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class _FlushRequest:
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class WriteBehindWriter:
+    """File d'écriture SQLite vidée par un thread dédié
+
+    Les appelants déposent des lignes dans une file et repartent aussitôt.
+    Un thread d'arrière-plan, seul détenteur d'une connexion WAL ouverte en
+    permanence, insère les lignes par `executemany` dès que `batch_size`
+    lignes sont en attente ou que `flush_interval` secondes se sont
+    écoulées. La file est vidée à l'arrêt du processus.
+    """
+
+    def __init__(
+        self,
+        db_path,
+        sql: str,
+        batch_size: int = WriterConfig.BATCH_SIZE,
+        flush_interval: float = WriterConfig.FLUSH_INTERVAL,
+        max_queue: int = WriterConfig.MAX_QUEUE
+    ):
+        self.db_path = db_path
+        self.sql = sql
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._stats_lock = threading.Lock()
+        self._rows_written = 0
+        self._flushes = 0
+        self._dropped = 0
+        self._errors = 0
+        self._last_error: Optional[str] = None
+        self._last_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+        self._max_flush_ms = 0.0
+
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, row: tuple) -> bool:
+        """Met une ligne en file ; False si la file est pleine"""
+        try:
+            self._queue.put_nowait(row)
+            return True
+        except queue.Full:
+            with self._stats_lock:
+                self._dropped += 1
+            return False
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Force l'écriture de tout ce qui est en file et attend"""
+        if not self._thread.is_alive():
+            return False
+        request = _FlushRequest()
+        self._queue.put(request)
+        return request.done.wait(timeout)
+
+    def close(self, timeout: float = 10.0):
+        """Écrit les lignes restantes puis arrête le thread"""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _run(self):
+        conn = self._connect()
+        try:
+            while True:
+                batch: List[tuple] = []
+                waiters: List[_FlushRequest] = []
+                stopping = False
+                deadline = time.monotonic() + self.flush_interval
+
+                while len(batch) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    if isinstance(item, _FlushRequest):
+                        waiters.append(item)
+                        break
+                    batch.append(item)
+
+                if stopping:
+                    # Vider ce qui reste avant de fermer
+                    while True:
+                        try:
+                            item = self._queue.get_nowait()
+                        except queue.Empty:
+                            break
+                        if isinstance(item, _FlushRequest):
+                            waiters.append(item)
+                        elif item is not _STOP:
+                            batch.append(item)
+
+                self._write(conn, batch)
+                for waiter in waiters:
+                    waiter.done.set()
+                if stopping:
+                    return
+        finally:
+            conn.close()
+
+    def _write(self, conn: sqlite3.Connection, batch: List[tuple]):
+        if not batch:
+            return
+        start = time.perf_counter()
+        written = len(batch)
+        try:
+            with conn:
+                conn.executemany(self.sql, batch)
+        except sqlite3.Error:
+            # Une ligne invalide ne doit pas faire perdre tout le lot
+            written = 0
+            for row in batch:
+                try:
+                    with conn:
+                        conn.execute(self.sql, row)
+                    written += 1
+                except sqlite3.Error as e:
+                    logger.error("Ligne rejetée par %s: %s (%r)", self.db_path, e, row)
+                    with self._stats_lock:
+                        self._errors += 1
+                        self._last_error = str(e)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._stats_lock:
+            self._rows_written += written
+            self._flushes += 1
+            self._last_flush_ms = elapsed_ms
+            self._total_flush_ms += elapsed_ms
+            self._max_flush_ms = max(self._max_flush_ms, elapsed_ms)
+
+    def get_stats(self) -> Dict:
+        """Profondeur de file, lignes écrites et latence des flushs"""
+        with self._stats_lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "rows_written": self._rows_written,
+                "flushes": self._flushes,
+                "dropped": self._dropped,
+                "errors": self._errors,
+                "last_error": self._last_error,
+                "last_flush_ms": self._last_flush_ms,
+                "avg_flush_ms": self._total_flush_ms / self._flushes if self._flushes else 0.0,
+                "max_flush_ms": self._max_flush_ms
+            }
+
+
+_writers: Dict[tuple, WriteBehindWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(db_path, sql: str) -> WriteBehindWriter:
+    """Retourne l'écrivain partagé pour cette base et cette requête"""
+    key = (str(db_path), sql)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = WriteBehindWriter(db_path, sql)
+            _writers[key] = writer
+        return writer